@@ -0,0 +1,65 @@
+"""文本样式区间查询的基准测试
+
+运行: python benchmarks/argv_styles.py
+
+构造含大量加粗/斜体片段的长文本消息，测量 MessageArgv.build 与逐词转换回 Text 的耗时；
+另测一组额外带有横跨整条消息的样式的消息。两组的耗时都应随消息长度近似线性增长。
+"""
+
+from time import perf_counter
+
+from arclet.alconna import CommandMeta
+
+from nonebot_plugin_alconna.uniseg import Text, UniMessage
+from nonebot_plugin_alconna.argv import MessageArgv, argv_ctx, text
+
+
+def make_message(length: int, wide: bool = False) -> UniMessage:
+    words = []
+    styles: dict[tuple[int, int], list[str]] = {}
+    size = 0
+    index = 0
+    while size < length:
+        word = f"word{index}"
+        if index % 2:
+            styles[(size, size + len(word))] = ["bold"]
+        elif index % 3:
+            styles[(size, size + 2)] = ["italic"]
+        words.append(word)
+        size += len(word) + 1
+        index += 1
+    if wide:
+        styles[(0, size)] = ["underline"]
+    return UniMessage(Text(" ".join(words), styles))
+
+
+def run(length: int, wide: bool, rounds: int = 5) -> float:
+    msg = make_message(length, wide)
+    best = float("inf")
+    for _ in range(rounds):
+        argv = MessageArgv(CommandMeta())
+        argv.enter({})
+        begin = perf_counter()
+        argv.build(msg)
+        token = argv_ctx.set(argv)
+        try:
+            for part in "".join(argv.raw_data).split():
+                text.match(part)
+        finally:
+            argv_ctx.reset(token)
+        best = min(best, perf_counter() - begin)
+    return best
+
+
+def main():
+    for wide in (False, True):
+        base = None
+        for length in (1_000, 2_500, 5_000, 10_000):
+            cost = run(length, wide)
+            base = base or cost / length
+            label = "wide " if wide else "short"
+            print(f"{label} {length:>6} chars: {cost * 1000:8.2f} ms  ({cost / length / base:.2f}x per char)")
+
+
+if __name__ == "__main__":
+    main()
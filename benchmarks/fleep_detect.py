@@ -0,0 +1,66 @@
+"""fleep 文件类型识别的基准测试
+
+运行: python benchmarks/fleep_detect.py
+
+为内置签名表中的每个签名构造一个 128 字节的文件头，另加同样数量的随机数据，
+对比逐条比较十六进制字符串 (旧实现) 与按偏移、首字节预编译分组的 `fleep.get` 的耗时。
+"""
+
+import os
+from time import perf_counter
+
+from nonebot_plugin_alconna.uniseg.utils import fleep
+
+ROUNDS = 20
+
+
+def legacy_get(obj: bytes):
+    stream = " ".join([f"{byte:02X}" for byte in obj])
+    types = {}
+    extensions = {}
+    mimes = {}
+    for element in fleep.data:
+        for signature in element["signature"]:
+            offset = element["offset"] * 2 + element["offset"]
+            if signature == stream[offset : len(signature) + offset]:
+                types[element["type"]] = len(signature)
+                extensions[element["extension"]] = len(signature)
+                mimes[element["mime"]] = len(signature)
+    return fleep.Info(
+        sorted(types, key=lambda x: types.get(x, False), reverse=True),
+        sorted(extensions.keys(), key=lambda x: extensions.get(x, False), reverse=True),
+        sorted(mimes.keys(), key=lambda x: mimes.get(x, False), reverse=True),
+    )
+
+
+def make_headers() -> list[bytes]:
+    headers = []
+    for element in fleep.data:
+        for signature in element["signature"]:
+            head = os.urandom(element["offset"]) + bytes.fromhex(signature)
+            headers.append((head + os.urandom(128))[:128])
+    headers.extend(os.urandom(128) for _ in range(len(headers)))
+    return headers
+
+
+def run(func, headers: list[bytes]) -> float:
+    begin = perf_counter()
+    for _ in range(ROUNDS):
+        for header in headers:
+            func(header)
+    return (perf_counter() - begin) / (ROUNDS * len(headers))
+
+
+def main():
+    begin = perf_counter()
+    fleep.get(b"")
+    print(f"load and compile {(perf_counter() - begin) * 1000:.2f} ms")
+    headers = make_headers()
+    legacy = run(legacy_get, headers)
+    compiled = run(fleep.get, headers)
+    print(f"{len(headers)} headers: legacy {legacy * 1e6:7.2f} us  compiled {compiled * 1e6:7.2f} us", end="  ")
+    print(f"({legacy / compiled:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Media.save 的基准测试
+
+运行: python benchmarks/media_save.py
+
+将 4 个 16 MiB 视频 (其中一半内容重复) 保存到临时目录，
+对比同步写入 (旧实现)、`Media.save` 与 `Media.save_async` 的耗时；`save_async` 另外统计事件循环被阻塞的时间。
+"""
+
+import os
+import asyncio
+import hashlib
+from pathlib import Path
+from time import perf_counter
+from tempfile import TemporaryDirectory
+
+from nonebot_plugin_alconna.uniseg import Video, UniMessage
+
+ROUNDS = 5
+
+
+def make_message() -> UniMessage:
+    first = b"\x00\x00\x00\x18ftypmp42" + os.urandom(16 * 1024 * 1024)
+    second = b"\x00\x00\x00\x18ftypmp42" + os.urandom(16 * 1024 * 1024)
+    return UniMessage([Video(raw=first), Video(raw=second), Video(raw=first), Video(raw=second)])
+
+
+def legacy_save(raw: bytes, dir_: Path) -> Path:
+    md5 = hashlib.md5(raw).hexdigest()
+    path = dir_ / md5[:2] / f"{md5}.mp4"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb+") as f:
+        f.write(raw)
+    return path.resolve()
+
+
+async def save_async(msg: UniMessage, dir_: Path) -> tuple[float, float]:
+    blocked = 0.0
+    begin = perf_counter()
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        tasks = [asyncio.ensure_future(seg.save_async(dir_)) for seg in msg[Video]]
+        await asyncio.sleep(0)
+        blocked += perf_counter() - start
+        await asyncio.gather(*tasks)
+    return (perf_counter() - begin) / ROUNDS, blocked / ROUNDS
+
+
+def main():
+    msg = make_message()
+    with TemporaryDirectory() as tmp:
+        begin = perf_counter()
+        for _ in range(ROUNDS):
+            for seg in msg[Video]:
+                legacy_save(seg.raw_bytes, Path(tmp) / "legacy")
+        legacy = (perf_counter() - begin) / ROUNDS
+
+        begin = perf_counter()
+        for _ in range(ROUNDS):
+            msg.dump(media_save_dir=Path(tmp) / "store")
+        store = (perf_counter() - begin) / ROUNDS
+
+        total, blocked = asyncio.run(save_async(msg, Path(tmp) / "async"))
+    print(f"legacy      {legacy * 1000:8.2f} ms/msg")
+    print(f"save        {store * 1000:8.2f} ms/msg  ({legacy / store:.1f}x)")
+    print(f"save_async  {total * 1000:8.2f} ms/msg  (blocking {blocked * 1000:8.2f} ms/msg)")
+
+
+if __name__ == "__main__":
+    main()
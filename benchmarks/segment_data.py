@@ -0,0 +1,87 @@
+"""Segment.data / dump 的基准测试
+
+运行: python benchmarks/segment_data.py
+
+构造包含按钮组 (Keyboard) 与转发节点 (Reference) 的消息，
+对比基于 `dataclasses.asdict` 的旧实现与按类型缓存字段名、仅转换嵌套 dataclass 的实现的耗时。
+"""
+
+from time import perf_counter
+from typing import Callable
+from dataclasses import asdict, fields
+
+from nonebot_plugin_alconna.uniseg import At, Text, Button, RefNode, Segment, Keyboard, Reference, CustomNode, UniMessage
+
+
+def make_message(size: int) -> UniMessage:
+    segs = []
+    for i in range(size):
+        segs.append(Text(f"line {i}").bold())
+        segs.append(
+            Keyboard(
+                [Button("action", f"btn {i}-{j}", id=str(j), permission=[At("user", str(j))]) for j in range(5)],
+                row=5,
+            )
+        )
+        segs.append(
+            Reference(
+                str(i),
+                [CustomNode(str(j), f"user {j}", [Text(f"node {j}"), At("user", str(j))]) for j in range(5)]
+                + [RefNode(str(i))],
+            )
+        )
+    return UniMessage(segs)
+
+
+def legacy_data(msg: UniMessage):
+    for seg in msg:
+        res = asdict(seg)
+        res.pop("origin", None)
+        res.pop("_children", None)
+
+
+def _legacy_dump(seg: Segment) -> dict:
+    if type(seg).dump is not Segment.dump:
+        return seg.dump(media_save_dir=False)
+    data = {f.name: getattr(seg, f.name) for f in fields(seg) if f.name not in ("origin", "_children")}
+    data = {"type": seg.type, **{k: v for k, v in data.items() if v is not None}}
+    if seg._children:
+        data["children"] = [_legacy_dump(child) for child in seg._children]
+    return data
+
+
+def legacy_dump(msg: UniMessage):
+    for seg in msg:
+        _legacy_dump(seg)
+
+
+def fast_data(msg: UniMessage):
+    for seg in msg:
+        seg.data
+
+
+def fast_dump(msg: UniMessage):
+    for seg in msg:
+        seg.dump(media_save_dir=False)
+
+
+def run(func: Callable[[UniMessage], None], msg: UniMessage, rounds: int = 50) -> float:
+    begin = perf_counter()
+    for _ in range(rounds):
+        func(msg)
+    return (perf_counter() - begin) / rounds
+
+
+def main():
+    for size in (10, 100, 1_000):
+        msg = make_message(size)
+        old = run(legacy_data, msg)
+        new = run(fast_data, msg)
+        print(f"{size:>5} groups data: asdict {old * 1000:8.3f} ms  cached {new * 1000:8.3f} ms  ({old / new:.1f}x)")
+        old = run(legacy_dump, msg)
+        new = run(fast_dump, msg)
+        print(f"{size:>5} groups dump: fields {old * 1000:8.3f} ms  cached  {new * 1000:8.3f} ms  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""消息段内存占用的基准测试
+
+运行: python benchmarks/segment_memory.py
+
+将 100k 条 OneBot V11 消息 (文本、at、图片、表情的组合，类似聊天记录) 转换为 UniMessage 并常驻内存，
+适配器消息在转换后即被丢弃，对比保留与丢弃 origin 时每条消息的内存占用；适配器消息本身的占用作为参照。
+"""
+
+import gc
+import tracemalloc
+from typing import Callable
+from collections.abc import Iterator
+
+from nonebot.adapters.onebot.v11 import Message, MessageSegment
+
+from nonebot_plugin_alconna.uniseg import UniMessage
+from nonebot_plugin_alconna.uniseg.adapters import alter_get_builder
+
+SIZE = 100_000
+
+
+def make_corpus(size: int) -> Iterator[Message]:
+    for i in range(size):
+        msg = Message(f"message {i} ")
+        if i % 2 == 0:
+            msg += MessageSegment.at(i)
+        if i % 3 == 0:
+            msg += MessageSegment.image(f"https://example.com/{i}.png")
+        if i % 5 == 0:
+            msg += MessageSegment.face(i % 200)
+        yield msg
+
+
+def measure(func: Callable[[], list]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    begin, _ = tracemalloc.get_traced_memory()
+    result = func()  # noqa: F841
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (end - begin) / SIZE
+
+
+def main():
+    builder = alter_get_builder("OneBot V11")
+    assert builder
+
+    adapter = measure(lambda: list(make_corpus(SIZE)))
+    keep = measure(lambda: [UniMessage(builder.generate(msg)) for msg in make_corpus(SIZE)])
+    drop = measure(lambda: [UniMessage(builder.generate(msg, keep_origin=False)) for msg in make_corpus(SIZE)])
+    print(f"adapter message          : {adapter:7.1f} B/msg")
+    print(f"UniMessage (keep origin) : {keep:7.1f} B/msg")
+    print(f"UniMessage (drop origin) : {drop:7.1f} B/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""发送对象索引的基准测试
+
+运行: python benchmarks/target_index.py
+
+模拟一个加入了大量群聊的 bot 的拉取结果，对比逐个 `Target.verify` 扫描与 `TargetIndex.match` 的查询耗时，
+以及两种方式保存拉取结果所占用的内存。
+"""
+
+import gc
+import tracemalloc
+from time import perf_counter
+
+from nonebot_plugin_alconna.uniseg import Target
+from nonebot_plugin_alconna.uniseg.target import TargetIndex
+
+QUERIES = 200
+
+
+def make_targets(size: int) -> list[Target]:
+    return [Target(str(i), self_id="1", adapter="Satori", platform="chronocat") for i in range(size)]
+
+
+def measure(build):
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    for size in (1_000, 10_000, 50_000):
+        targets, legacy_mem = measure(lambda: set(make_targets(size)))  # noqa: B023
+        index, index_mem = measure(lambda: TargetIndex(make_targets(size)))  # noqa: B023
+        queries = [Target(str(i * size // QUERIES), self_id="1", adapter="Satori") for i in range(QUERIES)]
+
+        begin = perf_counter()
+        for query in queries:
+            any(query.verify(tg) for tg in targets)
+        legacy = (perf_counter() - begin) / QUERIES
+
+        begin = perf_counter()
+        for query in queries:
+            index.match(query)
+        indexed = (perf_counter() - begin) / QUERIES
+        print(
+            f"{size:>6} targets: scan {legacy * 1e6:9.1f} us ({legacy_mem / size:5.0f} B/target)  "
+            f"index {indexed * 1e6:6.2f} us ({index_mem / size:5.0f} B/target)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""已转换消息缓存的基准测试
+
+运行: python benchmarks/unimsg_export_cache.py
+
+将一条类似帮助信息的固定回复 (多段带样式的文本、at 与按钮) 反复转换为 OneBot V11 与 Satori 消息，
+对比未启用与启用 `apply_export_cache` 时每次转换的耗时。
+"""
+
+from time import perf_counter
+
+from nonebot_plugin_alconna.uniseg import At, Text, Button, Keyboard, UniMessage, apply_export_cache
+
+ROUNDS = 2_000
+
+
+def make_message() -> UniMessage:
+    msg = UniMessage()
+    for i in range(20):
+        msg += Text(f"/command{i} ").bold() + Text(f"description of command {i}\n")
+    msg += At("user", "123")
+    msg += Keyboard([Button("input", label=f"cmd{i}", text=f"/command{i}") for i in range(5)])
+    return msg
+
+
+def run(msg: UniMessage, adapter: str) -> float:
+    begin = perf_counter()
+    for _ in range(ROUNDS):
+        msg.export_sync(adapter=adapter)
+    return (perf_counter() - begin) / ROUNDS
+
+
+def main():
+    msg = make_message()
+    for adapter in ("OneBot V11", "Satori"):
+        plain = run(msg, adapter)
+        dispose = apply_export_cache()
+        try:
+            cached = run(msg, adapter)
+        finally:
+            dispose()
+        print(f"{adapter:>10}: export {plain * 1e6:8.1f} us  cached {cached * 1e6:8.1f} us  ({plain / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
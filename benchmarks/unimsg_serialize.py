@@ -0,0 +1,61 @@
+"""UniMessage 批量序列化的基准测试
+
+运行: python benchmarks/unimsg_serialize.py
+
+将 10k 条消息 (文本、at，每 10 条中有一张 32 KiB 的图片) 写入内存中的文件再读回，
+对比逐行 JSON (媒体数据 base64 编码) 与 `dump_many`/`load_many` 二进制格式的耗时与体积。
+"""
+
+import os
+from io import BytesIO
+from time import perf_counter
+
+from nonebot_plugin_alconna.uniseg import At, Text, Image, UniMessage
+
+SIZE = 10_000
+
+
+def make_messages(size: int) -> list[UniMessage]:
+    image = b"\x89PNG\r\n\x1a\n" + os.urandom(32 * 1024)
+    result = []
+    for i in range(size):
+        msg = UniMessage([Text(f"message {i} ").bold(0, 7), At("user", str(i))])
+        if i % 10 == 0:
+            msg.append(Image(raw=image, mimetype="image/png"))
+        result.append(msg)
+    return result
+
+
+def json_lines(messages: list[UniMessage]) -> tuple[float, float, int]:
+    begin = perf_counter()
+    fp = BytesIO()
+    for msg in messages:
+        fp.write(msg.dump(media_save_dir=True, json=True).encode())
+        fp.write(b"\n")
+    middle = perf_counter()
+    fp.seek(0)
+    for line in fp:
+        UniMessage.load(line.decode())
+    return middle - begin, perf_counter() - middle, fp.tell()
+
+
+def binary(messages: list[UniMessage]) -> tuple[float, float, int]:
+    begin = perf_counter()
+    fp = BytesIO()
+    UniMessage.dump_many(messages, fp)
+    middle = perf_counter()
+    fp.seek(0)
+    for _ in UniMessage.load_many(fp):
+        pass
+    return middle - begin, perf_counter() - middle, fp.tell()
+
+
+def main():
+    messages = make_messages(SIZE)
+    for name, func in (("json lines", json_lines), ("binary", binary)):
+        dump, load, size = func(messages)
+        print(f"{name:>10}: dump {dump * 1000:8.1f} ms  load {load * 1000:8.1f} ms  size {size / 1024 / 1024:6.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
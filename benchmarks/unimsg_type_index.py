@@ -0,0 +1,66 @@
+"""UniMessage 按类型查询的基准测试
+
+运行: python benchmarks/unimsg_type_index.py
+
+构造包含 1000 个消息段的消息 (类似合并转发展开后的内容)，
+对比基于类型索引的 has/index/get/count/only/include/__getitem__ 与逐个 isinstance 扫描的耗时。
+"""
+
+from time import perf_counter
+from typing import Callable
+
+from nonebot_plugin_alconna.uniseg import At, Text, Emoji, Image, Reply, UniMessage
+
+
+def make_message(size: int) -> UniMessage:
+    segs = []
+    for i in range(size):
+        if i % 4 == 0:
+            segs.append(Image(url=f"https://example.com/{i}.png"))
+        elif i % 4 == 1:
+            segs.append(At("user", str(i)))
+        elif i % 4 == 2:
+            segs.append(Text(f"line {i}"))
+        else:
+            segs.append(Emoji(str(i)))
+    segs.append(Reply("1"))
+    return UniMessage(segs)
+
+
+def scan_queries(msg: UniMessage):
+    any(isinstance(seg, Reply) for seg in msg)
+    next(i for i, seg in enumerate(msg) if isinstance(seg, Image))
+    UniMessage(seg for seg in msg if isinstance(seg, At))
+    len([seg for seg in msg if isinstance(seg, Emoji)])
+    all(isinstance(seg, Text) for seg in msg)
+    UniMessage(seg for seg in msg if seg.__class__ in (Image,))
+    [seg for seg in msg if isinstance(seg, Image)][-1]
+
+
+def index_queries(msg: UniMessage):
+    msg.has(Reply)
+    msg.index(Image)
+    msg.get(At)
+    msg.count(Emoji)
+    msg.only(Text)
+    msg.include(Image)
+    msg[Image, -1]
+
+
+def run(func: Callable[[UniMessage], None], msg: UniMessage, rounds: int = 200) -> float:
+    begin = perf_counter()
+    for _ in range(rounds):
+        func(msg)
+    return (perf_counter() - begin) / rounds
+
+
+def main():
+    for size in (100, 1_000, 5_000):
+        msg = make_message(size)
+        scan = run(scan_queries, msg)
+        index = run(index_queries, msg)
+        print(f"{size:>5} segments: scan {scan * 1000:7.3f} ms  index {index * 1000:7.3f} ms  ({scan / index:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -94,6 +94,7 @@ from .params import match_path as match_path
 from .rule import AlconnaRule as AlconnaRule
 from .uniseg import CustomNode as CustomNode
 from .uniseg import UniMessage as UniMessage
+from .uniseg import UniMessageBuilder as UniMessageBuilder
 from .uniseg import get_target as get_target
 from .extension import Extension as Extension
 from .extension import Interface as Interface
@@ -131,10 +132,13 @@ from .uniseg import UniversalMessage as UniversalMessage
 from .uniseg import UniversalSegment as UniversalSegment
 from .uniseg import message_reaction as message_reaction
 from .params import AlconnaExecResult as AlconnaExecResult
+from .uniseg import apply_media_store as apply_media_store
 from .params import AlconnaDuplication as AlconnaDuplication
 from .shortcut import command_from_json as command_from_json
 from .shortcut import command_from_yaml as command_from_yaml
+from .uniseg import apply_export_cache as apply_export_cache
 from .uniseg import apply_media_to_url as apply_media_to_url
+from .uniseg import apply_upload_cache as apply_upload_cache
 from .uniseg import patch_matcher_send as patch_matcher_send
 from .consts import ALCONNA_EXEC_RESULT as ALCONNA_EXEC_RESULT
 from .shortcut import commands_from_json as commands_from_json
@@ -197,6 +201,12 @@ with contextlib.suppress(ValueError, LookupError):
         load_from_path(path)
     if _config.alconna_apply_filehost:
         apply_filehost()
+    if _config.alconna_apply_upload_cache:
+        apply_upload_cache(path=_config.alconna_upload_cache_path)
+    if _config.alconna_apply_export_cache:
+        apply_export_cache()
+    if _config.alconna_media_store_quota is not None:
+        apply_media_store(_config.alconna_media_store_quota)
     if _config.alconna_enable_saa_patch:
         patch_saa()
     if _config.alconna_apply_fetch_targets:
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from contextvars import ContextVar
 from typing_extensions import Self
-from collections.abc import Iterable
+from bisect import insort, bisect_left
+from collections.abc import Iterable, Iterator
 from typing import TYPE_CHECKING, Any, Union, Literal
 
 from tarina import lang
@@ -11,11 +12,62 @@ from arclet.alconna import NullMessage
 from nepattern import MatchMode, BasePattern, MatchFailed
 from arclet.alconna.argv import Argv, argv_config, set_default_argv_type, set_namespace_argv_type
 
-from .uniseg import Text, Segment, UniMessage
+from .uniseg import Text, Segment, UniMessage, UniMessageBuilder
 
 argv_ctx: ContextVar[MessageArgv] = ContextVar("argv_ctx")
 
 
+class StyleRecord:
+    """文本样式记录，用于查询与某一区间重叠的样式
+
+    区间按长度的数量级 (`bit_length`) 分组，每组以起点排序；组内区间长度小于 `2 ** k`，
+    因此查询时每组只需二分出起点位于 (start - 2 ** k, end) 的区间，
+    横跨整条消息的长样式只会扩大其所在组的查找范围，而不会使每次查询都遍历全部区间。
+    """
+
+    __slots__ = ("groups", "styles")
+
+    def __init__(self):
+        self.styles: dict[tuple[int, int], list[str]] = {}
+        self.groups: dict[int, list[tuple[int, int]]] = {}
+
+    def __bool__(self):
+        return bool(self.styles)
+
+    def add(self, start: int, end: int, style: list[str]):
+        scale = (start, end)
+        if scale not in self.styles:
+            scales = self.groups.setdefault(max(end - start, 0).bit_length(), [])
+            if not scales or scales[-1] <= scale:
+                scales.append(scale)
+            else:
+                insort(scales, scale)
+        self.styles[scale] = style
+
+    def get(self, scale: tuple[int, int]) -> list[str] | None:
+        return self.styles.get(scale)
+
+    def overlap(self, start: int, end: int) -> Iterator[tuple[tuple[int, int], list[str]]]:
+        """按起点顺序遍历与 [start, end) 重叠的样式区间"""
+        found = []
+        merged = False
+        for bits, scales in self.groups.items():
+            lo = bisect_left(scales, (start - (1 << bits) + 1,))
+            hi = bisect_left(scales, (end,), lo)
+            if lo == hi:
+                continue
+            # 已有其他组的结果时需要重新按起点排序
+            merged = merged or bool(found)
+            for index in range(lo, hi):
+                scale = scales[index]
+                if scale[0] < scale[1] and scale[1] > start:
+                    found.append(scale)
+        if merged:
+            found.sort()
+        for scale in found:
+            yield scale, self.styles[scale]
+
+
 def _default_builder(self: MessageArgv, data: UniMessage[Segment]):
     for unit in data:
         if not isinstance(unit, Text):
@@ -30,7 +82,11 @@ class MessageArgv(Argv[UniMessage]):
 
     @staticmethod
     def generate_token(data: list) -> int:
-        return hash("".join(i.__class__.__name__ + i.__repr__() for i in data))
+        return hash(
+            tuple(
+                i if i.__class__ is str else i.structural_hash() if isinstance(i, Segment) else repr(i) for i in data
+            )
+        )
 
     def enter(self, ctx: dict[str, Any] | None = None) -> Self:
         super().enter(ctx)
@@ -58,7 +114,7 @@ class MessageArgv(Argv[UniMessage]):
         else:
             data = UniMessage(data)
         self.origin = data
-        styles = self.context.setdefault("__styles__", {"record": {}, "index": 0, "msg": ""})
+        styles = self.context.setdefault("__styles__", {"record": StyleRecord(), "index": 0, "msg": ""})
         styles["msg"] = data.extract_plain_text()
         _index = 0
         for index, unit in enumerate(data):
@@ -66,6 +122,9 @@ class MessageArgv(Argv[UniMessage]):
                 self.raw_data.append(unit)
                 self.ndata += 1
                 continue
+            # styles["msg"] 由全部文本拼接而成，当前文本的起点即之前文本的总长
+            start = _index
+            _index += len(unit.text)
             if not unit.text.strip():
                 if not index or index == len(data) - 1:
                     continue
@@ -84,9 +143,8 @@ class MessageArgv(Argv[UniMessage]):
                 self.raw_data.append(text)
                 self.ndata += 1
 
-            start = styles["msg"].find(text, _index)
             for scale, style in _styles.items():
-                styles["record"][(start + scale[0], start + scale[1])] = style
+                styles["record"].add(start + scale[0], start + scale[1], style)
         if self.ndata < 1:
             raise NullMessage(lang.require("argv", "null_message").format(target=data))
         self.bak_data = self.raw_data.copy()
@@ -145,19 +203,13 @@ class _Text(BasePattern[Text, Union[str, Text], Literal[MatchMode.TYPE_CONVERT]]
         start = styles["msg"].find(x, styles["index"])
         if start == -1:
             return Text(x)
-        styles["index"] = start + len(x)
-        if maybe := styles["record"].get((start, styles["index"])):
+        end = styles["index"] = start + len(x)
+        record: StyleRecord = styles["record"]
+        if maybe := record.get((start, end)):
             return Text(x, {(0, len(x)): maybe})
         _styles = {}
-        for scale, style in styles["record"].items():
-            if start <= scale[0] < styles["index"] <= scale[1]:
-                _styles[(scale[0] - start, styles["index"] - start)] = style
-            elif scale[0] <= start < scale[1] <= styles["index"]:
-                _styles[(0, scale[1] - start)] = style
-            elif start <= scale[0] < scale[1] <= styles["index"]:
-                _styles[(scale[0] - start, scale[1] - start)] = style
-            elif scale[0] <= start < styles["index"] <= scale[1]:
-                _styles[(0, styles["index"] - start)] = style
+        for scale, style in record.overlap(start, end):
+            _styles[(max(scale[0], start) - start, min(scale[1], end) - start)] = style
         return Text(x, _styles)
 
     def match(self, input_: str | Text) -> Text:
@@ -174,14 +226,10 @@ text = _Text()
 def converter(data: str | list[str | Segment]) -> UniMessage:
     if isinstance(data, str):
         return UniMessage(data)
-    msg = UniMessage()
+    builder = UniMessageBuilder()
     for i in data:
-        if isinstance(i, str):
-            msg.append(text.match(i))
-        else:
-            msg.append(i)
-    msg.__merge_text__()
-    return msg
+        builder.append(text.match(i) if isinstance(i, str) else i)
+    return builder.build()
 
 
 argv_config(MessageArgv, converter=converter)
@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-from tarina import LRU
 from nonebot.typing import T_State
 from nonebot.adapters.onebot.v11 import Message
 from nonebot.internal.adapter import Bot, Event
 from nonebot.adapters.onebot.v11 import Event as OneBot11Event
 
 from nonebot_plugin_alconna.extension import cache_msg
-from nonebot_plugin_alconna import Extension, UniMessage, get_message_id
+from nonebot_plugin_alconna import Extension, UniMessage
+from nonebot_plugin_alconna.cache import MessageCache, message_key, get_message_cache
 
 
 class MessageSentExtension(Extension):
@@ -25,7 +25,9 @@ class MessageSentExtension(Extension):
         >>> add_global_extension(MessageSentExtension())
     """
 
-    cache: LRU[str, UniMessage] = LRU(20)
+    @property
+    def cache(self) -> MessageCache[UniMessage]:
+        return get_message_cache("builtins.extensions.onebot11:MessageSentExtension")
 
     @property
     def priority(self) -> int:
@@ -42,13 +44,12 @@ class MessageSentExtension(Extension):
         self, event: Event, state: T_State, bot: Bot, use_origin: bool = False
     ) -> UniMessage | None:
         if event.get_type() == "message_sent" and hasattr(event, "message"):
-            msg_id = get_message_id(event, bot)
-            if use_origin and cache_msg and (uni_msg := self.cache.get(msg_id)) is not None:
-                return uni_msg
-            if cache_msg and (uni_msg := self.cache.get(msg_id)) is not None:
+            key = message_key(event, bot)
+            cache = self.cache
+            if cache_msg and (uni_msg := cache.get(key)) is not None:
                 return uni_msg
             msg = Message._validate(event.message)  # type: ignore
             uni_msg = UniMessage.generate_without_reply(message=msg, bot=bot)
-            self.cache[msg_id] = uni_msg
+            cache.set(key, uni_msg)
             return uni_msg
         return None
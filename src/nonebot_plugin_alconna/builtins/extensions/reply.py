@@ -6,6 +6,7 @@ from nonebot.internal.adapter import Bot, Event
 
 from nonebot_plugin_alconna.extension import cache_msg
 from nonebot_plugin_alconna import Reply, Extension, UniMessage
+from nonebot_plugin_alconna.cache import MessageCache, message_key, get_message_cache
 from nonebot_plugin_alconna.uniseg import reply_fetch, get_message_id
 
 
@@ -77,7 +78,9 @@ class ReplyMergeExtension(Extension):
         self.add_left = add_left
         self.sep = sep
 
-    cache: "LRU[str, UniMessage]" = LRU(20)
+    @property
+    def cache(self) -> "MessageCache[UniMessage]":
+        return get_message_cache("builtins.extensions.reply:ReplyMergeExtension")
 
     @property
     def priority(self) -> int:
@@ -94,11 +97,12 @@ class ReplyMergeExtension(Extension):
             msg = event.get_message()
         except (NotImplementedError, ValueError):
             return None
-        msg_id = get_message_id(event, bot)
-        if cache_msg and msg_id in self.cache:
-            return self.cache[msg_id]
+        key = message_key(event, bot)
+        cache = self.cache
+        if cache_msg and (uni_msg := cache.get(key)) is not None:
+            return uni_msg
         uni_msg = UniMessage.generate_sync(message=msg, bot=bot)
-        self.cache[msg_id] = uni_msg
+        cache.set(key, uni_msg)
         if not (reply := await reply_fetch(event, bot)):
             return uni_msg
         if not reply.msg:
@@ -110,11 +114,11 @@ class ReplyMergeExtension(Extension):
         if self.add_left:
             uni_msg_reply += self.sep
             uni_msg_reply.extend(uni_msg)
-            self.cache[msg_id] = uni_msg_reply
+            cache.set(key, uni_msg_reply)
             return uni_msg_reply
         uni_msg += self.sep
         uni_msg.extend(uni_msg_reply)
-        self.cache[msg_id] = uni_msg
+        cache.set(key, uni_msg)
         return uni_msg
 
 
@@ -1,11 +1,11 @@
 import random
 from typing import Any, Callable, ClassVar, Optional
 
-from tarina import LRU
 from arclet.alconna import Alconna
 from nonebot.internal.adapter import Bot, Event
 
-from nonebot_plugin_alconna import Target, Extension, UniMessage, get_target, get_message_id
+from nonebot_plugin_alconna import Target, Extension, UniMessage, get_target
+from nonebot_plugin_alconna.cache import MessageCache, message_key, get_message_cache
 
 
 class PrefixAppendExtension(Extension):
@@ -23,7 +23,10 @@ class PrefixAppendExtension(Extension):
     prefixes: list[str]
     command: str
     sep: str
-    cache: "LRU[str, UniMessage]" = LRU(20)
+
+    @property
+    def cache(self) -> "MessageCache[UniMessage]":
+        return get_message_cache("builtins.plugins.with.extension:PrefixAppendExtension")
 
     def post_init(self, alc: Alconna) -> None:
         self.prefixes = [pf for pf in alc.prefixes if isinstance(pf, str)]
@@ -31,13 +34,14 @@ class PrefixAppendExtension(Extension):
         self.sep = alc.separators[0]
 
     async def receive_wrapper(self, bot: Bot, event: Event, command: Alconna, receive: UniMessage) -> UniMessage:
-        msg_id = get_message_id(event, bot)
-        if msg_id in self.cache:
-            return self.cache[msg_id]
+        key = message_key(event, bot)
+        cache = self.cache
+        if (res := cache.get(key)) is not None:
+            return res
         target = get_target(event, bot)
         prefix = self.supplier(target)
         if not prefix or not command.header_display.endswith(prefix):
             return receive
         res = UniMessage.text(random.choice(self.prefixes) + prefix + self.sep) + receive
-        self.cache[msg_id] = res
+        cache.set(key, res)
         return res
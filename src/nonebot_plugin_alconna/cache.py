@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from time import monotonic
+from dataclasses import dataclass
+from collections import OrderedDict
+from abc import ABCMeta, abstractmethod
+from typing import Any, Generic, TypeVar, Callable, Optional
+
+from nonebot import get_plugin_config
+from nonebot.adapters import Bot, Event
+
+from .config import Config
+from .uniseg import get_message_id
+
+T = TypeVar("T")
+MessageKey = tuple[str, str, str]
+
+
+@dataclass
+class CacheStats:
+    """缓存统计信息"""
+
+    hits: int = 0
+    """命中次数"""
+    misses: int = 0
+    """未命中次数"""
+    evictions: int = 0
+    """因容量不足被淘汰的条目数"""
+    expirations: int = 0
+    """因过期被移除的条目数"""
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class MessageCache(Generic[T], metaclass=ABCMeta):
+    """已解析消息的缓存
+
+    参数:
+        name: 缓存名称
+        capacity: 缓存容量
+        ttl: 缓存条目的存活时间 (秒)，为 None 时不过期
+    """
+
+    def __init__(self, name: str, capacity: int, ttl: float | None = None):
+        self.name = name
+        self.capacity = capacity
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    @abstractmethod
+    def get(self, key: MessageKey) -> T | None:
+        """获取缓存的值，不存在或已过期时返回 None"""
+
+    @abstractmethod
+    def set(self, key: MessageKey, value: T) -> None:
+        """写入缓存"""
+
+    @abstractmethod
+    def pop(self, key: MessageKey) -> T | None:
+        """移除缓存条目"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """清空缓存"""
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    def __contains__(self, key: MessageKey) -> bool:
+        return self.get(key) is not None
+
+    def __getitem__(self, key: MessageKey) -> T:
+        if (value := self.get(key)) is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: MessageKey, value: T) -> None:
+        self.set(key, value)
+
+
+class MemoryMessageCache(MessageCache[T]):
+    """基于 LRU 淘汰策略的内存缓存"""
+
+    def __init__(self, name: str, capacity: int, ttl: float | None = None):
+        super().__init__(name, capacity, ttl)
+        self._data: OrderedDict[MessageKey, tuple[float, T]] = OrderedDict()
+
+    def get(self, key: MessageKey) -> T | None:
+        if (item := self._data.get(key)) is None:
+            self.stats.misses += 1
+            return None
+        if self.ttl is not None and monotonic() - item[0] > self.ttl:
+            del self._data[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return item[1]
+
+    def set(self, key: MessageKey, value: T) -> None:
+        self._data[key] = (monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def pop(self, key: MessageKey) -> T | None:
+        if (item := self._data.pop(key, None)) is None:
+            return None
+        return item[1]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+CacheFactory = Callable[[str, int, Optional[float]], MessageCache[Any]]
+
+_factory: CacheFactory = MemoryMessageCache
+_caches: dict[str, MessageCache[Any]] = {}
+
+
+def _load_config() -> tuple[int, float | None]:
+    try:
+        config = get_plugin_config(Config)
+    except ValueError:
+        return 128, None
+    return config.alconna_message_cache_size, config.alconna_message_cache_ttl
+
+
+def set_cache_factory(factory: CacheFactory) -> None:
+    """设置消息缓存的实现，已创建的缓存会被替换为新的实现
+
+    参数:
+        factory: 接收缓存名称、容量与存活时间并返回缓存对象的函数
+    """
+    global _factory  # noqa: PLW0603
+
+    _factory = factory
+    for name, cache in _caches.items():
+        _caches[name] = factory(name, cache.capacity, cache.ttl)
+
+
+def get_message_cache(name: str) -> MessageCache[Any]:
+    """获取指定名称的消息缓存，不存在时依据配置创建
+
+    参数:
+        name: 缓存名称
+    """
+    if name not in _caches:
+        _caches[name] = _factory(name, *_load_config())
+    return _caches[name]
+
+
+def cache_stats() -> dict[str, CacheStats]:
+    """获取所有消息缓存的统计信息"""
+    return {name: cache.stats for name, cache in _caches.items()}
+
+
+def message_key(event: Event, bot: Bot) -> MessageKey:
+    """生成消息缓存的键；消息 id 在不同 bot 之间可能重复，因此同时包含适配器名称与 bot id"""
+    return bot.adapter.get_name(), bot.self_id, get_message_id(event, bot)
@@ -35,6 +35,18 @@ class Config(BaseModel):
     alconna_apply_filehost: bool = False
     """是否启用文件托管"""
 
+    alconna_apply_upload_cache: bool = False
+    """是否启用媒体上传缓存"""
+
+    alconna_upload_cache_path: Optional[str] = None
+    """媒体上传缓存的持久化文件路径，None 为仅缓存在内存中"""
+
+    alconna_apply_export_cache: bool = False
+    """是否启用已转换消息的缓存"""
+
+    alconna_media_store_quota: Optional[int] = None
+    """保存媒体文件的目录的空间配额 (字节)，超出时淘汰最近最少访问的文件，None 为不限制"""
+
     alconna_apply_fetch_targets: bool = False
     """是否启动时拉取一次发送对象列表"""
 
@@ -49,3 +61,12 @@ class Config(BaseModel):
 
     alconna_cache_message: bool = True
     """是否缓存已解析的消息"""
+
+    alconna_message_cache_size: int = 128
+    """已解析消息缓存的容量"""
+
+    alconna_message_cache_ttl: Optional[float] = None
+    """已解析消息缓存的存活时间 (秒)，None 为不过期"""
+
+    alconna_head_index: bool = True
+    """是否启用共享的命令头索引，以便在命令头必定不匹配时跳过解析"""
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import re
+from functools import wraps
+from weakref import ref, finalize
+from typing import TYPE_CHECKING, Any
+
+from tarina import LRU
+from arclet.alconna import Alconna, command_manager
+from arclet.alconna.typing import InnerShortcutArgs
+
+from .uniseg import Text, UniMessage
+
+if TYPE_CHECKING:
+    from arclet.alconna._internal._header import Header
+
+_END = ""
+_META = frozenset(".^$*+?{}[]|()")
+_OPTIONAL = frozenset("?*{")
+
+
+def _literal_prefix(pattern: str, flags: int = 0) -> str:
+    """提取正则表达式必定匹配的字面量前缀，无法确定时返回空字符串"""
+    if flags & re.IGNORECASE:
+        return ""
+    atoms: list[str] = []
+    index = 0
+    length = len(pattern)
+    stopped = False
+    while index < length:
+        char = pattern[index]
+        if char == "\\":
+            if index + 1 >= length:
+                return ""
+            nxt = pattern[index + 1]
+            if nxt.isalnum():
+                stopped = True
+                index += 2
+                continue
+            if not stopped:
+                atoms.append(nxt)
+            index += 2
+            continue
+        if char == "|":
+            # 顶层或分组内的分支都会让前缀失效
+            return ""
+        if char in _META and not stopped:
+            if char in _OPTIONAL and atoms:
+                atoms.pop()
+            stopped = True
+        elif not stopped:
+            atoms.append(char)
+        index += 1
+    return "".join(atoms)
+
+
+def _head_text(message: UniMessage) -> str | None:
+    """获取消息的首个文本片段；若消息以非文本元素开头则返回 None"""
+    for seg in message:
+        if not isinstance(seg, Text):
+            return None
+        if text := seg.text.lstrip():
+            return text
+    return ""
+
+
+class _ShortcutVersion:
+    value = 0
+    """快捷指令的版本，command_manager 每次增删、加载快捷指令后递增"""
+
+
+def _track_shortcuts():
+    def _wrap(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                _ShortcutVersion.value += 1
+
+        return wrapper
+
+    for name in ("add_shortcut", "delete_shortcut", "load_shortcuts", "load_cache"):
+        setattr(command_manager, name, _wrap(getattr(command_manager, name)))
+
+
+_track_shortcuts()
+
+
+class _Entry:
+    __slots__ = ("header", "heads", "meta", "version")
+
+    def __init__(self, header: Header | None, meta: tuple, version: int, heads: frozenset[str] | None):
+        self.header = header
+        self.meta = meta
+        self.version = version
+        self.heads = heads
+
+
+class HeadIndex:
+    """所有 AlconnaRule 共享的命令头索引
+
+    以命令的前缀、命令名与快捷指令的字面量前缀构建前缀树；
+    对于同一条消息只需遍历一次前缀树，即可得知哪些命令的头部可能匹配。
+
+    无法静态确定头部的命令（正则/类型头部、模糊匹配、上下文插值等）会被视为通配，总是交由 Alconna 完整解析。
+    """
+
+    def __init__(self, memo_size: int = 64):
+        self._entries: dict[int, _Entry] = {}
+        self._trie: dict[str, Any] = {}
+        self._wildcards: set[int] = set()
+        self._max_length = 0
+        self._memo: LRU[str, frozenset[int]] = LRU(memo_size)
+        self._dirty = False
+
+    @staticmethod
+    def _header(command: Alconna) -> Header | None:
+        try:
+            return command_manager.require(command).command_header
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _heads(command: Alconna, header: Header | None) -> frozenset[str] | None:
+        if header is None or header.flag != 0:
+            return None
+        if command.meta.fuzzy_match or command.meta.context_style:
+            return None
+        heads: set[str] = set(header.content)  # type: ignore
+        for key, args in command_manager.get_shortcut(command).items():
+            if isinstance(args, InnerShortcutArgs):
+                keys = [f"{re.escape(prefix)}{args.origin_key}" for prefix in args.prefixes] or [args.origin_key]
+                flags = int(args.flags)
+            else:
+                keys = [key]
+                flags = 0
+            heads.update(_literal_prefix(k, flags) for k in keys)
+        if _END in heads:
+            return None
+        return frozenset(heads)
+
+    def register(self, command: Alconna) -> None:
+        """登记或刷新命令的头部信息"""
+        key = id(command)
+        header = self._header(command)
+        meta = (command.meta.fuzzy_match, command.meta.context_style)
+        if key not in self._entries:
+            finalize(command, self._discard, key, ref(self))
+        self._entries[key] = _Entry(header, meta, _ShortcutVersion.value, self._heads(command, header))
+        self._dirty = True
+
+    @staticmethod
+    def _discard(key: int, index: ref[HeadIndex]):
+        if (self := index()) is not None and self._entries.pop(key, None) is not None:
+            self._dirty = True
+
+    def invalidate(self, command: Alconna | None = None) -> None:
+        """使命令 (或全部命令) 的头部信息失效，下次检查时重新计算"""
+        if command is None:
+            for entry in self._entries.values():
+                entry.version = -1
+        elif (entry := self._entries.get(id(command))) is not None:
+            entry.version = -1
+        self._dirty = True
+
+    def _rebuild(self) -> None:
+        self._trie = {}
+        self._wildcards = set()
+        self._max_length = 0
+        self._memo.clear()
+        for key, entry in self._entries.items():
+            if entry.heads is None:
+                self._wildcards.add(key)
+                continue
+            for head in entry.heads:
+                node = self._trie
+                for char in head:
+                    node = node.setdefault(char, {})
+                node.setdefault(_END, set()).add(key)
+                self._max_length = max(self._max_length, len(head))
+        self._dirty = False
+
+    def candidates(self, message: UniMessage) -> frozenset[int]:
+        """获取头部可能与该消息匹配的命令集合"""
+        if self._dirty:
+            self._rebuild()
+        if (text := _head_text(message)) is None:
+            return frozenset(self._wildcards)
+        text = text[: self._max_length]
+        if (res := self._memo.get(text)) is not None:
+            return res
+        result = set(self._wildcards)
+        node = self._trie
+        for char in text:
+            if (node := node.get(char)) is None:
+                break
+            if ends := node.get(_END):
+                result.update(ends)
+        self._memo[text] = res = frozenset(result)
+        return res
+
+    def check(self, command: Alconna, message: UniMessage) -> bool:
+        """检查命令的头部是否可能匹配该消息，返回 False 时命令必定无法匹配"""
+        # 只做常数时间的比较：命令头是否重新编译、快捷指令是否变动、影响头部的元数据是否修改
+        entry = self._entries.get(id(command))
+        if (
+            entry is None
+            or entry.version != _ShortcutVersion.value
+            or entry.header is not self._header(command)
+            or entry.meta != (command.meta.fuzzy_match, command.meta.context_style)
+        ):
+            self.register(command)
+        return id(command) in self.candidates(message)
+
+
+head_index = HeadIndex()
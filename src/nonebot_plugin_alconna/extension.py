@@ -2,22 +2,26 @@ from __future__ import annotations
 
 import re
 import asyncio
+import warnings
 import functools
 import importlib as imp
 from weakref import finalize
-from dataclasses import dataclass
+from dataclasses import field, dataclass
 from abc import ABCMeta, abstractmethod
 from typing import TYPE_CHECKING, Any, Union, Generic, Literal, TypeVar, ClassVar
 
-from tarina import LRU, lang
+from tarina import lang
 from nonebot.typing import T_State
 from nonebot import get_plugin_config
 from arclet.alconna import Alconna, Arparma
 from nonebot.compat import PydanticUndefined
 from nonebot.adapters import Bot, Event, Message
+from nonebot.internal.matcher import current_bot
 
 from .config import Config
-from .uniseg import UniMessage, get_message_id
+from .uniseg import UniMessage
+from .cache import message_key, get_message_cache
+from .uniseg.functions import event_cache
 
 OutputType = Literal["help", "shortcut", "completion", "error"]
 TM = TypeVar("TM", bound=Union[str, Message, UniMessage])
@@ -55,6 +59,7 @@ class Extension(metaclass=ABCMeta):
             "context_provider": cls.context_provider != Extension.context_provider,
             "parse_wrapper": cls.parse_wrapper != Extension.parse_wrapper,
             "catch": cls.catch != Extension.catch and cls.before_catch != Extension.before_catch,
+            "validate": cls.validate != Extension.validate,
         }
 
     @property
@@ -132,21 +137,102 @@ class DefaultExtension(Extension):
 
 _callbacks = set()
 
-unimsg_cache: LRU[str, UniMessage] = LRU(16)
-unimsg_origin_cache: LRU[str, UniMessage] = LRU(16)
+
+class _LegacyMessageCache:
+    """以消息 id 为键访问消息缓存，兼容旧的 `unimsg_cache`/`unimsg_origin_cache`
+
+    消息缓存的键还包含适配器名称与 bot id，此处取自当前上下文中的 bot；不在事件处理过程中时视为未命中。
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _key(self, msg_id: str):
+        try:
+            bot = current_bot.get()
+        except LookupError:
+            return None
+        return bot.adapter.get_name(), bot.self_id, msg_id
+
+    def get(self, msg_id: str, default: Any = None) -> Any:
+        if (key := self._key(msg_id)) is None:
+            return default
+        value = get_message_cache(self.name).get(key)
+        return default if value is None else value
+
+    def __getitem__(self, msg_id: str) -> UniMessage:
+        if (value := self.get(msg_id)) is None:
+            raise KeyError(msg_id)
+        return value
+
+    def __setitem__(self, msg_id: str, value: UniMessage) -> None:
+        if (key := self._key(msg_id)) is not None:
+            get_message_cache(self.name).set(key, value)
+
+    def __contains__(self, msg_id: str) -> bool:
+        return self.get(msg_id) is not None
+
+    def pop(self, msg_id: str, default: Any = None) -> Any:
+        if (key := self._key(msg_id)) is None or (value := get_message_cache(self.name).pop(key)) is None:
+            return default
+        return value
+
+    def clear(self) -> None:
+        get_message_cache(self.name).clear()
+
+    def __len__(self) -> int:
+        return len(get_message_cache(self.name))
+
+
+_LEGACY_CACHES = {"unimsg_cache": "message", "unimsg_origin_cache": "origin_message"}
+
+
+def __getattr__(name: str):
+    if name in _LEGACY_CACHES:
+        warnings.warn(
+            f"`{name}` is deprecated, use `get_message_cache({_LEGACY_CACHES[name]!r})` instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return _LegacyMessageCache(_LEGACY_CACHES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+HOOKS = (
+    "message_provider",
+    "output_converter",
+    "send_wrapper",
+    "receive_wrapper",
+    "permission_check",
+    "context_provider",
+    "parse_wrapper",
+    "catch",
+)
 
 
 @dataclass
 class SelectedExtensions:
     context: list[Extension]
 
+    def __post_init__(self):
+        self.compile()
+
+    def compile(self) -> None:
+        """预先计算每个钩子所需调用的扩展"""
+        self._hooks: dict[str, list[Extension]] = {
+            hook: [ext for ext in self.context if ext._overrides[hook]] for hook in HOOKS
+        }
+
+    @property
+    def rewrite_receive(self) -> bool:
+        """是否存在会改写接收消息的扩展"""
+        return bool(self._hooks["receive_wrapper"])
+
     async def message_provider(
         self, event: Event, state: T_State, bot: Bot, use_origin: bool = False
     ) -> UniMessage | None:
         exc = None
-        for ext in self.context:
-            if not ext._overrides["message_provider"]:
-                continue
+        for ext in self._hooks["message_provider"]:
             try:
                 if (msg1 := await ext.message_provider(event, state, bot, use_origin)) is not None:
                     return msg1
@@ -155,59 +241,63 @@ class SelectedExtensions:
         if exc is not None:
             raise exc
         if event.get_type() == "message":
-            msg_id = get_message_id(event, bot)
-            if use_origin and cache_msg and (uni_msg := unimsg_origin_cache.get(msg_id)) is not None:
+            cache = event_cache(event) if cache_msg else {}
+            if (uni_msg := cache.get("message")) is None:
+                key = message_key(event, bot)
+                unimsg_cache = get_message_cache("message")
+                if not cache_msg or (uni_msg := unimsg_cache.get(key)) is None:
+                    uni_msg = UniMessage.generate_without_reply(message=event.get_message(), bot=bot, lazy=True)
+                    unimsg_cache.set(key, uni_msg)
+                cache["message"] = uni_msg
+            if not use_origin:
                 return uni_msg
-            if cache_msg and (uni_msg := unimsg_cache.get(msg_id)) is not None:
-                return uni_msg
-            msg = event.get_message()
-            uni_msg = UniMessage.generate_without_reply(message=msg, bot=bot)
-            unimsg_cache[msg_id] = uni_msg
-            if (ori_msg := getattr(event, "original_message", None)) is not None:
-                ori_uni_msg = UniMessage.generate_without_reply(message=ori_msg, bot=bot)
-                unimsg_origin_cache[msg_id] = ori_uni_msg
-                if use_origin:
-                    return ori_uni_msg
-            return uni_msg
+            if (ori_uni_msg := cache.get("origin_message")) is None:
+                if (ori_msg := getattr(event, "original_message", None)) is None:
+                    ori_uni_msg = uni_msg
+                else:
+                    key = message_key(event, bot)
+                    unimsg_origin_cache = get_message_cache("origin_message")
+                    if not cache_msg or (ori_uni_msg := unimsg_origin_cache.get(key)) is None:
+                        ori_uni_msg = UniMessage.generate_without_reply(message=ori_msg, bot=bot, lazy=True)
+                        unimsg_origin_cache.set(key, ori_uni_msg)
+                cache["origin_message"] = ori_uni_msg
+            return ori_uni_msg
         return None
 
     async def receive_wrapper(self, bot: Bot, event: Event, command: Alconna, receive: UniMessage) -> UniMessage:
         res = receive
-        for ext in self.context:
-            if ext._overrides["receive_wrapper"]:
-                res = await ext.receive_wrapper(bot, event, command, res)
+        for ext in self._hooks["receive_wrapper"]:
+            res = await ext.receive_wrapper(bot, event, command, res)
         return res
 
     async def permission_check(self, bot: Bot, event: Event, command: Alconna) -> bool:
-        for ext in self.context:
-            if ext._overrides["permission_check"]:
-                if await ext.permission_check(bot, event, command) is False:
-                    return False
-                continue
+        for ext in self._hooks["permission_check"]:
+            if await ext.permission_check(bot, event, command) is False:
+                return False
         return True
 
     async def context_provider(self, event: Event, bot: Bot, state: T_State) -> dict[str, Any]:
         ctx = {}
-        for ext in self.context:
-            if ext._overrides["context_provider"]:
-                ctx = await ext.context_provider(ctx, event, bot, state)
-        ctx["event"] = event
-        ctx["bot.self_id"] = bot.self_id
-        if (platform := hasattr("bot", "platform")) and isinstance(platform, str):
-            ctx["bot.platform"] = platform
-        ctx["adapter.name"] = bot.adapter.get_name()
+        for ext in self._hooks["context_provider"]:
+            ctx = await ext.context_provider(ctx, event, bot, state)
+        cache = event_cache(event)
+        if (base := cache.get("context")) is None:
+            base = {"event": event, "bot.self_id": bot.self_id}
+            if (platform := getattr(bot, "platform", None)) and isinstance(platform, str):
+                base["bot.platform"] = platform
+            base["adapter.name"] = bot.adapter.get_name()
+            cache["context"] = base
+        # 解析过程会向上下文写入数据，因此每次都返回新的字典
+        ctx.update(base)
         return ctx
 
     async def parse_wrapper(self, bot: Bot, state: T_State, event: Event, res: Arparma) -> None:
-        await asyncio.gather(
-            *(ext.parse_wrapper(bot, state, event, res) for ext in self.context if ext._overrides["parse_wrapper"])
-        )
+        if hooks := self._hooks["parse_wrapper"]:
+            await asyncio.gather(*(ext.parse_wrapper(bot, state, event, res) for ext in hooks))
 
     async def output_converter(self, output_type: OutputType, content: str) -> UniMessage:
         exc = None
-        for ext in self.context:
-            if not ext._overrides["output_converter"]:
-                continue
+        for ext in self._hooks["output_converter"]:
             try:
                 return await ext.output_converter(output_type, content)
             except Exception as e:
@@ -218,12 +308,20 @@ class SelectedExtensions:
 
     async def send_wrapper(self, bot: Bot, event: Event, send: TM) -> TM:
         res = send
-        for ext in self.context:
-            if ext._overrides["send_wrapper"]:
-                res = await ext.send_wrapper(bot, event, res)
+        for ext in self._hooks["send_wrapper"]:
+            res = await ext.send_wrapper(bot, event, res)
         return res
 
 
+@dataclass
+class _Chain:
+    static: set[Extension]
+    """无需逐事件校验即可确定启用的扩展"""
+    dynamic: list[Extension]
+    """自定义了 validate 而需逐事件校验的扩展"""
+    selected: dict[tuple[bool, ...], SelectedExtensions] = field(default_factory=dict)
+
+
 class ExtensionExecutor(SelectedExtensions):
     globals: ClassVar[list[type[Extension] | Extension]] = [DefaultExtension()]
     _rule: AlconnaRule
@@ -258,6 +356,8 @@ class ExtensionExecutor(SelectedExtensions):
         ]
         self.context = self.extensions
         self._rule = rule
+        self._chains: dict[tuple[str, type[Event], str], _Chain] = {}
+        self.compile()
 
         _callbacks.add(self._callback)
 
@@ -273,27 +373,40 @@ class ExtensionExecutor(SelectedExtensions):
                 continue
             self.extensions.append(_ext)
             _ext.post_init(self._rule.command())  # type: ignore
+        self.compile()
+        self._chains.clear()
+
+    def _compile_chain(self, event: Event) -> _Chain:
+        static = set()
+        dynamic = []
+        for ext in self.extensions:
+            if ext._overrides["validate"]:
+                dynamic.append(ext)
+            elif Extension.validate(ext, None, event):  # type: ignore
+                static.add(ext)
+        return _Chain(static, dynamic)
 
     def select(self, bot: Bot, event: Event) -> SelectedExtensions:
-        context = [ext for ext in self.extensions if ext.validate(bot, event)]
-        context.sort(key=lambda ext: ext.priority)
-        return SelectedExtensions(context)
+        key = (bot.adapter.get_name(), event.__class__, event.get_type())
+        if (chain := self._chains.get(key)) is None:
+            chain = self._chains[key] = self._compile_chain(event)
+        mask = tuple(ext.validate(bot, event) for ext in chain.dynamic)
+        if (selected := chain.selected.get(mask)) is None:
+            accepted = chain.static.union(ext for ext, ok in zip(chain.dynamic, mask) if ok)
+            context = [ext for ext in self.extensions if ext in accepted]
+            context.sort(key=lambda ext: ext.priority)
+            selected = chain.selected[mask] = SelectedExtensions(context)
+        return selected
 
     def before_catch(self, name: str, annotation: Any, default: Any) -> bool:
-        for ext in self.extensions:
-            if ext._overrides["catch"]:
-                if ext.before_catch(name, annotation, default):
-                    return True
-                continue
-        return False
+        return any(ext.before_catch(name, annotation, default) for ext in self._hooks["catch"])
 
     async def catch(self, event: Event, state: T_State, name: str, annotation: Any, default: Any):
-        for ext in self.extensions:
-            if ext._overrides["catch"]:
-                res = await ext.catch(Interface(event, state, name, annotation, default))
-                if res is None:
-                    continue
-                return res
+        for ext in self._hooks["catch"]:
+            res = await ext.catch(Interface(event, state, name, annotation, default))
+            if res is None:
+                continue
+            return res
         return PydanticUndefined
 
     def post_init(self, command: Alconna) -> None:
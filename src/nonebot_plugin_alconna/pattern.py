@@ -86,14 +86,14 @@ def select(
                 res = seg.validate(s)
                 if res.success:
                     yield res.value()
-                yield from query(s.children)
+                yield from query(s._children)
 
         def converter(self, _seg: Segment):
             results = []
             _res = seg.validate(_seg)
             if _res.success:
                 results.append(_res.value())
-            results.extend(query(_seg.children))
+            results.extend(query(_seg._children))
             if not results:
                 return None
             return results
@@ -105,13 +105,13 @@ def select(
             for s in segs:
                 if isinstance(s, _type):
                     yield s
-                yield from query1(s.children)
+                yield from query1(s._children)
 
         def converter(self, _seg: Segment):
             results = []
             if isinstance(_seg, _type):
                 results.append(_seg)
-            results.extend(query1(_seg.children))
+            results.extend(query1(_seg._children))
             if not results:
                 return None
             return results
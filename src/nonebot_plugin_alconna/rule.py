@@ -16,6 +16,7 @@ from arclet.alconna import Alconna, Arparma, CompSession, output_manager, comman
 
 from .i18n import Lang
 from .config import Config
+from .dispatch import head_index
 from .uniseg import UniMsg, UniMessage
 from .model import CompConfig, CommandResult
 from .uniseg.constraint import UNISEG_MESSAGE
@@ -69,6 +70,7 @@ class AlconnaRule:
         "executor",
         "response_self",
         "skip",
+        "use_index",
         "use_origin",
     )
 
@@ -128,12 +130,14 @@ class AlconnaRule:
                 with command_manager.update(command):
                     command.meta.context_style = config.alconna_context_style
             self.use_origin = config.alconna_use_origin if use_origin is None else use_origin
+            self.use_index = config.alconna_head_index
         except ValidationError:
             raise
         except ValueError:
             self.auto_send = True if auto_send_output is None else auto_send_output
             self.response_self = False if response_self is None else response_self
             self.use_origin = False if use_origin is None else use_origin
+            self.use_index = True
 
         def _update(cmd_id: int):
             try:
@@ -148,6 +152,8 @@ class AlconnaRule:
         self.skip = skip_for_unmatch
         self.executor = ExtensionExecutor(self, extensions, exclude_ext)
         self.executor.post_init(command)
+        if self.use_index:
+            head_index.register(command)
         self._path = command.path
         self._namespace = command.namespace
         self._tasks: dict[str, asyncio.Task] = {}
@@ -289,6 +295,8 @@ class AlconnaRule:
             return False
         if command_manager.is_disable(cmd):
             return False
+        if self.use_index and not selected.rewrite_receive and not head_index.check(cmd, msg):
+            return False
         msg = await selected.receive_wrapper(bot, event, cmd, msg)
         Arparma._additional.update(bot=lambda: bot, event=lambda: event, state=lambda: state)
         state[UNISEG_MESSAGE] = msg
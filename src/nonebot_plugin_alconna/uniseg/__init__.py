@@ -1,5 +1,6 @@
 import asyncio
-from typing import Callable
+from pathlib import Path
+from typing import Union, Callable, Optional
 from typing_extensions import TypeAlias
 
 from nonebot.adapters import Bot
@@ -26,6 +27,7 @@ from .segment import Voice as Voice
 from .params import UniMsg as UniMsg
 from .target import SCOPES as SCOPES
 from .target import Target as Target
+from .segment import slotted as slotted
 from .segment import Button as Button
 from .tools import get_bot as get_bot
 from .fallback import FORBID as FORBID
@@ -40,6 +42,8 @@ from .params import MessageId as MessageId
 from .params import MsgTarget as MsgTarget
 from .segment import Reference as Reference
 from .message import UniMessage as UniMessage
+from .message import LazyUniMessage as LazyUniMessage
+from .message import UniMessageBuilder as UniMessageBuilder
 from .segment import CustomNode as CustomNode
 from .tools import image_fetch as image_fetch
 from .tools import reply_fetch as reply_fetch
@@ -51,11 +55,13 @@ from .segment import custom_handler as custom_handler
 from .functions import get_message_id as get_message_id
 from .functions import message_recall as message_recall
 from .segment import custom_register as custom_register
+from .broadcast import set_rate_limit as set_rate_limit
 from .constraint import SupportAdapter as SupportAdapter
 from .fallback import FallbackMessage as FallbackMessage
 from .fallback import FallbackSegment as FallbackSegment
 from .params import UniversalMessage as UniversalMessage
 from .params import UniversalSegment as UniversalSegment
+from .broadcast import BroadcastResult as BroadcastResult
 from .constraint import SerializeFailed as SerializeFailed
 from .fallback import FallbackStrategy as FallbackStrategy
 from .functions import message_reaction as message_reaction
@@ -102,10 +108,58 @@ def apply_filehost() -> _Dispose:
     return apply()
 
 
+def apply_upload_cache(
+    capacity: int = 1024,
+    ttl: Optional[float] = 86400,
+    path: Union[str, Path, None] = None,
+    max_size: Optional[int] = None,
+) -> _Dispose:
+    """启用媒体上传缓存，相同内容在同一 bot 下只会上传一次
+
+    参数:
+        capacity: 最多缓存的条目数
+        ttl: 条目的存活时间 (秒)，为 None 时不过期
+        path: 持久化文件路径，为 None 时仅缓存在内存中
+        max_size: 所有条目序列化后占用的字节数上限，为 None 时不限制
+    """
+    from .utils.upload import apply
+
+    return apply(capacity, ttl, path, max_size)
+
+
+def apply_media_store(quota: Optional[int] = None) -> _Dispose:
+    """设置 `Media.save` 使用的媒体存储的空间配额
+
+    参数:
+        quota: 每个存储目录占用空间的上限 (字节)，超出时按最近最少访问的顺序淘汰文件；为 None 时不限制
+    """
+    from .utils.media_store import apply
+
+    return apply(quota)
+
+
+def apply_export_cache(capacity: int = 256) -> _Dispose:
+    """启用已转换消息的缓存，重复发送的固定回复 (只含文本、at、表情、按钮等元素) 只会转换一次
+
+    参数:
+        capacity: 最多缓存的条目数
+    """
+    from .utils.export_cache import apply
+
+    return apply(capacity)
+
+
 reply_handle = reply_fetch  # backward compatibility
 
 _enable_fetch_targets = False
-FETCH_LOCK = asyncio.Lock()
+FETCH_LOCKS: dict[str, asyncio.Lock] = {}
+"""各 bot 的拉取锁，保证同一 bot 的连接与断开处理依次进行，不同 bot 之间互不阻塞"""
+
+
+def _fetch_lock(bot: Bot) -> asyncio.Lock:
+    if (lock := FETCH_LOCKS.get(bot.self_id)) is None:
+        lock = FETCH_LOCKS[bot.self_id] = asyncio.Lock()
+    return lock
 
 
 def _register_hook():
@@ -116,12 +170,12 @@ def _register_hook():
     @driver.on_bot_connect
     async def _(bot: Bot):
         log("DEBUG", f"cache or refresh targets for bot:{bot.self_id}")
-        async with FETCH_LOCK:
+        async with _fetch_lock(bot):
             await _refresh_bot(bot)
 
     @driver.on_bot_disconnect
     async def _(bot: Bot):
-        async with FETCH_LOCK:
+        async with _fetch_lock(bot):
             TARGET_RECORD.pop(bot.self_id, None)
             if fn := alter_get_fetcher(bot.adapter.get_name()):
                 fn.cache.pop(bot.self_id, None)
@@ -138,8 +192,8 @@ def apply_fetch_targets():
 
 
 async def _refresh_bot(bot: Bot):
-    TARGET_RECORD.pop(bot.self_id, None)
     if not (fn := alter_get_fetcher(bot.adapter.get_name())):
+        TARGET_RECORD.pop(bot.self_id, None)
         log("WARNING", lang.require("nbp-uniseg", "unsupported").format(adapter=bot.adapter.get_name()))
         return
     try:
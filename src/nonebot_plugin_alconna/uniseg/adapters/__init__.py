@@ -1,13 +1,12 @@
 import os
 import importlib
-from pathlib import Path
 from warnings import warn
-from contextlib import suppress
-from typing import TYPE_CHECKING, cast
+from time import perf_counter
+from typing import TYPE_CHECKING, Any, Optional, cast
 
 from nonebot import get_adapters
 
-from ..constraint import SupportAdapter
+from ..constraint import SupportAdapter, log
 
 if TYPE_CHECKING:
     from ..loader import BaseLoader
@@ -15,24 +14,106 @@ if TYPE_CHECKING:
     from ..builder import MessageBuilder
     from ..exporter import MessageExporter
 
-root = Path(__file__).parent
-loaders: dict[str, "BaseLoader"] = {}
-_adapters = [path.stem for path in root.iterdir() if path.is_dir() and not path.stem.startswith("_")]
-for name in _adapters:
-    try:
-        module = importlib.import_module(f".{name}", __package__)
-        loader = cast("BaseLoader", module.Loader())
-        loaders[loader.get_adapter().value] = loader
-    except Exception as e:  # noqa: PERF203
-        warn(f"Failed to import uniseg adapter {name}: {e}", RuntimeWarning, 15)
-
-EXPORTER_MAPPING: dict[str, "MessageExporter"] = {
-    SupportAdapter.nonebug.value: loaders[SupportAdapter.nonebug.value].get_exporter()
-}
-BUILDER_MAPPING: dict[str, "MessageBuilder"] = {
-    SupportAdapter.nonebug.value: loaders[SupportAdapter.nonebug.value].get_builder()
+LOADER_MODULES: dict[str, str] = {
+    SupportAdapter.console.value: "console",
+    SupportAdapter.ding.value: "ding",
+    SupportAdapter.discord.value: "discord",
+    SupportAdapter.dodo.value: "dodo",
+    SupportAdapter.feishu.value: "feishu",
+    SupportAdapter.gewechat.value: "gewechat",
+    SupportAdapter.github.value: "github",
+    SupportAdapter.heybox.value: "heybox",
+    SupportAdapter.kook.value: "kook",
+    SupportAdapter.kritor.value: "kritor",
+    SupportAdapter.mail.value: "mail",
+    SupportAdapter.minecraft.value: "minecraft",
+    SupportAdapter.mirai.value: "mirai",
+    SupportAdapter.nonebug.value: "nonebug",
+    SupportAdapter.ntchat.value: "ntchat",
+    SupportAdapter.onebot11.value: "onebot11",
+    SupportAdapter.onebot12.value: "onebot12",
+    SupportAdapter.qq.value: "qq",
+    SupportAdapter.red.value: "red",
+    SupportAdapter.satori.value: "satori",
+    SupportAdapter.tail_chat.value: "tailchat",
+    SupportAdapter.telegram.value: "telegram",
+    SupportAdapter.wxmp.value: "wxmp",
 }
+"""适配器名称与其加载器所在子模块的映射，子模块仅在首次使用时导入"""
+
+loaders: dict[str, "BaseLoader"] = {}
+IMPORT_COSTS: dict[str, float] = {}
+"""各适配器的加载器、构建器、导出器与获取器的导入耗时 (秒)"""
+_failed: set[str] = set()
+_unsupported: set[tuple[str, str]] = set()
+
+EXPORTER_MAPPING: dict[str, "MessageExporter"] = {}
+BUILDER_MAPPING: dict[str, "MessageBuilder"] = {}
 FETCHER_MAPPING: dict[str, "TargetFetcher"] = {}
+
+
+def _not_found(adapter_name: str):
+    warn(
+        f"Adapter {adapter_name} is not found in the uniseg.adapters,"
+        f"please go to the github repo and create an issue for it.",
+        RuntimeWarning,
+        8,
+    )
+
+
+def _record(adapter_name: str, begin: float):
+    cost = perf_counter() - begin
+    IMPORT_COSTS[adapter_name] = IMPORT_COSTS.get(adapter_name, 0.0) + cost
+    log("DEBUG", f"uniseg adapter {adapter_name} loaded in {cost * 1000:.2f}ms")
+
+
+def get_loader(adapter_name: str) -> Optional["BaseLoader"]:
+    """获取适配器的加载器，首次获取时才导入对应的子模块"""
+    if adapter_name in loaders:
+        return loaders[adapter_name]
+    if adapter_name not in LOADER_MODULES or adapter_name in _failed:
+        return None
+    begin = perf_counter()
+    try:
+        module = importlib.import_module(f".{LOADER_MODULES[adapter_name]}", __package__)
+        loaders[adapter_name] = loader = cast("BaseLoader", module.Loader())
+    except Exception as e:
+        _failed.add(adapter_name)
+        warn(f"Failed to import uniseg adapter {LOADER_MODULES[adapter_name]}: {e}", RuntimeWarning, 8)
+        return None
+    finally:
+        _record(adapter_name, begin)
+    return loader
+
+
+def _load(mapping: dict[str, Any], adapter_name: str, method: str, stacklevel: int = 7):
+    if adapter_name in mapping:
+        return mapping[adapter_name]
+    if (adapter_name, method) in _unsupported:
+        return None
+    if (loader := get_loader(adapter_name)) is None:
+        if adapter_name not in LOADER_MODULES:
+            _not_found(adapter_name)
+        return None
+    begin = perf_counter()
+    try:
+        mapping[adapter_name] = getattr(loader, method)()
+        return mapping[adapter_name]
+    except NotImplementedError:
+        _unsupported.add((adapter_name, method))
+        return None
+    except Exception as e:
+        warn(f"Failed to load uniseg adapter {adapter_name}: {e}", RuntimeWarning, stacklevel)
+        return None
+    finally:
+        _record(adapter_name, begin)
+
+
+def import_costs() -> dict[str, float]:
+    """获取已加载的各适配器的导入耗时 (秒)"""
+    return IMPORT_COSTS.copy()
+
+
 adapters = {}
 try:
     adapters = get_adapters()
@@ -40,14 +121,10 @@ except Exception as e:
     warn(f"Failed to get nonebot adapters: {e}", RuntimeWarning, 15)
 
 if os.environ.get("PLUGIN_ALCONNA_TESTENV"):
-    for adapter, loader in loaders.items():
-        try:
-            EXPORTER_MAPPING[adapter] = loader.get_exporter()
-            BUILDER_MAPPING[adapter] = loader.get_builder()
-            with suppress(NotImplementedError):
-                FETCHER_MAPPING[adapter] = loader.get_fetcher()
-        except Exception as e:  # noqa: PERF203
-            warn(f"Failed to load uniseg adapter {adapter}: {e}", RuntimeWarning, 15)
+    for adapter in LOADER_MODULES:
+        _load(EXPORTER_MAPPING, adapter, "get_exporter", 15)
+        _load(BUILDER_MAPPING, adapter, "get_builder", 15)
+        _load(FETCHER_MAPPING, adapter, "get_fetcher", 15)
 elif not adapters:
     warn(
         "No adapters found, please make sure you have installed at least one adapter.",
@@ -56,15 +133,7 @@ elif not adapters:
     )
 else:
     for adapter in adapters:
-        if adapter in loaders:
-            try:
-                EXPORTER_MAPPING[adapter] = loaders[adapter].get_exporter()
-                BUILDER_MAPPING[adapter] = loaders[adapter].get_builder()
-                with suppress(NotImplementedError):
-                    FETCHER_MAPPING[adapter] = loaders[adapter].get_fetcher()
-            except Exception as e:
-                warn(f"Failed to load uniseg adapter {adapter}: {e}", RuntimeWarning, 15)
-        else:
+        if adapter not in LOADER_MODULES:
             warn(
                 f"Adapter {adapter} is not found in the uniseg.adapters,"
                 f"please go to the github repo and create an issue for it.",
@@ -73,60 +142,13 @@ else:
             )
 
 
-def alter_get_exporter(adapter_name: str):
-    if adapter_name in EXPORTER_MAPPING:
-        return EXPORTER_MAPPING[adapter_name]
-    if adapter_name in loaders:
-        try:
-            EXPORTER_MAPPING[adapter_name] = loaders[adapter_name].get_exporter()
-            return EXPORTER_MAPPING[adapter_name]
-        except Exception as e:
-            warn(f"Failed to load uniseg adapter {adapter_name}: {e}", RuntimeWarning, 6)
-            return None
-    warn(
-        f"Adapter {adapter_name} is not found in the uniseg.adapters,"
-        f"please go to the github repo and create an issue for it.",
-        RuntimeWarning,
-        6,
-    )
-    return None
+def alter_get_exporter(adapter_name: str) -> Optional["MessageExporter"]:
+    return _load(EXPORTER_MAPPING, adapter_name, "get_exporter")
 
 
-def alter_get_builder(adapter_name: str):
-    if adapter_name in BUILDER_MAPPING:
-        return BUILDER_MAPPING[adapter_name]
-    if adapter_name in loaders:
-        try:
-            BUILDER_MAPPING[adapter_name] = loaders[adapter_name].get_builder()
-            return BUILDER_MAPPING[adapter_name]
-        except Exception as e:
-            warn(f"Failed to load uniseg adapter {adapter_name}: {e}", RuntimeWarning, 6)
-            return None
-    warn(
-        f"Adapter {adapter_name} is not found in the uniseg.adapters,"
-        f"please go to the github repo and create an issue for it.",
-        RuntimeWarning,
-        6,
-    )
-    return None
+def alter_get_builder(adapter_name: str) -> Optional["MessageBuilder"]:
+    return _load(BUILDER_MAPPING, adapter_name, "get_builder")
 
 
-def alter_get_fetcher(adapter_name: str):
-    if adapter_name in FETCHER_MAPPING:
-        return FETCHER_MAPPING[adapter_name]
-    if adapter_name in loaders:
-        try:
-            FETCHER_MAPPING[adapter_name] = loaders[adapter_name].get_fetcher()
-            return FETCHER_MAPPING[adapter_name]
-        except NotImplementedError:
-            return None
-        except Exception as e:
-            warn(f"Failed to load uniseg adapter {adapter_name}: {e}", RuntimeWarning, 6)
-            return None
-    warn(
-        f"Adapter {adapter_name} is not found in the uniseg.adapters,"
-        f"please go to the github repo and create an issue for it.",
-        RuntimeWarning,
-        6,
-    )
-    return None
+def alter_get_fetcher(adapter_name: str) -> Optional["TargetFetcher"]:
+    return _load(FETCHER_MAPPING, adapter_name, "get_fetcher")
@@ -11,6 +11,7 @@ from nonebot.adapters.dodo.models import Emoji as DodoEmoji
 from nonebot.adapters.dodo.message import Message, MessageSegment
 
 from nonebot_plugin_alconna.uniseg.constraint import SupportScope
+from nonebot_plugin_alconna.uniseg.utils.upload import cached_upload
 from nonebot_plugin_alconna.uniseg.segment import At, Text, Emoji, Image, Reply, Video, Segment
 from nonebot_plugin_alconna.uniseg.exporter import Target, SupportAdapter, MessageExporter, SerializeFailed, export
 
@@ -66,20 +67,24 @@ class DoDoMessageExporter(MessageExporter[Message]):
     async def image(self, seg: Image, bot: Union[Bot, None]) -> "MessageSegment":
         if TYPE_CHECKING:
             assert isinstance(bot, DoDoBot)
-        filename = None
-        if seg.raw:
-            data = seg.raw_bytes
-        elif seg.path:
-            data = Path(seg.path)
-            filename = data.name if seg.name == seg.__default_name__ else seg.name
-        elif seg.url:
-            resp = await bot.adapter.request(Request("GET", seg.url))
-            data = cast(bytes, resp.content)
-        else:
-            raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type="image", seg=seg))
-        res = await bot.set_resouce_picture_upload(file=data, file_name=filename)
 
-        return MessageSegment.picture(res.url, res.width, res.height)
+        async def upload():
+            filename = None
+            if seg.raw:
+                data = seg.raw_bytes
+            elif seg.path:
+                data = Path(seg.path)
+                filename = data.name if seg.name == seg.__default_name__ else seg.name
+            elif seg.url:
+                resp = await bot.adapter.request(Request("GET", seg.url))
+                data = cast(bytes, resp.content)
+            else:
+                raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type="image", seg=seg))
+            res = await bot.set_resouce_picture_upload(file=data, file_name=filename)
+            return [res.url, res.width, res.height]
+
+        url, width, height = await cached_upload(bot, seg, "set_resouce_picture_upload", upload)
+        return MessageSegment.picture(url, width, height)
 
     @export
     async def video(self, seg: Video, bot: Union[Bot, None]) -> "MessageSegment":
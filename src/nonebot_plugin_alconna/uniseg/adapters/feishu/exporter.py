@@ -9,6 +9,7 @@ from nonebot.adapters.feishu.message import Message, MessageSegment
 from nonebot.adapters.feishu.event import MessageEvent, GroupMessageEvent, PrivateMessageEvent
 
 from nonebot_plugin_alconna.uniseg.constraint import SupportScope
+from nonebot_plugin_alconna.uniseg.utils.upload import cached_upload
 from nonebot_plugin_alconna.uniseg.exporter import Target, SupportAdapter, MessageExporter, SerializeFailed, export
 from nonebot_plugin_alconna.uniseg.segment import (
     At,
@@ -18,6 +19,7 @@ from nonebot_plugin_alconna.uniseg.segment import (
     Audio,
     Emoji,
     Image,
+    Media,
     Reply,
     Video,
     Voice,
@@ -67,51 +69,54 @@ class FeishuMessageExporter(MessageExporter[Message]):
     async def at_all(self, seg: AtAll, bot: Union[Bot, None]) -> "MessageSegment":
         return MessageSegment.at("all")
 
+    async def _upload_image(self, seg: Image, bot: Bot) -> str:
+        data = {"image_type": "message"}
+        if seg.url:
+            resp = await bot.adapter.request(Request("GET", seg.url))
+            params = {"method": "POST", "data": data, "files": {"image": ("file", resp.content)}}
+            result = await bot.call_api("im/v1/images", **params)
+        elif seg.path or seg.raw:
+            # 以文件对象上传，由驱动器分块读取，避免将整个文件读入内存
+            with seg.open() as image:
+                params = {"method": "POST", "data": data, "files": {"image": ("file", image)}}
+                result = await bot.call_api("im/v1/images", **params)
+        else:
+            raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type="image", seg=seg))
+        return result["data"]["image_key"]
+
+    async def _upload_file(self, seg: Media, bot: Bot) -> str:
+        filename = seg.name
+        if seg.path:
+            filename = Path(seg.path).name if seg.name == seg.__default_name__ else seg.name
+        data = {"file_type": "stream", "file_name": filename}
+        if seg.url:
+            resp = await bot.adapter.request(Request("GET", seg.url))
+            params = {"method": "POST", "data": data, "files": {"file": ("file", resp.content)}}
+            result = await bot.call_api("im/v1/files", **params)
+        elif seg.path or seg.raw:
+            with seg.open() as raw:
+                params = {"method": "POST", "data": data, "files": {"file": ("file", raw)}}
+                result = await bot.call_api("im/v1/files", **params)
+        else:
+            raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type=seg.type, seg=seg))
+        return result["data"]["file_key"]
+
     @export
     async def image(self, seg: Image, bot: Union[Bot, None]) -> "MessageSegment":
         if seg.id:
             return MessageSegment.image(seg.id)
         if not bot:
             raise NotImplementedError
-        if seg.url:
-            resp = await bot.adapter.request(Request("GET", seg.url))
-            image = resp.content
-        elif seg.path:
-            image = Path(seg.path).read_bytes()
-        elif seg.raw:
-            image = seg.raw_bytes
-        else:
-            raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type="image", seg=seg))
-        data = {"image_type": "message"}
-        files = {"image": ("file", image)}
-        params = {"method": "POST", "data": data, "files": files}
-        result = await bot.call_api("im/v1/images", **params)
-        file_key = result["data"]["image_key"]
+        file_key = await cached_upload(bot, seg, "im/v1/images", lambda: self._upload_image(seg, bot))
         return MessageSegment.image(file_key)
 
     @export
     async def audio(self, seg: Union[Voice, Audio], bot: Union[Bot, None]) -> "MessageSegment":
-        name = seg.__class__.__name__.lower()
         if seg.id:
             return MessageSegment.audio(seg.id, int(seg.duration) if seg.duration else None)
         if not bot:
             raise NotImplementedError
-        filename = seg.name
-        if seg.url:
-            resp = await bot.adapter.request(Request("GET", seg.url))
-            raw = resp.content
-        elif seg.path:
-            raw = Path(seg.path).read_bytes()
-            filename = Path(seg.path).name if seg.name == seg.__default_name__ else seg.name
-        elif seg.raw:
-            raw = seg.raw_bytes
-        else:
-            raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type=name, seg=seg))
-        data = {"file_type": "stream", "file_name": filename}
-        files = {"file": ("file", raw)}
-        params = {"method": "POST", "data": data, "files": files}
-        result = await bot.call_api("im/v1/files", **params)
-        file_key = result["data"]["file_key"]
+        file_key = await cached_upload(bot, seg, f"im/v1/files:{seg.name}", lambda: self._upload_file(seg, bot))
         return MessageSegment.audio(file_key, int(seg.duration) if seg.duration else None)
 
     @export
@@ -120,22 +125,7 @@ class FeishuMessageExporter(MessageExporter[Message]):
             return MessageSegment.file(seg.id, seg.name)
         if not bot:
             raise NotImplementedError
-        filename = seg.name
-        if seg.url:
-            resp = await bot.adapter.request(Request("GET", seg.url))
-            raw = resp.content
-        elif seg.path:
-            raw = Path(seg.path).read_bytes()
-            filename = Path(seg.path).name if seg.name == seg.__default_name__ else seg.name
-        elif seg.raw:
-            raw = seg.raw_bytes
-        else:
-            raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type="file", seg=seg))
-        data = {"file_type": "stream", "file_name": filename}
-        files = {"file": ("file", raw)}
-        params = {"method": "POST", "data": data, "files": files}
-        result = await bot.call_api("im/v1/files", **params)
-        file_key = result["data"]["file_key"]
+        file_key = await cached_upload(bot, seg, f"im/v1/files:{seg.name}", lambda: self._upload_file(seg, bot))
         return MessageSegment.file(file_key, seg.name)
 
     @export
@@ -144,22 +134,7 @@ class FeishuMessageExporter(MessageExporter[Message]):
             return MessageSegment.sticker(seg.id)
         if not bot:
             raise NotImplementedError
-        filename = seg.name
-        if seg.url:
-            resp = await bot.adapter.request(Request("GET", seg.url))
-            raw = resp.content
-        elif seg.path:
-            raw = Path(seg.path).read_bytes()
-            filename = Path(seg.path).name if seg.name == seg.__default_name__ else seg.name
-        elif seg.raw:
-            raw = seg.raw_bytes
-        else:
-            raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type="video", seg=seg))
-        data = {"file_type": "stream", "file_name": filename}
-        files = {"file": ("file", raw)}
-        params = {"method": "POST", "data": data, "files": files}
-        result = await bot.call_api("im/v1/files", **params)
-        file_key = result["data"]["file_key"]
+        file_key = await cached_upload(bot, seg, f"im/v1/files:{seg.name}", lambda: self._upload_file(seg, bot))
         return MessageSegment.sticker(file_key)
 
     @export
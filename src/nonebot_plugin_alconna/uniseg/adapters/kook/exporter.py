@@ -1,3 +1,4 @@
+from pathlib import Path
 from typing import TYPE_CHECKING, Any, Union, Sequence, cast
 
 from tarina import lang
@@ -8,6 +9,7 @@ from nonebot.adapters.kaiheila.event import MessageEvent, PrivateMessageEvent
 from nonebot.adapters.kaiheila.message import Message, MessageSegment, MessageSerializer
 
 from nonebot_plugin_alconna.uniseg.constraint import SupportScope
+from nonebot_plugin_alconna.uniseg.utils.upload import cached_upload, get_upload_cache
 from nonebot_plugin_alconna.uniseg.exporter import Target, SupportAdapter, MessageExporter, SerializeFailed, export
 from nonebot_plugin_alconna.uniseg.segment import (
     At,
@@ -108,6 +110,14 @@ class KookMessageExporter(MessageExporter["Message"]):
             "video": MessageSegment.local_video,
             "file": MessageSegment.local_file,
         }[name]
+        if bot and get_upload_cache() is not None and (seg.raw or seg.path):
+            # 启用上传缓存时提前上传，以便复用此前的上传结果；只在未命中时才读取内容
+
+            def upload():
+                return bot.upload_file(seg.raw_bytes if seg.raw else Path(seg.path), title)  # type: ignore
+
+            file_key = await cached_upload(bot, seg, f"upload_file:{title}", upload)
+            return method(file_key, title)
         if seg.raw:
             return local_method(seg.raw_bytes, title)
         if seg.path:
@@ -8,6 +8,7 @@ from nonebot.adapters.onebot.v12.bot import Bot as OnebotBot
 from nonebot.adapters.onebot.v12.message import Message, MessageSegment
 
 from nonebot_plugin_alconna.uniseg.constraint import SupportScope
+from nonebot_plugin_alconna.uniseg.utils.upload import cached_upload
 from nonebot_plugin_alconna.uniseg.segment import At, File, Text, AtAll, Audio, Image, Reply, Video, Voice
 from nonebot_plugin_alconna.uniseg.exporter import Target, SupportAdapter, MessageExporter, SerializeFailed, export
 
@@ -94,34 +95,38 @@ class Onebot12MessageExporter(MessageExporter["Message"]):
             return method(seg.id)
         if not bot:
             raise NotImplementedError
-        if seg.url:
-            resp = await bot.upload_file(type="url", name=seg.name, url=seg.url)
-            return method(resp["file_id"])
-        if seg.path:
-            if seg.__class__.to_url:
-                resp = await bot.upload_file(
-                    type="url",
-                    name=Path(seg.path).name if seg.name == seg.__default_name__ else seg.name,
-                    url=await seg.__class__.to_url(
-                        seg.path, bot, None if seg.name == seg.__default_name__ else seg.name
-                    ),
-                )
-            else:
-                resp = await bot.upload_file(type="path", path=str(seg.path), name=Path(seg.path).name)
-            return method(resp["file_id"])
-        if seg.raw:
-            if seg.__class__.to_url:
-                resp = await bot.upload_file(
-                    type="url",
-                    name=seg.name,
-                    url=await seg.__class__.to_url(
-                        seg.raw, bot, None if seg.name == seg.__default_name__ else seg.name
-                    ),
-                )
-            else:
-                resp = await bot.upload_file(type="data", data=seg.raw_bytes, name=seg.name)
-            return method(resp["file_id"])
-        raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type=name, seg=seg))
+
+        async def upload() -> str:
+            if seg.url:
+                resp = await bot.upload_file(type="url", name=seg.name, url=seg.url)
+                return resp["file_id"]
+            if seg.path:
+                if seg.__class__.to_url:
+                    resp = await bot.upload_file(
+                        type="url",
+                        name=Path(seg.path).name if seg.name == seg.__default_name__ else seg.name,
+                        url=await seg.__class__.to_url(
+                            seg.path, bot, None if seg.name == seg.__default_name__ else seg.name
+                        ),
+                    )
+                else:
+                    resp = await bot.upload_file(type="path", path=str(seg.path), name=Path(seg.path).name)
+                return resp["file_id"]
+            if seg.raw:
+                if seg.__class__.to_url:
+                    resp = await bot.upload_file(
+                        type="url",
+                        name=seg.name,
+                        url=await seg.__class__.to_url(
+                            seg.raw, bot, None if seg.name == seg.__default_name__ else seg.name
+                        ),
+                    )
+                else:
+                    resp = await bot.upload_file(type="data", data=seg.raw_bytes, name=seg.name)
+                return resp["file_id"]
+            raise SerializeFailed(lang.require("nbp-uniseg", "invalid_segment").format(type=name, seg=seg))
+
+        return method(await cached_upload(bot, seg, f"upload_file:{seg.name}", upload))
 
     @export
     async def reply(self, seg: Reply, bot: Union[Bot, None]) -> "MessageSegment":
@@ -116,7 +116,11 @@ class TelegramMessageExporter(MessageExporter[Message]):
         if seg.id or seg.url:
             return method(seg.id or seg.url)
         if seg.path:
-            raw = Path(seg.path).read_bytes()
+            path = Path(seg.path)
+            if path.name == seg.name and path.is_file():
+                # 适配器在发送时仍会将整个文件读入内存，这里只是避免导出的消息段提前持有一份文件内容
+                return method(str(path))
+            raw = path.read_bytes()
         elif seg.raw:
             raw = seg.raw_bytes
         else:
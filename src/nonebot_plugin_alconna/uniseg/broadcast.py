@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import asyncio
+from time import monotonic
+from collections.abc import Iterable
+from dataclasses import field, dataclass
+from typing import TYPE_CHECKING, Callable
+
+from tarina import lang
+from nonebot.internal.adapter import Bot, Message
+
+from .target import Target
+from .receipt import Receipt
+from .fallback import FallbackStrategy
+from .constraint import SerializeFailed
+from .adapters import alter_get_exporter
+
+if TYPE_CHECKING:
+    from .message import UniMessage
+
+
+class TokenBucket:
+    """令牌桶限流器
+
+    参数:
+        rate: 每秒补充的令牌数
+        burst: 桶的容量，即允许的突发请求数
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = monotonic()
+
+    async def acquire(self):
+        while True:
+            now = monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+_limits: dict[str, tuple[float, int, bool]] = {}
+_buckets: dict[tuple[str, str | None], TokenBucket] = {}
+
+
+def set_rate_limit(adapter: str, rate: float | None, burst: int = 1, per_bot: bool = True):
+    """设置适配器的发送频率限制，所有经由 `broadcast` 发送的消息共享该限制
+
+    参数:
+        adapter: 适配器名称
+        rate: 每秒允许发送的消息数，为 None 时取消限制
+        burst: 允许的突发消息数
+        per_bot: 是否为每个 bot 单独计算限制；否则该适配器下的所有 bot 共享限制
+    """
+    for key in [key for key in _buckets if key[0] == adapter]:
+        del _buckets[key]
+    if rate is None:
+        _limits.pop(adapter, None)
+    else:
+        _limits[adapter] = (rate, burst, per_bot)
+
+
+def _get_bucket(bot: Bot) -> TokenBucket | None:
+    adapter = bot.adapter.get_name()
+    if (limit := _limits.get(adapter)) is None:
+        return None
+    rate, burst, per_bot = limit
+    key = (adapter, bot.self_id if per_bot else None)
+    if (bucket := _buckets.get(key)) is None:
+        bucket = _buckets[key] = TokenBucket(rate, burst)
+    return bucket
+
+
+RATE_LIMIT_EXCEPTIONS = {"RateLimitException", "IAmTired"}
+"""各适配器中表示频率限制的异常类名，如 Discord、Kook、QQ 的 RateLimitException 与 OneBot V12 的 IAmTired"""
+
+
+def is_rate_limited(e: Exception) -> bool:
+    """判断异常是否由平台的频率限制引起
+
+    依据适配器的异常类型、HTTP 状态码与 `retry_after` 判断，不匹配异常的文本内容。
+    """
+    if any(cls.__name__ in RATE_LIMIT_EXCEPTIONS for cls in type(e).__mro__):
+        return True
+    if getattr(e, "retry_after", None):
+        return True
+    status_code = getattr(e, "status_code", None) or getattr(getattr(e, "response", None), "status_code", None)
+    if status_code == 429:
+        return True
+    # Telegram 的 ActionFailed 不保留错误码，频率限制的描述固定为 "Too Many Requests: retry after N"
+    description = getattr(e, "description", None)
+    return isinstance(description, str) and description.startswith("Too Many Requests")
+
+
+@dataclass
+class BroadcastResult:
+    """群发结果"""
+
+    receipts: list[Receipt] = field(default_factory=list)
+    """发送成功的回执，顺序与目标一致"""
+    failures: list[tuple[Target, Exception]] = field(default_factory=list)
+    """发送失败的目标与对应的异常"""
+
+    @property
+    def success(self) -> bool:
+        return not self.failures
+
+
+async def broadcast(
+    message: UniMessage,
+    targets: Iterable[Target],
+    bot: Bot | None = None,
+    fallback: bool | FallbackStrategy = FallbackStrategy.rollback,
+    concurrency: int = 16,
+    retries: int = 3,
+    backoff: float = 1.0,
+    retry_on: Callable[[Exception], bool] = is_rate_limited,
+    **kwargs,
+) -> BroadcastResult:
+    """向多个目标发送同一条消息，参数说明见 `UniMessage.broadcast`"""
+    targets = list(targets)
+    semaphore = asyncio.Semaphore(concurrency)
+    exported: dict[tuple[str, str], asyncio.Task[Message]] = {}
+    results: list[Receipt | Exception | None] = [None] * len(targets)
+
+    async def _send(index: int, target: Target):
+        async with semaphore:
+            try:
+                _bot = bot or await target.select()
+                adapter = _bot.adapter.get_name()
+                if not (fn := alter_get_exporter(adapter)):
+                    raise SerializeFailed(lang.require("nbp-uniseg", "unsupported").format(adapter=adapter))
+                # 平台返回的媒体 id 等可能只对上传的 bot 有效，故按 bot 分别转换
+                if (task := exported.get((adapter, _bot.self_id))) is None:
+                    task = exported[(adapter, _bot.self_id)] = asyncio.create_task(message.export(_bot, fallback))
+                msg = await asyncio.shield(task)
+                bucket = _get_bucket(_bot)
+                for attempt in range(retries + 1):
+                    if bucket:
+                        await bucket.acquire()
+                    try:
+                        res = await fn.send_to(target, _bot, msg.copy(), **kwargs)
+                    except Exception as e:
+                        if attempt >= retries or not retry_on(e):
+                            raise
+                        await asyncio.sleep(getattr(e, "retry_after", None) or backoff * 2**attempt)
+                    else:
+                        msg_ids = res if isinstance(res, list) else [res]
+                        results[index] = Receipt(_bot, target, fn, msg_ids, type(message))
+                        return
+            except Exception as e:
+                results[index] = e
+
+    await asyncio.gather(*(_send(index, target) for index, target in enumerate(targets)))
+    result = BroadcastResult()
+    for target, res in zip(targets, results):
+        if isinstance(res, Receipt):
+            result.receipts.append(res)
+        else:
+            result.failures.append((target, res))  # type: ignore
+    return result
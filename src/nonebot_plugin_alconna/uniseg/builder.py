@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from abc import ABCMeta, abstractmethod
 from typing import Any, Union, Generic, TypeVar, Callable, Optional
 
@@ -18,6 +19,15 @@ def build(*types: str):
     return wrapper
 
 
+def drop_origin(segments: Iterable[Segment]):
+    """去除消息段 (含子元素) 对适配器消息段的引用，以便其能被回收；`Other` 的 origin 即其内容，会被保留"""
+    for seg in segments:
+        if seg.origin is not None and not isinstance(seg, Other):
+            seg.origin = None
+        if seg._children:
+            drop_origin(child for child in seg._children if isinstance(child, Segment))
+
+
 class MessageBuilder(Generic[TS], metaclass=ABCMeta):
     _mapping: dict[
         str,
@@ -39,16 +49,29 @@ class MessageBuilder(Generic[TS], metaclass=ABCMeta):
                 target = attr.__build_target__
                 for _type in target:
                     self._mapping[_type] = method
+        self._table: dict[str, tuple[Optional[Callable], Optional[Callable]]] = {}
+        self._version = -1
+
+    def dispatch_table(self) -> dict[str, tuple[Optional[Callable], Optional[Callable]]]:
+        """获取消息段类型到 (内置构建方法, 自定义构建器) 的分派表，自定义构建器注册后会自动重建"""
+        if self._version != custom.version:
+            self._table = {
+                key: (self._mapping.get(key), custom.TYPED.get(key)) for key in (*self._mapping, *custom.TYPED)
+            }
+            self._version = custom.version
+        return self._table
 
     def preprocess(self, source: Message[TS]) -> Message[TS]:
         return source
 
     def convert(self, seg: TS) -> Union[Segment, list[Segment]]:
         seg_type = seg.type
-        if seg_type in self._mapping:
-            res = self._mapping[seg_type](seg)
+        method, handler = self.dispatch_table().get(seg_type, (None, None))
+        if method is not None:
+            res = method(seg)
             if not res:
-                return custom.solve(self, seg) or self.wildcard_build(seg) or Other(seg)
+                res = handler(self, seg) if handler else custom.solve_predicates(self, seg)
+                return res or self.wildcard_build(seg) or Other(seg)
             if isinstance(res, list):
                 for _seg in res:
                     _seg.origin = seg
@@ -56,22 +79,34 @@ class MessageBuilder(Generic[TS], metaclass=ABCMeta):
                 res.origin = seg
             return res
         if seg.is_text():
-            if seg.type == "text":
+            if seg_type == "text":
                 if "styles" in seg.data:
                     res = Text(seg.data["text"], seg.data["styles"])
                 else:
                     res = Text(seg.data["text"])
             else:
-                res = Text(seg.data["text"]).mark(0, len(seg.data["text"]), seg.type)
+                res = Text(seg.data["text"]).mark(0, len(seg.data["text"]), seg_type)
             res.origin = seg
             return res
-        return custom.solve(self, seg) or self.wildcard_build(seg) or Other(seg)
+        res = handler(self, seg) if handler else custom.solve_predicates(self, seg)
+        return res or self.wildcard_build(seg) or Other(seg)
+
+    def generate(self, source: Message[TS], keep_origin: bool = True) -> list[Segment]:
+        """将适配器消息转换为消息段列表
+
+        参数:
+            source: 适配器消息
+            keep_origin: 是否保留消息段的 origin；长期保存大量消息时可关闭以节省内存
 
-    def generate(self, source: Message[TS]) -> list[Segment]:
+        返回:
+            转换后的消息段列表
+        """
         result = []
         for ms in self.preprocess(source):
             seg = self.convert(ms)
             result.extend(seg if isinstance(seg, list) else [seg])
+        if not keep_origin:
+            drop_origin(result)
         return result
 
     async def extract_reply(self, event: Event, bot: Bot) -> Union[Reply, None]:
@@ -1,7 +1,10 @@
+import asyncio
 import inspect
+from weakref import WeakKeyDictionary
+from contextvars import ContextVar
 from abc import ABCMeta, abstractmethod
 from collections.abc import Sequence, Awaitable
-from typing import Any, Union, Generic, TypeVar, Callable, get_args, overload, get_origin
+from typing import Any, Union, Generic, TypeVar, Callable, ClassVar, get_args, overload, get_origin
 
 from tarina import lang
 from nonebot.adapters import Bot, Event, Message, MessageSegment
@@ -30,6 +33,8 @@ TS = TypeVar("TS", bound=Segment)
 TM = TypeVar("TM", bound=Message)
 TMS = TypeVar("TMS", bound=MessageSegment, covariant=True)
 
+_concurrent: ContextVar[bool] = ContextVar("_concurrent", default=False)
+
 
 def merge_text(msg: TM) -> TM:
     if not msg:
@@ -139,6 +144,8 @@ class MessageExporter(Generic[TM], metaclass=ABCMeta):
             Callable[[Segment, Union[Bot, None]], Awaitable[Union[MessageSegment, list[MessageSegment]]]],
         ],
     ]
+    concurrency: ClassVar[int] = 4
+    """同一适配器下可同时进行的媒体元素转换数量，为 1 时按顺序转换"""
 
     @classmethod
     @abstractmethod
@@ -155,6 +162,7 @@ class MessageExporter(Generic[TM], metaclass=ABCMeta):
 
     def __init__(self):
         self._mapping = {}
+        self._semaphores: WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = WeakKeyDictionary()
         for attr in self.__class__.__dict__.values():
             if callable(attr) and hasattr(attr, "__export_target__"):
                 method = getattr(self, attr.__name__)
@@ -168,70 +176,110 @@ class MessageExporter(Generic[TM], metaclass=ABCMeta):
     async def export(self, source: Sequence[Segment], bot: Union[Bot, None], fallback: Union[bool, FallbackStrategy]):
         msg_type = self.get_message_type()
         message = msg_type([])
-        for seg in source:
-            seg_type = seg.__class__
-            if seg_type in self._mapping:
-                try:
-                    res = await self._mapping[seg_type](seg, bot)
-                    if isinstance(res, list):
-                        message.extend(res)
-                    else:
-                        message.append(res)
-                    continue
-                except (SerializeFailed, NotImplementedError):
-                    pass
-            if res := await custom.export(self, seg, bot, fallback):  # type: ignore
+        if (
+            bot is not None
+            and self.concurrency > 1
+            and not _concurrent.get()
+            and sum(isinstance(seg, Media) for seg in source) > 1
+        ):
+            # 媒体元素的转换可能涉及网络请求 (如上传文件)，此时并发转换各元素，并按原顺序拼接结果
+            parts = [msg_type([]) for _ in source]
+            results = await asyncio.gather(
+                *(self._export_concurrent(seg, bot, fallback, part) for seg, part in zip(source, parts)),
+                return_exceptions=True,
+            )
+            for res in results:
+                if isinstance(res, BaseException):
+                    raise res
+            for part in parts:
+                message.extend(part)
+        else:
+            for seg in source:
+                await self._export_segment(seg, bot, fallback, message)
+        return merge_text(message)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if (semaphore := self._semaphores.get(loop)) is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    async def _export_concurrent(
+        self, seg: Segment, bot: Union[Bot, None], fallback: Union[bool, FallbackStrategy], message: TM
+    ):
+        # 嵌套的转换 (如子元素) 按顺序进行，避免与外层争抢信号量而死锁
+        _concurrent.set(True)
+        if isinstance(seg, Media):
+            async with self._get_semaphore():
+                await self._export_segment(seg, bot, fallback, message)
+        else:
+            await self._export_segment(seg, bot, fallback, message)
+
+    async def _export_segment(
+        self, seg: Segment, bot: Union[Bot, None], fallback: Union[bool, FallbackStrategy], message: TM
+    ):
+        msg_type = self.get_message_type()
+        seg_type = seg.__class__
+        if seg_type in self._mapping:
+            try:
+                res = await self._mapping[seg_type](seg, bot)
                 if isinstance(res, list):
                     message.extend(res)
                 else:
                     message.append(res)
-                continue
-            if isinstance(seg, Other):
-                message.append(seg.origin)  # type: ignore
-            elif bot and bot.adapter.get_name() == SupportAdapter.nonebug:
+                return
+            except (SerializeFailed, NotImplementedError):
+                pass
+        if res := await custom.export(self, seg, bot, fallback):  # type: ignore
+            if isinstance(res, list):
+                message.extend(res)
+            else:
+                message.append(res)
+            return
+        if isinstance(seg, Other):
+            message.append(seg.origin)  # type: ignore
+        elif bot and bot.adapter.get_name() == SupportAdapter.nonebug:
+            message += str(seg)
+        elif isinstance(fallback, FallbackStrategy) and fallback != FallbackStrategy.forbid:
+            if fallback == FallbackStrategy.ignore:
+                return
+            if fallback == FallbackStrategy.to_text:
                 message += str(seg)
-            elif isinstance(fallback, FallbackStrategy) and fallback != FallbackStrategy.forbid:
-                if fallback == FallbackStrategy.ignore:
-                    continue
-                if fallback == FallbackStrategy.to_text:
-                    message += str(seg)
-                elif fallback == FallbackStrategy.rollback:
-                    if not seg.children:
-                        if isinstance(seg, Media):
-                            if seg.url:
-                                message += f"[{seg.type}]{seg.url}"
-                            else:
-                                message += f"[{seg.type}]{'' if seg.name == seg.__default_name__ else seg.name}"
+            elif fallback == FallbackStrategy.rollback:
+                if not seg.children:
+                    if isinstance(seg, Media):
+                        if seg.url:
+                            message += f"[{seg.type}]{seg.url}"
                         else:
-                            message += str(seg)
-                    elif isinstance(seg, Reference):
-                        for node in seg.children:
-                            if isinstance(node, CustomNode):
-                                if isinstance(node.content, str):
-                                    message.append(msg_type(node.content))
-                                else:
-                                    message.extend(await self.export(node.content, bot, FallbackStrategy.auto))
-                            else:
-                                message += f"> msg:{node.id}\n"
+                            message += f"[{seg.type}]{'' if seg.name == seg.__default_name__ else seg.name}"
                     else:
-                        message.extend(await self.export(seg.children, bot, fallback))
-                elif seg.children:
-                    message.extend(await self.export(seg.children, bot, FallbackStrategy.auto))
-                else:
-                    message.extend(await self.export((await _auto_fallback(seg, bot)), bot, FallbackStrategy.auto))
-            elif fallback is True:
-                if seg.children:
-                    message.extend(await self.export(seg.children, bot, FallbackStrategy.auto))
+                        message += str(seg)
+                elif isinstance(seg, Reference):
+                    for node in seg.children:
+                        if isinstance(node, CustomNode):
+                            if isinstance(node.content, str):
+                                message.append(msg_type(node.content))
+                            else:
+                                message.extend(await self.export(node.content, bot, FallbackStrategy.auto))
+                        else:
+                            message += f"> msg:{node.id}\n"
                 else:
-                    message.extend(await self.export((await _auto_fallback(seg, bot)), bot, FallbackStrategy.auto))
+                    message.extend(await self.export(seg.children, bot, fallback))
+            elif seg.children:
+                message.extend(await self.export(seg.children, bot, FallbackStrategy.auto))
             else:
-                raise SerializeFailed(
-                    lang.require("nbp-uniseg", "failed").format(
-                        target=seg, adapter=bot.adapter.get_name() if bot else "Unknown"
-                    )
+                message.extend(await self.export((await _auto_fallback(seg, bot)), bot, FallbackStrategy.auto))
+        elif fallback is True:
+            if seg.children:
+                message.extend(await self.export(seg.children, bot, FallbackStrategy.auto))
+            else:
+                message.extend(await self.export((await _auto_fallback(seg, bot)), bot, FallbackStrategy.auto))
+        else:
+            raise SerializeFailed(
+                lang.require("nbp-uniseg", "failed").format(
+                    target=seg, adapter=bot.adapter.get_name() if bot else "Unknown"
                 )
-
-        return merge_text(message)
+            )
 
     @abstractmethod
     async def send_to(self, target: Union[Target, Event], bot: Bot, message: Message, **kwargs):
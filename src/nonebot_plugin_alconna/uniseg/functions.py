@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+import asyncio
+from copy import copy
+from weakref import finalize
+from collections.abc import Hashable, Awaitable
+from typing import TYPE_CHECKING, Any, TypeVar, Callable
 
 from tarina import lang
 from nonebot.adapters import Bot, Event
 from nonebot.internal.matcher import current_bot, current_event
 
 from .segment import Emoji
+from .constraint import log
 from .exporter import SerializeFailed
 from .adapters import alter_get_exporter
 
@@ -14,6 +19,47 @@ if TYPE_CHECKING:
     from .target import Target
     from .message import UniMessage
 
+T = TypeVar("T")
+_EVENT_CACHES: dict[int, dict[Hashable, Any]] = {}
+_UNCACHEABLE: set[type] = set()
+
+
+def event_cache(event: Event) -> dict[Hashable, Any]:
+    """获取事件级别的缓存
+
+    缓存以事件对象的身份为键，随事件一同释放，供处理同一事件的所有响应器共享；
+    事件的副本 (如 `model_copy` 的结果) 拥有各自独立的缓存。
+    无法被弱引用的事件类型不会被缓存，此时每次调用都返回新的字典。
+    """
+    if (cache := _EVENT_CACHES.get(id(event))) is None:
+        cache = {}
+        try:
+            finalize(event, _EVENT_CACHES.pop, id(event), None)
+        except TypeError:
+            if event.__class__ not in _UNCACHEABLE:
+                _UNCACHEABLE.add(event.__class__)
+                log("WARNING", f"{event.__class__.__name__} cannot be weakly referenced, event cache is disabled for it")
+            return cache
+        _EVENT_CACHES[id(event)] = cache
+    return cache
+
+
+async def event_cached(event: Event, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+    """在事件级别的缓存中获取或计算一个值
+
+    并发的调用者会等待同一次计算；计算失败时不会缓存结果。
+    """
+    cache = event_cache(event)
+    if (task := cache.get(key)) is None:
+        task = cache[key] = asyncio.ensure_future(factory())
+
+        def _discard(fut: asyncio.Future):
+            if (fut.cancelled() or fut.exception() is not None) and cache.get(key) is fut:
+                del cache[key]
+
+        task.add_done_callback(_discard)
+    return await asyncio.shield(task)
+
 
 async def message_recall(
     message_id: str | None = None, event: Event | None = None, bot: Bot | None = None, adapter: str | None = None
@@ -133,6 +179,13 @@ def get_target(event: Event | None = None, bot: Bot | None = None, adapter: str
                 raise SerializeFailed(lang.require("nbp-uniseg", "bot_missing")) from e
         _adapter = bot.adapter
         adapter = _adapter.get_name()
-    if fn := alter_get_exporter(adapter):
-        return fn.get_target(event, bot)
-    raise SerializeFailed(lang.require("nbp-uniseg", "unsupported").format(adapter=adapter))
+    cache = event_cache(event)
+    key = ("target", adapter, bot.self_id if bot else None)
+    if (target := cache.get(key)) is None:
+        if not (fn := alter_get_exporter(adapter)):
+            raise SerializeFailed(lang.require("nbp-uniseg", "unsupported").format(adapter=adapter))
+        cache[key] = target = fn.get_target(event, bot)
+    # 各响应器拿到的是副本，对其的修改不会影响其他响应器
+    target = copy(target)
+    target.extra = target.extra.copy()
+    return target
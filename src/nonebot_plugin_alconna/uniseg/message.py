@@ -1,25 +1,32 @@
 from __future__ import annotations
 
+import struct
 from io import BytesIO
 from pathlib import Path
 from copy import deepcopy
+from functools import wraps
+from itertools import chain
+from collections import deque
 from json import dumps, loads
 from types import FunctionType
-from collections.abc import Iterable, Sequence, Awaitable
+from collections.abc import Iterable, Iterator, Sequence, Awaitable
 from typing_extensions import Self, TypeAlias, SupportsIndex, deprecated
-from typing import TYPE_CHECKING, Any, Union, Literal, TypeVar, Callable, NoReturn, Protocol, overload
+from typing import TYPE_CHECKING, Any, Union, Literal, TypeVar, BinaryIO, Callable, NoReturn, Protocol, overload
 
 from tarina import lang
 from tarina.lang.model import LangItem
 from tarina.context import ContextModel
 from nonebot.exception import FinishedException
-from nonebot.internal.adapter import Bot, Event, Message
+from nonebot.internal.adapter import Bot, Event, Message, MessageSegment
 from nonebot.internal.matcher import current_bot, current_event
 
 from .target import Target
 from .receipt import Receipt
+from .builder import drop_origin
+from .broadcast import BroadcastResult, broadcast, is_rate_limited
 from .constraint import SerializeFailed
 from .template import UniMessageTemplate
+from .utils.export_cache import get_export_cache
 from .functions import get_target, get_message_id
 from .fallback import FallbackMessage, FallbackStrategy
 from .adapters import alter_get_builder, alter_get_exporter
@@ -45,6 +52,9 @@ from .segment import (
     get_segment_class,
 )
 
+if TYPE_CHECKING:
+    from .builder import MessageBuilder
+
 T = TypeVar("T")
 TS = TypeVar("TS", bound=Segment)
 TS1 = TypeVar("TS1", bound=Segment)
@@ -81,6 +91,108 @@ AsyncVisitor: TypeAlias = Union[dict[str, AsyncTransformer], Visit[Awaitable[Uni
 MessageContainer = Union[str, Segment, Sequence["MessageContainer"], "UniMessage"]
 
 
+class UniMessageBuilder:
+    """通用消息构建器
+
+    依次追加消息段与字符串，相邻的文本片段会暂存在缓冲区中，直到遇到非文本消息段或构建时才一次性拼接，
+    样式区间也在此时统一偏移，避免逐段合并文本带来的重复拷贝。
+
+    参数:
+        factory: 构建结果的消息类型，默认为 `UniMessage`
+    """
+
+    __slots__ = ("_factory", "_merge", "_segments", "_single", "_size", "_styles", "_texts")
+
+    def __init__(self, factory: type[UniMessage] | None = None):
+        self._factory = factory or UniMessage
+        self._segments: list[Segment] = []
+        self._texts: list[str] = []
+        self._styles: list[tuple[int, dict[tuple[int, int], list[str]]]] = []
+        self._size = 0
+        self._single: Text | None = None
+        self._merge = False
+
+    def _flush(self):
+        if not self._texts:
+            return
+        if self._single is not None and len(self._texts) == 1:
+            # 单独的文本消息段无需合并，保留原对象
+            self._segments.append(self._single)
+        else:
+            styles = {}
+            for offset, _styles in self._styles:
+                for (start, end), value in _styles.items():
+                    styles[(start + offset, end + offset)] = value[:]
+            seg = Text("".join(self._texts), styles)
+            if self._merge:
+                seg.__merge__()
+            self._segments.append(seg)
+        self._texts = []
+        self._styles = []
+        self._size = 0
+        self._single = None
+        self._merge = False
+
+    def text(self, text: str) -> Self:
+        """追加文本"""
+        self._texts.append(text)
+        self._size += len(text)
+        return self
+
+    def append(self, seg: str | Segment) -> Self:
+        """追加消息段或文本"""
+        if isinstance(seg, str):
+            return self.text(seg)
+        if isinstance(seg, Text):
+            if not self._texts:
+                self._single = seg
+            elif not seg.text:
+                # 与空文本合并不会改变结果
+                return self
+            else:
+                # 与 Text 相加一致：仅在合并非空的文本消息段时整理样式
+                self._merge = True
+            if seg.styles:
+                self._styles.append((self._size, seg.styles))
+            return self.text(seg.text)
+        if not isinstance(seg, Segment):
+            raise TypeError(f"Unsupported type {type(seg)!r}")
+        if self._texts:
+            self._flush()
+        self._segments.append(seg)
+        return self
+
+    def extend(self, segs: Iterable[str | Segment | Iterable[str | Segment]]) -> Self:
+        """追加多个消息段或文本，嵌套的可迭代对象会被展开"""
+        for seg in segs:
+            if isinstance(seg, Segment) and not isinstance(seg, Text):
+                if self._texts:
+                    self._flush()
+                self._segments.append(seg)
+            elif isinstance(seg, (str, Segment)):
+                self.append(seg)
+            elif isinstance(seg, Iterable):
+                self.extend(seg)
+            else:
+                raise TypeError(f"Unsupported type {type(seg)!r}")
+        return self
+
+    def __iadd__(self, other: str | Segment | Iterable[str | Segment]) -> Self:
+        if isinstance(other, (str, Segment)):
+            return self.append(other)
+        return self.extend(other)
+
+    def __bool__(self) -> bool:
+        return bool(self._segments or self._texts)
+
+    def build(self) -> UniMessage:
+        """构建消息，构建器随后可继续使用"""
+        self._flush()
+        result = self._factory()
+        list.extend(result, self._segments)
+        return result
+
+
 class UniMessage(list[TS]):
     """通用消息序列
 
@@ -612,13 +724,14 @@ class UniMessage(list[TS]):
     ):
         super().__init__()
         if isinstance(message, str):
-            self.__iadd__(Text(message), _merge=False)
+            self.append(Text(message))  # type: ignore
         elif isinstance(message, Iterable):
+            builder = UniMessageBuilder()
             for i in message:
-                self.__iadd__(Text(i) if isinstance(i, str) else i)
+                builder += Text(i) if isinstance(i, str) else i
+            self.extend(builder.build())
         elif isinstance(message, Segment):
-            self.__iadd__(message, _merge=False)
-        self.__merge_text__()
+            self.append(message)  # type: ignore
 
     def __str__(self) -> str:
         return "".join(str(seg) for seg in self)
@@ -658,10 +771,101 @@ class UniMessage(list[TS]):
                 result.append(last)
                 last = seg
         result.append(last)
+        if len(result) == list.__len__(self):
+            # 没有需要合并的文本，保留类型索引
+            return self
         self.clear()
         self.extend(result)
         return self
 
+    def _type_index(self) -> dict[type[Segment], list[int]]:
+        """获取各消息段类型 (不含子类) 在消息中的位置，首次查询时构建
+
+        在末尾追加或弹出消息段时增量更新，其余修改会使其失效并在下次查询时重新构建。
+        """
+        if (index := self.__dict__.get("_types")) is None:
+            index = self.__dict__["_types"] = {}
+            for i, seg in enumerate(list.__iter__(self)):
+                index.setdefault(seg.__class__, []).append(i)
+        return index
+
+    def _positions(self, type_: type[Segment]) -> list[int]:
+        """获取指定类型 (含子类) 的消息段在消息中的位置，按升序排列"""
+        index = self._type_index()
+        matched = [positions for cls, positions in index.items() if issubclass(cls, type_)]
+        if not matched:
+            return []
+        if len(matched) == 1:
+            return matched[0]
+        return sorted(chain.from_iterable(matched))
+
+    def _invalidate_index(self):
+        self.__dict__.pop("_types", None)
+
+    def __getstate__(self):
+        # 拷贝与反序列化时会逐个追加消息段，类型索引需重新构建
+        state = {k: v for k, v in self.__dict__.items() if k != "_types"}
+        return state or None
+
+    def append(self, seg: TS) -> None:
+        list.append(self, seg)
+        if (index := self.__dict__.get("_types")) is not None:
+            index.setdefault(seg.__class__, []).append(list.__len__(self) - 1)
+
+    def extend(self, segs: Iterable[TS]) -> None:
+        start = list.__len__(self)
+        list.extend(self, segs)
+        if (index := self.__dict__.get("_types")) is not None:
+            for i in range(start, list.__len__(self)):
+                index.setdefault(list.__getitem__(self, i).__class__, []).append(i)
+
+    def insert(self, index: SupportsIndex, seg: TS) -> None:
+        if int(index) >= list.__len__(self):
+            return self.append(seg)
+        self._invalidate_index()
+        list.insert(self, index, seg)
+
+    def pop(self, index: SupportsIndex = -1) -> TS:
+        length = list.__len__(self)
+        seg = list.pop(self, index)
+        if (types := self.__dict__.get("_types")) is not None:
+            if int(index) in (-1, length - 1):
+                positions = types[seg.__class__]
+                positions.pop()
+                if not positions:
+                    del types[seg.__class__]
+            else:
+                self._invalidate_index()
+        return seg
+
+    def remove(self, seg: TS) -> None:
+        self._invalidate_index()
+        list.remove(self, seg)
+
+    def clear(self) -> None:
+        self._invalidate_index()
+        list.clear(self)
+
+    def sort(self, *args, **kwargs) -> None:
+        self._invalidate_index()
+        list.sort(self, *args, **kwargs)
+
+    def reverse(self) -> None:
+        self._invalidate_index()
+        list.reverse(self)
+
+    def __setitem__(self, key, value) -> None:
+        self._invalidate_index()
+        list.__setitem__(self, key, value)
+
+    def __delitem__(self, key) -> None:
+        self._invalidate_index()
+        list.__delitem__(self, key)
+
+    def __imul__(self, other: SupportsIndex) -> Self:
+        self._invalidate_index()
+        return list.__imul__(self, other)
+
     @overload
     def __add__(self, other: str) -> UniMessage[TS | Text]: ...
 
@@ -785,11 +989,12 @@ class UniMessage(list[TS]):
         if TYPE_CHECKING:
             assert not isinstance(arg1, (slice, int))
         if issubclass(arg1, Segment) and arg2 is None:
-            return UniMessage(seg for seg in self if isinstance(seg, arg1))
+            return UniMessageBuilder().extend(list.__getitem__(self, i) for i in self._positions(arg1)).build()
         if issubclass(arg1, Segment) and isinstance(arg2, int):
-            return [seg for seg in self if isinstance(seg, arg1)][arg2]
+            return list.__getitem__(self, self._positions(arg1)[arg2])
         if issubclass(arg1, Segment) and isinstance(arg2, slice):
-            return UniMessage([seg for seg in self if isinstance(seg, arg1)][arg2])
+            positions = self._positions(arg1)[arg2]
+            return UniMessageBuilder().extend(list.__getitem__(self, i) for i in positions).build()
         raise ValueError("Incorrect arguments to slice")  # pragma: no cover
 
     def __contains__(self, value: str | Segment | type[Segment]) -> bool:
@@ -801,7 +1006,7 @@ class UniMessage(list[TS]):
             消息内是否存在给定消息段或给定类型的消息段
         """
         if isinstance(value, type):
-            return bool(next((seg for seg in self if isinstance(seg, value)), None))
+            return bool(self._positions(value))
         if isinstance(value, str):
             value = Text(value)
         return super().__contains__(value)
@@ -824,10 +1029,11 @@ class UniMessage(list[TS]):
             ValueError: 消息段不存在
         """
         if isinstance(value, type):
-            first_segment = next((seg for seg in self if isinstance(seg, value)), None)
-            if first_segment is None:
+            if not (positions := self._positions(value)):
                 raise ValueError(f"Segment with type {value!r} is not in message")
-            return super().index(first_segment, *args)
+            if not args:
+                return positions[0]
+            return super().index(list.__getitem__(self, positions[0]), *args)
         if isinstance(value, str):
             value = Text(value)
         return super().index(value, *args)  # type: ignore
@@ -845,12 +1051,8 @@ class UniMessage(list[TS]):
         if count is None:
             return self[type_]
 
-        iterator, filtered = (seg for seg in self if isinstance(seg, type_)), UniMessage()
-        for _ in range(count):
-            seg = next(iterator, None)
-            if seg is None:
-                break
-            filtered.append(seg)
+        filtered = UniMessage()
+        list.extend(filtered, (list.__getitem__(self, i) for i in self._positions(type_)[: max(count, 0)]))
         return filtered  # type: ignore
 
     def count(self, value: type[Segment] | str | Segment) -> int:
@@ -864,11 +1066,12 @@ class UniMessage(list[TS]):
         """
         if isinstance(value, str):
             value = Text(value)
-        return (
-            len(self[value])  # type: ignore
-            if isinstance(value, type)
-            else super().count(value)  # type: ignore
-        )
+        if not isinstance(value, type):
+            return super().count(value)  # type: ignore
+        if issubclass(value, Text) or issubclass(Text, value):
+            # 相邻的文本会被合并计数
+            return len(self[value])  # type: ignore
+        return len(self._positions(value))
 
     def only(self, value: type[Segment] | str | Segment) -> bool:
         """检查消息中是否仅包含指定消息段
@@ -880,7 +1083,7 @@ class UniMessage(list[TS]):
             是否仅包含指定消息段
         """
         if isinstance(value, type):
-            return all(isinstance(seg, value) for seg in self)
+            return len(self._positions(value)) == len(self)
         if isinstance(value, str):
             value = Text(value)
         return all(seg == value for seg in self)
@@ -917,7 +1120,9 @@ class UniMessage(list[TS]):
         返回:
             新构造的消息
         """
-        return UniMessage(seg for seg in self if seg.__class__ in types)
+        index = self._type_index()
+        positions = sorted(chain.from_iterable(index.get(t, ()) for t in set(types)))
+        return UniMessageBuilder().extend(list.__getitem__(self, i) for i in positions).build()
 
     def exclude(self, *types: type[Segment]) -> UniMessage[TS]:
         """过滤消息
@@ -930,6 +1135,10 @@ class UniMessage(list[TS]):
         """
         return UniMessage(seg for seg in self if seg.__class__ not in types)
 
+    def structural_hash(self) -> int:
+        """获取消息的结构哈希，由各元素缓存的结构哈希组合而成"""
+        return hash(tuple(seg.structural_hash() for seg in self))
+
     def extract_plain_text(self) -> str:
         """提取消息内纯文本消息"""
 
@@ -970,13 +1179,13 @@ class UniMessage(list[TS]):
             for s in segs:
                 if isinstance(s, cls):
                     yield s
-                yield from query(s.children)
+                yield from query(s._children)
 
         results = []
         for seg in self:
             if isinstance(seg, cls):
                 results.append(seg)
-            results.extend(query(seg.children))
+            results.extend(query(seg._children))
         return UniMessage(results)
 
     @staticmethod
@@ -1219,6 +1428,7 @@ class UniMessage(list[TS]):
         event: Event | None = None,
         bot: Bot | None = None,
         adapter: str | None = None,
+        keep_origin: bool = True,
     ) -> UniMessage:
         if not message:
             if not event:
@@ -1240,10 +1450,12 @@ class UniMessage(list[TS]):
             adapter = _adapter.get_name()
         if not (fn := alter_get_builder(adapter)):
             raise SerializeFailed(lang.require("nbp-uniseg", "unsupported").format(adapter=adapter))
-        result = UniMessage(fn.generate(message))
+        result = UniMessage(fn.generate(message, keep_origin))
         if (event and bot) and (_reply := await fn.extract_reply(event, bot)):
             if result.has(Reply) and result.index(Reply) == 0:
                 result.pop(0)
+            if not keep_origin:
+                drop_origin([_reply])
             result.insert(0, _reply)
         return result
 
@@ -1254,7 +1466,22 @@ class UniMessage(list[TS]):
         event: Event | None = None,
         bot: Bot | None = None,
         adapter: str | None = None,
+        lazy: bool = False,
+        keep_origin: bool = True,
     ) -> UniMessage:
+        """将适配器消息转换为 UniMessage
+
+        参数:
+            message: 适配器消息，为空时使用事件的消息
+            event: 事件，为空时使用当前事件
+            bot: bot 对象，为空时使用当前 bot
+            adapter: 适配器名称，为空时使用 bot 的适配器
+            lazy: 是否按需转换消息段，见 `LazyUniMessage`
+            keep_origin: 是否保留消息段的 origin (对应的适配器消息段)；长期保存大量消息时可关闭以节省内存
+
+        返回:
+            转换后的消息
+        """
         if not message:
             if not event:
                 try:
@@ -1275,7 +1502,9 @@ class UniMessage(list[TS]):
             adapter = _adapter.get_name()
         if not (fn := alter_get_builder(adapter)):
             raise SerializeFailed(lang.require("nbp-uniseg", "unsupported").format(adapter=adapter))
-        return UniMessage(fn.generate(message))
+        if lazy:
+            return LazyUniMessage.from_message(fn, message, keep_origin)
+        return UniMessage(fn.generate(message, keep_origin))
 
     generate_without_reply = generate_sync
 
@@ -1290,17 +1519,17 @@ class UniMessage(list[TS]):
         return get_target(event, bot, adapter)
 
     def _handle_i18n(self, extra: dict, *args, **kwargs):
-        segments = [*self]
-        self.clear()
-        for seg in segments:
+        builder = UniMessageBuilder()
+        for seg in self:
             if not isinstance(seg, I18n):
-                self.append(seg)
+                builder.append(seg)
             else:
                 msg = self.template(str(seg)).format(*args, *seg.args, **kwargs, **seg.kwargs, **extra)
                 if msg.has(I18n):
                     msg._handle_i18n(extra, *seg.args, **seg.kwargs)
-                self.extend(msg)  # type: ignore
-        self.__merge_text__()
+                builder.extend(msg)
+        self.clear()
+        self.extend(builder.build())
 
     async def export(
         self,
@@ -1329,6 +1558,8 @@ class UniMessage(list[TS]):
             self._handle_i18n(extra)
         try:
             if fn := alter_get_exporter(adapter):
+                if (cache := get_export_cache()) is not None:
+                    return await cache.fetch(self, adapter, fallback, lambda: fn.export(self, bot, fallback))
                 return await fn.export(self, bot, fallback)
             raise SerializeFailed(lang.require("nbp-uniseg", "unsupported").format(adapter=adapter))
         except SerializeFailed:
@@ -1412,6 +1643,35 @@ class UniMessage(list[TS]):
         await self.send(target, bot, fallback, at_sender, reply_to, **kwargs)
         raise FinishedException
 
+    async def broadcast(
+        self,
+        targets: Iterable[Target],
+        bot: Bot | None = None,
+        fallback: bool | FallbackStrategy = FallbackStrategy.rollback,
+        concurrency: int = 16,
+        retries: int = 3,
+        backoff: float = 1.0,
+        retry_on: Callable[[Exception], bool] = is_rate_limited,
+        **kwargs,
+    ) -> BroadcastResult:
+        """向多个目标群发该消息
+
+        消息对每个 bot 只会转换一次；发送并发进行，并遵循 `set_rate_limit` 设置的频率限制。
+
+        参数:
+            targets: 发送目标
+            bot: 指定的 bot，为 None 时由各个目标自行选择
+            fallback: 回退策略
+            concurrency: 同时进行的发送数量
+            retries: 触发频率限制时的最大重试次数
+            backoff: 重试的初始等待时间 (秒)，每次重试翻倍
+            retry_on: 判断异常是否应当重试的函数
+
+        返回:
+            群发结果，包含成功的回执与失败的目标
+        """
+        return await broadcast(self, targets, bot, fallback, concurrency, retries, backoff, retry_on, **kwargs)
+
     @overload
     def dump(self, media_save_dir: str | Path | bool | None = None) -> list[dict]: ...
 
@@ -1452,3 +1712,265 @@ class UniMessage(list[TS]):
         else:
             _data = data
         return cls(get_segment_class(seg_data["type"]).load(seg_data) for seg_data in _data)
+
+    def dump_bytes(self) -> bytes:
+        """将消息序列化为紧凑的二进制格式
+
+        媒体文件的原始数据按原样写入，而非 base64 编码；bytes、BytesIO 与 Path 类型的字段值在读取时会还原为原来的类型。
+        格式见 `dump_many`。
+
+        返回:
+            序列化后的消息
+        """
+        return b"".join(_encode_record([seg.dump(media_save_dir=False) for seg in self]))
+
+    @classmethod
+    def load_bytes(cls: type[UniMessage[Segment]], data: bytes) -> UniMessage[Segment]:
+        """从 `dump_bytes` 生成的二进制数据加载消息
+
+        参数:
+            data: 二进制数据
+
+        返回:
+            加载后的消息
+        """
+        record = _decode_record(BytesIO(data))
+        if record is None:
+            raise EOFError("empty UniMessage record")
+        return cls.load(record)
+
+    @staticmethod
+    def dump_many(messages: Iterable[UniMessage], fp: BinaryIO) -> int:
+        """将多条消息依次以二进制格式写入文件对象
+
+        每条消息为一条记录: 结构部分 (JSON) 的长度与原始数据块的数量 (各 4 字节大端)，结构部分，
+        随后为各数据块 (8 字节大端长度 + 数据)。记录间无分隔，因此可以直接追加写入同一文件。
+
+        参数:
+            messages: 要写入的消息
+            fp: 以二进制模式打开的文件对象
+
+        返回:
+            写入的消息数量
+        """
+        count = 0
+        for msg in messages:
+            fp.writelines(_encode_record([seg.dump(media_save_dir=False) for seg in msg]))
+            count += 1
+        return count
+
+    @classmethod
+    def load_many(cls: type[UniMessage[Segment]], fp: BinaryIO) -> Iterator[UniMessage[Segment]]:
+        """从文件对象中逐条读取 `dump_many` 写入的消息
+
+        参数:
+            fp: 以二进制模式打开的文件对象
+
+        返回:
+            消息的迭代器，读到文件末尾时结束
+        """
+        while (record := _decode_record(fp)) is not None:
+            yield cls.load(record)
+
+
+_RECORD_HEADER = struct.Struct(">II")
+_BLOB_HEADER = struct.Struct(">Q")
+_BLOB_KEY = "\x00blob"
+_BYTESIO_KEY = "\x00bytesio"
+_PATH_KEY = "\x00path"
+
+
+def _encode_record(data: list[dict[str, Any]]) -> list[bytes]:
+    """将 dump 的结果编码为一条记录的各部分
+
+    bytes 与 BytesIO 会作为原始数据块存放，并与 Path 一样带有类型标记，以便读取时还原为原来的类型
+    """
+    blobs: list[bytes] = []
+
+    def _default(obj):
+        if isinstance(obj, BytesIO):
+            blobs.append(obj.getvalue())
+            return {_BYTESIO_KEY: len(blobs) - 1}
+        if isinstance(obj, (bytes, bytearray)):
+            blobs.append(obj)
+            return {_BLOB_KEY: len(blobs) - 1}
+        if isinstance(obj, Path):
+            return {_PATH_KEY: str(obj)}
+        raise TypeError(f"Object of type {obj.__class__.__name__} is not serializable")
+
+    body = dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode()
+    parts = [_RECORD_HEADER.pack(len(body), len(blobs)), body]
+    for blob in blobs:
+        parts.append(_BLOB_HEADER.pack(len(blob)))
+        parts.append(blob)
+    return parts
+
+
+def _read_exact(fp: BinaryIO, size: int) -> bytes:
+    data = fp.read(size)
+    if len(data) != size:
+        raise EOFError("UniMessage record is truncated")
+    return data
+
+
+def _decode_record(fp: BinaryIO) -> list[dict[str, Any]] | None:
+    """读取一条记录，文件已到末尾时返回 None"""
+    if not (header := fp.read(_RECORD_HEADER.size)):
+        return None
+    if len(header) != _RECORD_HEADER.size:
+        raise EOFError("UniMessage record is truncated")
+    body_size, blob_count = _RECORD_HEADER.unpack(header)
+    body = _read_exact(fp, body_size)
+    blobs = [_read_exact(fp, _BLOB_HEADER.unpack(_read_exact(fp, _BLOB_HEADER.size))[0]) for _ in range(blob_count)]
+
+    def _hook(obj: dict):
+        if len(obj) == 1:
+            if _BLOB_KEY in obj:
+                return blobs[obj[_BLOB_KEY]]
+            if _BYTESIO_KEY in obj:
+                return BytesIO(blobs[obj[_BYTESIO_KEY]])
+            if _PATH_KEY in obj:
+                return Path(obj[_PATH_KEY])
+        return obj
+
+    return loads(body, object_hook=_hook)
+
+
+def _materialized(func: Callable):
+    @wraps(func)
+    def wrapper(self: LazyUniMessage, *args, **kwargs):
+        self.materialize()
+        return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+class LazyUniMessage(UniMessage[Segment]):
+    """按需转换的通用消息序列
+
+    包装适配器的 `Message`，仅在访问 (迭代、正向索引、真值判断等) 到某一位置时才转换至该位置为止的消息段；
+    取长度、反向索引、比较、修改等需要完整内容的操作会先转换全部消息段，此后与 `UniMessage` 无异。
+
+    由此，仅检查消息开头的规则 (如命令头、`at_me`) 无需为其后的图片、引用、转发等消息段付出转换开销。
+
+    参数:
+        builder: 适配器的消息构建器
+        source: 适配器消息
+    """
+
+    _builder: MessageBuilder | None = None
+    _source: Iterator[MessageSegment] | None = None
+    _buffer: deque[Segment] | None = None
+    _keep_origin: bool = True
+
+    @classmethod
+    def from_message(cls, builder: MessageBuilder, source: Message, keep_origin: bool = True) -> LazyUniMessage:
+        self = cls()
+        self._builder = builder
+        self._source = iter(builder.preprocess(source))
+        self._buffer = deque()
+        self._keep_origin = keep_origin
+        return self
+
+    @property
+    def materialized(self) -> bool:
+        """是否已转换全部消息段"""
+        return self._source is None
+
+    def _convert(self) -> Segment | None:
+        assert self._builder and self._source is not None and self._buffer is not None
+        while not self._buffer:
+            if (unit := next(self._source, None)) is None:
+                return None
+            res = self._builder.convert(unit)
+            res = res if isinstance(res, list) else [res]
+            if not self._keep_origin:
+                drop_origin(res)
+            self._buffer.extend(res)
+        return self._buffer.popleft()
+
+    def _advance(self) -> bool:
+        """转换下一个消息段，返回是否成功；相邻的文本会如 `UniMessage` 一样合并"""
+        if self._source is None:
+            return False
+        if (seg := self._convert()) is None:
+            del self._builder, self._source, self._buffer, self._keep_origin
+            return False
+        if isinstance(seg, Text):
+            while (nxt := self._convert()) is not None:
+                if not isinstance(nxt, Text):
+                    self._buffer.appendleft(nxt)  # type: ignore
+                    break
+                seg += nxt
+        list.append(self, seg)
+        return True
+
+    def materialize(self) -> Self:
+        """转换全部消息段"""
+        while self._advance():
+            pass
+        return self
+
+    def __iter__(self):
+        index = 0
+        while index < list.__len__(self) or self._advance():
+            yield list.__getitem__(self, index)
+            index += 1
+
+    def __bool__(self) -> bool:
+        return list.__len__(self) > 0 or self._advance()
+
+    def __getitem__(self, args):
+        if isinstance(args, int) and args >= 0:
+            while list.__len__(self) <= args and self._advance():
+                pass
+            return list.__getitem__(self, args)
+        self.materialize()
+        return super().__getitem__(args)
+
+    def __contains__(self, value: str | Segment | type[Segment]) -> bool:
+        if isinstance(value, type) and not self.materialized:
+            return any(isinstance(seg, value) for seg in self)
+        self.materialize()
+        return super().__contains__(value)
+
+    def _type_index(self) -> dict[type[Segment], list[int]]:
+        self.materialize()
+        return super()._type_index()
+
+    # 以下方法会直接访问列表的底层存储
+    __len__ = _materialized(list.__len__)
+    __repr__ = _materialized(UniMessage.__repr__)
+    __eq__ = _materialized(list.__eq__)
+    __hash__ = None  # type: ignore
+    __ne__ = _materialized(list.__ne__)
+    __lt__ = _materialized(list.__lt__)
+    __le__ = _materialized(list.__le__)
+    __gt__ = _materialized(list.__gt__)
+    __ge__ = _materialized(list.__ge__)
+    __reversed__ = _materialized(list.__reversed__)
+    __mul__ = _materialized(list.__mul__)
+    __rmul__ = _materialized(list.__rmul__)
+    __imul__ = _materialized(UniMessage.__imul__)
+    __setitem__ = _materialized(UniMessage.__setitem__)
+    __delitem__ = _materialized(UniMessage.__delitem__)
+    __reduce_ex__ = _materialized(list.__reduce_ex__)
+    __sizeof__ = _materialized(list.__sizeof__)
+    __add__ = _materialized(UniMessage.__add__)
+    __iadd__ = _materialized(UniMessage.__iadd__)
+    __merge_text__ = _materialized(UniMessage.__merge_text__)
+    copy = _materialized(UniMessage.copy)
+    append = _materialized(UniMessage.append)
+    extend = _materialized(UniMessage.extend)
+    insert = _materialized(UniMessage.insert)
+    pop = _materialized(UniMessage.pop)
+    remove = _materialized(UniMessage.remove)
+    clear = _materialized(UniMessage.clear)
+    sort = _materialized(UniMessage.sort)
+    reverse = _materialized(UniMessage.reverse)
+    index = _materialized(UniMessage.index)
+    count = _materialized(UniMessage.count)
+    removeprefix = _materialized(UniMessage.removeprefix)
+    removesuffix = _materialized(UniMessage.removesuffix)
+    lstrip = _materialized(UniMessage.lstrip)
+    rstrip = _materialized(UniMessage.rstrip)
@@ -7,7 +7,7 @@ from nonebot.internal.adapter import Bot, Event
 
 from .message import TS, UniMessage
 from .exporter import Target, SerializeFailed
-from .functions import get_target, get_message_id
+from .functions import get_target, event_cached, get_message_id
 from .constraint import UNISEG_TARGET, UNISEG_MESSAGE, UNISEG_MESSAGE_ID
 
 
@@ -18,7 +18,9 @@ async def _uni_msg(bot: Bot, event: Event, state: T_State) -> UniMessage:
         event.get_message()
     except ValueError:
         raise SkippedException from None
-    return await UniMessage.generate(event=event, bot=bot)
+    msg = await event_cached(event, "message_with_reply", lambda: UniMessage.generate(event=event, bot=bot))
+    # 浅拷贝以免不同响应器间相互影响消息序列
+    return UniMessage(list.copy(msg))
 
 
 def _target(bot: Bot, event: Event, state: T_State) -> Target:
@@ -1,25 +1,44 @@
+from typing import Optional
+
 from nonebot.params import Depends
 from nonebot.internal.rule import Rule
 from nonebot.adapters import Bot, Event, Message
 
 from .message import UniMessage
-from .functions import get_target
 from .constraint import SupportScope
-from .segment import At, Text, Reply
+from .segment import At, Text, Reply, Segment
+from .functions import get_target, event_cache
+
+
+def origin_message(event: Event, bot: Bot) -> UniMessage:
+    """获取事件的原始消息 (即未经过 to_me 等处理的) 对应的 UniMessage，结果在同一事件内共享"""
+    cache = event_cache(event)
+    if (uni_msg := cache.get("origin_message")) is not None:
+        return uni_msg
+    msg: Message = event.get_message()
+    try:
+        msg = getattr(event, "original_message", msg)
+    except (NotImplementedError, ValueError):
+        pass
+    cache["origin_message"] = uni_msg = UniMessage.generate_without_reply(message=msg, bot=bot, lazy=True)
+    return uni_msg
 
 
 async def _get_message(event: Event, bot: Bot):
     if event.get_type() != "message":
         return None
     try:
-        msg: Message = event.get_message()
+        return origin_message(event, bot)
     except (NotImplementedError, ValueError):
         return None
+
+
+def _segment_at(msg: UniMessage, index: int) -> Optional[Segment]:
+    """获取指定位置的消息段；对于按需转换的消息，不会转换该位置之后的消息段"""
     try:
-        msg: Message = getattr(event, "original_message", msg)  # type: ignore
-    except (NotImplementedError, ValueError):
-        pass
-    return await UniMessage.generate(message=msg, bot=bot)
+        return msg[index]
+    except IndexError:
+        return None
 
 
 class AtInRule:
@@ -30,11 +49,10 @@ class AtInRule:
     async def __call__(self, msg: UniMessage = Depends(_get_message)):
         if not msg:
             return False
-        if isinstance(msg[0], Reply):
-            msg.pop(0)
-        if not msg or not isinstance(msg[0], At):
+        # 消息在同一事件的响应器间共享，此处不应修改消息本身
+        offset = 1 if isinstance(msg[0], Reply) else 0
+        if not isinstance(at := _segment_at(msg, offset), At):
             return False
-        at = msg[At, 0]
         if at.flag != "user":
             return False
         return at.target in self.targets
@@ -48,22 +66,22 @@ class AtMeRule:
     async def __call__(self, event: Event, bot: Bot, msg: UniMessage = Depends(_get_message)):
         if not msg:
             return False
-        if isinstance(msg[0], Reply):
-            msg.pop(0)
-        if not msg or not isinstance(msg[0], At):
+        # 消息在同一事件的响应器间共享，此处不应修改消息本身
+        offset = 1 if isinstance(msg[0], Reply) else 0
+        if isinstance(at := _segment_at(msg, offset), At):
+            offset += 1
+        else:
             target = get_target(event=event, bot=bot)
             if target.scope is SupportScope.qq_api and not target.channel:  # QQ API 群聊下会吞 At
-                msg.insert(0, At("user", bot.self_id))
+                at = At("user", bot.self_id)
             else:
                 return False
-        at = msg[At, 0]
         if at.flag != "user":
             return False
         ans = bot.self_id == at.target
-        if self.only and len(msg) > 1:
-            if not isinstance(msg[1], Text):
+        if self.only and (text := _segment_at(msg, offset)) is not None:
+            if not isinstance(text, Text):
                 return False
-            text: Text = msg[Text, 0]
             if text.text.strip("\xa0").strip():
                 return False
         return ans
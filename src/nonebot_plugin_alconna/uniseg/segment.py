@@ -1,30 +1,44 @@
 """通用标注, 无法用于创建 MS对象"""
 
 import re
+import copy
 import json
 import base64
-import hashlib
 import importlib
 import contextlib
-from io import BytesIO
+from io import BytesIO, RawIOBase
 from pathlib import Path
 from datetime import datetime
 from urllib.parse import urlparse
 from typing_extensions import Self
 from functools import reduce, lru_cache
 from collections.abc import Iterable, Awaitable
-from dataclasses import InitVar, field, asdict, fields, dataclass
-from typing import TYPE_CHECKING, Any, Union, Literal, TypeVar, Callable, ClassVar, Optional, Protocol, overload
+from dataclasses import InitVar, field, asdict, fields, dataclass, is_dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Union,
+    Literal,
+    TypeVar,
+    BinaryIO,
+    Callable,
+    ClassVar,
+    Optional,
+    Protocol,
+    cast,
+    overload,
+)
 
 from nonebot import require
-from tarina import gen_subclass
+from nonebot.utils import escape_tag
 from tarina.lang.model import LangItem
 from nonebot.compat import custom_validation
 from nonebot.internal.adapter import Bot, Message, MessageSegment
 from nepattern import MatchMode, BasePattern, create_local_patterns
 
 from .utils import fleep
-from .constraint import lang
+from .utils.media_store import get_media_store
+from .constraint import log, lang
 from .fallback import FallbackStrategy
 
 if TYPE_CHECKING:
@@ -37,18 +51,187 @@ TS = TypeVar("TS", bound="Segment")
 TS1 = TypeVar("TS1", bound="Segment")
 
 
-@lru_cache(4096)
+def _freeze(value: Any) -> Any:
+    """将字段值转换为可哈希的结构"""
+    if isinstance(value, Segment):
+        return value.structural_hash()
+    if isinstance(value, (str, int, float, bool, bytes)) or value is None:
+        return value
+    if isinstance(value, BytesIO):
+        return value.getvalue()
+    if isinstance(value, dict):
+        return tuple((_freeze(k), _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if is_dataclass(value):
+        return (value.__class__, *(_freeze(getattr(value, f.name)) for f in fields(value)))
+    try:
+        return hash(value)
+    except TypeError:
+        return repr(value)
+
+
+def _asdict_value(value: Any) -> Any:
+    """按 `dataclasses.asdict` 的规则深拷贝字段值；list/tuple/dict 的子类 (如 Message) 会被转为对应的内置类型"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return {f.name: _asdict_value(getattr(value, f.name)) for f in fields(value)}
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*(_asdict_value(v) for v in value))
+    if isinstance(value, (list, _NoChildren)):
+        return [_asdict_value(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_asdict_value(v) for v in value)
+    if isinstance(value, dict):
+        return {_asdict_value(k): _asdict_value(v) for k, v in value.items()}
+    return copy.deepcopy(value)
+
+
+def _convert_dataclass(value: Any) -> Any:
+    """将值中嵌套的 dataclass 按 `dataclasses.asdict` 的规则转为 dict；不含 dataclass 的值原样返回，不会被拷贝"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return _asdict_value(value)
+    if isinstance(value, (list, tuple)) and not hasattr(value, "_fields"):
+        items = [_convert_dataclass(v) for v in value]
+        if any(new is not old for new, old in zip(items, value)):
+            return items if isinstance(value, list) else tuple(items)
+    elif isinstance(value, dict):
+        items = {k: _convert_dataclass(v) for k, v in value.items()}
+        if any(items[k] is not v for k, v in value.items()):
+            return items
+    return value
+
+
+@lru_cache(None)
+def _data_fields(cls: type) -> tuple[str, ...]:
+    """获取元素类型的数据字段名 (不含 origin 与 _children)，按类型缓存"""
+    return tuple(f.name for f in fields(cls) if f.name not in ("origin", "_children"))
+
+
+class _Registry:
+    TYPES: ClassVar[dict[str, type["Segment"]]] = {}
+    """消息段类型名 (类名的小写) 到消息段类型的映射，由 `Segment.__init_subclass__` 维护
+
+    同名时先定义者生效；只有同一模块中同一限定名的类 (如 `slotted` 重建的类) 才会替换已注册的类型。
+    """
+    version: ClassVar[int] = 0
+    """注册表的版本，每次注册后递增，供 UniMessageTemplate 判断编译结果是否需要重建"""
+
+    @classmethod
+    def register(cls, segment_type: type["Segment"]):
+        name = segment_type.__name__.lower()
+        if (exist := cls.TYPES.get(name)) is not None and (
+            exist.__module__ != segment_type.__module__ or exist.__qualname__ != segment_type.__qualname__
+        ):
+            log(
+                "WARNING",
+                escape_tag(
+                    f"segment type {segment_type.__module__}.{segment_type.__qualname__} is ignored as "
+                    f"{exist.__module__}.{exist.__qualname__} has already registered the name {name!r}"
+                ),
+            )
+            return
+        cls.TYPES[name] = segment_type
+        cls.version += 1
+
+
+registry = _Registry()
+
+
 def get_segment_class(name: str) -> type["Segment"]:
-    return next((cls for cls in gen_subclass(Segment) if cls.__name__.lower() == name), Segment)
+    """根据消息段类型名获取消息段类型，未知的类型名返回 `Segment`"""
+    return registry.TYPES.get(name, Segment)
+
+
+class _NoChildren(tuple):
+    """未添加子元素时所有元素共享的空序列；与空列表比较时视为相等"""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple)):
+            return not other
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, (list, tuple)):
+            return bool(other)
+        return NotImplemented
+
+    __hash__ = tuple.__hash__
+
+    def __reduce__(self):
+        return "NO_CHILDREN"
+
+
+NO_CHILDREN: Any = _NoChildren()
+
+
+def _iter_funcs(value: Any) -> Iterable[Any]:
+    if isinstance(value, (classmethod, staticmethod)):
+        yield value.__func__
+    elif isinstance(value, property):
+        yield from (func for func in (value.fget, value.fset, value.fdel) if func)
+    elif callable(value):
+        yield value
+
+
+def slotted(cls: Optional[type] = None, /, *, extra: tuple[str, ...] = ()):
+    """以 `__slots__` 布局重建 dataclass 形式的元素类型，去除实例的 `__dict__` 以节省内存
+
+    需置于 `@dataclass` 之上；父类已有的槽位不会重复声明。未使用该装饰器的子类仍会拥有 `__dict__`。
+
+    参数:
+        cls: 要重建的类型
+        extra: 额外声明的、不属于 dataclass 字段的槽位
+
+    返回:
+        重建后的类型
+    """
+
+    def wrapper(cls: type) -> type:
+        inherited = {name for base in cls.__mro__[1:] for name in base.__dict__.get("__slots__", ())}
+        field_names = [f.name for f in fields(cls)]
+        names = tuple(name for name in (*field_names, *extra) if name not in inherited)
+        namespace = dict(cls.__dict__)
+        for name in (*field_names, *extra):
+            namespace.pop(name, None)
+        namespace.pop("__dict__", None)
+        namespace.pop("__weakref__", None)
+        namespace["__slots__"] = names
+        new_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+        new_cls.__qualname__ = cls.__qualname__
+        # 修正方法中零参数 super() 所引用的 __class__
+        for value in namespace.values():
+            for func in _iter_funcs(value):
+                for cell in getattr(func, "__closure__", None) or ():
+                    with contextlib.suppress(ValueError):
+                        if cell.cell_contents is cls:
+                            cell.cell_contents = new_cls
+        return new_cls
+
+    return wrapper if cls is None else wrapper(cls)
 
 
 @custom_validation
+@slotted
 @dataclass
 class Segment:
     """基类标注"""
 
     origin: Optional[MessageSegment] = field(init=False, hash=False, repr=False, compare=False, default=None)
-    _children: list["Segment"] = field(init=False, default_factory=list, repr=False, hash=False)
+    _children: list["Segment"] = field(init=False, default=NO_CHILDREN, repr=False, hash=False)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        registry.register(cls)
+
+    def __getattr__(self, name: str):
+        # 自定义 __init__ 的子类 (如 Reply) 不会设置这两个字段，此时槽位为空
+        if name == "origin":
+            return None
+        if name == "_children":
+            return NO_CHILDREN
+        raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
 
     def __str__(self):
         return f"[{self.__class__.__name__.lower()}]"
@@ -91,6 +274,17 @@ class Segment:
 
         return UniMessage(item) + self
 
+    def structural_hash(self) -> int:
+        """获取元素的结构哈希
+
+        该值只与元素的类型、各字段与子元素的内容有关，与 origin 无关。
+        每次调用时按当前内容计算，因此原地修改字段 (如 dict/list) 后也不会过期；bytes 的哈希由其自身缓存。
+        """
+        digest = hash((self.__class__, *(_freeze(getattr(self, name)) for name in _data_fields(self.__class__))))
+        if self._children:
+            return hash((digest, *(_freeze(child) for child in self._children)))
+        return digest
+
     def is_text(self) -> bool:
         return False
 
@@ -100,20 +294,45 @@ class Segment:
 
     @property
     def data(self) -> dict[str, Any]:
-        res = asdict(self)
-        res.pop("origin", None)
-        res.pop("_children", None)
-        return res
+        """元素的数据字段
+
+        嵌套的 dataclass (如作为字段值的其他元素) 会被转为 dict，其余的值不会被拷贝；
+        需要深拷贝时请使用 `get_data(deep=True)`
+        """
+        return self.get_data()
+
+    def get_data(self, deep: bool = False) -> dict[str, Any]:
+        """获取元素的数据字段，不包含 origin 与子元素
+
+        参数:
+            deep: 是否按 `dataclasses.asdict` 的规则深拷贝各字段值；否则只将嵌套的 dataclass 转为 dict
+
+        返回:
+            字段名到字段值的字典
+        """
+        if deep:
+            return {name: _asdict_value(getattr(self, name)) for name in _data_fields(self.__class__)}
+        return {name: _convert_dataclass(getattr(self, name)) for name in _data_fields(self.__class__)}
 
     def __call__(self, *segments: Union[str, "TS"]) -> Self:
         if not segments:
             return self
-        self._children.extend(Text(s) if isinstance(s, str) else s for s in segments)
+        self._add_children(Text(s) if isinstance(s, str) else s for s in segments)
         return self
 
+    def _add_children(self, children: Iterable[Any]):
+        """添加子元素；子元素列表在首次添加时才会分配"""
+        if isinstance(self._children, list):
+            self._children.extend(children)
+        else:
+            self._children = list(children)
+
     @property
-    def children(self):
-        return self._children
+    def children(self) -> list["Segment"]:
+        """子元素列表；未添加过子元素的元素在首次访问时才会分配列表"""
+        if not isinstance(children := self._children, list):
+            self._children = children = []
+        return children
 
     @classmethod
     def __get_validators__(cls):
@@ -133,8 +352,10 @@ class Segment:
             若不指定 media_save_dir，则会尝试导入 `nonebot_plugin_localstore` 并使用其提供的路径。
             否则，将会尝试使用当前工作目录。
         """
-        data = {f.name: getattr(self, f.name) for f in fields(self) if f.name not in ("origin", "_children")}
-        data = {"type": self.type, **{k: v for k, v in data.items() if v is not None}}
+        data: dict[str, Any] = {"type": self.type}
+        for name in _data_fields(self.__class__):
+            if (value := getattr(self, name)) is not None:
+                data[name] = value
         if isinstance(self, Media):
             if self.name == self.__default_name__:
                 data.pop("name", None)
@@ -232,6 +453,7 @@ STYLE_TYPE_MAP = {
 }
 
 
+@slotted
 @dataclass
 class Text(Segment):
     """Text对象, 表示一类文本元素"""
@@ -258,8 +480,9 @@ class Text(Segment):
                     data[i].extend(s for s in _styles if s not in data[i])
         styles.clear()
         data1: dict[str, list] = {}
-        for i, _styles in data.items():
-            key = "\x01".join(_styles)
+        # 按位置升序遍历，保证相邻且样式相同的区间总能被合并
+        for i in sorted(data):
+            key = "\x01".join(data[i])
             data1.setdefault(key, []).append(i)
         data.clear()
         for key, indexes in data1.items():
@@ -561,6 +784,7 @@ class Text(Segment):
         return cls(data["text"], styles)
 
 
+@slotted
 @dataclass
 class At(Segment):
     """At对象, 表示一类提醒某用户的元素"""
@@ -570,6 +794,7 @@ class At(Segment):
     display: Optional[str] = field(default=None)
 
 
+@slotted
 @dataclass
 class AtAll(Segment):
     """AtAll对象, 表示一类提醒所有人的元素"""
@@ -577,6 +802,7 @@ class AtAll(Segment):
     here: bool = field(default=False)
 
 
+@slotted
 @dataclass
 class Emoji(Segment):
     """Emoji对象, 表示一类表情元素"""
@@ -585,12 +811,50 @@ class Emoji(Segment):
     name: Optional[str] = field(default=None)
 
 
+class _BufferReader(RawIOBase):
+    """内存视图上的只读文件对象，不复制数据；关闭时释放视图"""
+
+    def __init__(self, buffer: memoryview):
+        self._buffer = buffer
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        data = self._buffer[self._pos : self._pos + len(b)]
+        size = len(data)
+        b[:size] = data
+        self._pos += size
+        return size
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += len(self._buffer)
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._buffer.release()
+        super().close()
+
+
 class MediaToUrl(Protocol):
     def __call__(
         self, data: Union[str, Path, bytes, BytesIO], bot: Optional[Bot], name: Optional[str] = None
     ) -> Awaitable[str]: ...
 
 
+@slotted
 @dataclass
 class Media(Segment):
     id: Optional[str] = field(default=None)
@@ -626,6 +890,23 @@ class Media(Segment):
                 self.name = f"{info.types[0]}.{info.extensions[0]}"
         return raw
 
+    def open(self) -> BinaryIO:
+        """以只读的二进制文件对象打开媒体内容，而不将其整个读入内存
+
+        path 会打开文件句柄；raw 则返回其上的只读视图，不复制数据，且每次打开的读取位置互不影响。
+        返回的对象使用后应关闭，可用于 with 语句。
+
+        返回:
+            二进制文件对象
+        """
+        if self.path:
+            return Path(self.path).open("rb")
+        if isinstance(self.raw, BytesIO):
+            return cast(BinaryIO, _BufferReader(self.raw.getbuffer()))
+        if self.raw:
+            return BytesIO(self.raw)
+        raise ValueError(f"{self} has no local data")
+
     @classmethod
     def load(cls, data: dict) -> Self:
         if children := data.get("children", []):
@@ -635,31 +916,47 @@ class Media(Segment):
         return cls(**{k: v for k, v in data.items() if k not in ("type", "children")})(*children)  # type: ignore
 
     def save(self, media_save_dir: Optional[Union[str, Path]] = None) -> Path:
+        """将媒体内容保存到按内容寻址的媒体存储中
+
+        相同内容只会写入一次；返回时文件已写入完成。在事件循环中保存较大的内容时应使用 `save_async`。
+
+        参数:
+            media_save_dir: 存储目录，为 None 时使用 `nonebot_plugin_localstore` 提供的目录或当前工作目录下的 `.data/media`
+
+        返回:
+            文件路径
+        """
         if not self.raw:
             raise ValueError
+        return get_media_store(self._media_save_dir(media_save_dir)).put(self.raw)
+
+    async def save_async(self, media_save_dir: Optional[Union[str, Path]] = None) -> Path:
+        """与 `save` 相同，但摘要计算与写入在线程池中进行，不阻塞事件循环
+
+        参数:
+            media_save_dir: 存储目录，为 None 时使用 `nonebot_plugin_localstore` 提供的目录或当前工作目录下的 `.data/media`
+
+        返回:
+            文件路径
+        """
+        if not self.raw:
+            raise ValueError
+        return await get_media_store(self._media_save_dir(media_save_dir)).put_async(self.raw)
+
+    @staticmethod
+    def _media_save_dir(media_save_dir: Optional[Union[str, Path]]) -> Path:
         if isinstance(media_save_dir, (str, Path)):
-            dir_ = Path(media_save_dir)
-        else:
-            try:
-                require("nonebot_plugin_localstore")
-                from nonebot_plugin_localstore import get_data_dir
-
-                dir_ = get_data_dir("nonebot_plugin_alconna") / "media"
-            except ImportError:
-                get_data_dir = None
-                dir_ = Path.cwd() / ".data" / "media"
-        raw = self.raw.getvalue() if isinstance(self.raw, BytesIO) else self.raw
-        header = raw[:128]
-        info = fleep.get(header)
-        ext = info.extensions[0] if info.extensions else "bin"
-        md5 = hashlib.md5(raw).hexdigest()
-        path = dir_ / md5[:2] / f"{md5}.{ext}"
-        path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("wb+") as f:
-            f.write(raw)
-        return path.resolve()
+            return Path(media_save_dir)
+        try:
+            require("nonebot_plugin_localstore")
+            from nonebot_plugin_localstore import get_data_dir
+
+            return get_data_dir("nonebot_plugin_alconna") / "media"
+        except ImportError:
+            return Path.cwd() / ".data" / "media"
 
 
+@slotted
 @dataclass
 class Image(Media):
     """Image对象, 表示一类图片元素"""
@@ -671,6 +968,7 @@ class Image(Media):
     __default_name__ = "image.png"
 
 
+@slotted
 @dataclass
 class Audio(Media):
     """Audio对象, 表示一类音频元素"""
@@ -681,6 +979,7 @@ class Audio(Media):
     __default_name__ = "audio.mp3"
 
 
+@slotted
 @dataclass
 class Voice(Media):
     """Voice对象, 表示一类语音元素"""
@@ -691,6 +990,7 @@ class Voice(Media):
     __default_name__ = "voice.wav"
 
 
+@slotted
 @dataclass
 class Video(Media):
     """Video对象, 表示一类视频元素"""
@@ -702,6 +1002,7 @@ class Video(Media):
     __default_name__ = "video.mp4"
 
 
+@slotted
 @dataclass
 class File(Media):
     """File对象, 表示一类文件元素"""
@@ -711,6 +1012,7 @@ class File(Media):
     __default_name__ = "file.bin"
 
 
+@slotted
 @dataclass(init=False)
 class Reply(Segment):
     """Reply对象，表示一类回复消息"""
@@ -729,8 +1031,6 @@ class Reply(Segment):
         self.id = id
         self.msg = msg
         self.origin = origin
-        if not hasattr(self, "_children"):
-            self._children = []
 
     def dump(self, *, media_save_dir: Optional[Union[str, Path, bool]] = None) -> dict:
         data = super().dump(media_save_dir=media_save_dir)
@@ -796,6 +1096,7 @@ class CustomNode:
         )
 
 
+@slotted
 @dataclass
 class Reference(Segment):
     """Reference对象，表示一类引用消息。转发消息 (Forward) 也属于此类"""
@@ -803,20 +1104,20 @@ class Reference(Segment):
     id: Optional[str] = field(default=None)
     """此处不一定是消息ID，可能是其他ID，如消息序号等"""
     nodes: InitVar[Union[list[RefNode], list[CustomNode], list[Union[RefNode, CustomNode]], None]] = field(default=None)
-    _children: list[Union[RefNode, CustomNode]] = field(init=False, default_factory=list)
+    _children: list[Union[RefNode, CustomNode]] = field(init=False, default=NO_CHILDREN)
 
     def __post_init__(self, nodes: Union[list[RefNode], list[CustomNode], list[Union[RefNode, CustomNode]], None]):
         if nodes:
-            self._children.extend(nodes)
+            self._add_children(nodes)
 
     @property
-    def children(self):
-        return self._children
+    def children(self) -> list[Union[RefNode, CustomNode]]:  # type: ignore
+        return super().children  # type: ignore
 
     def __call__(self, *segments: Union[Segment, RefNode, CustomNode]) -> Self:
         if not segments:
             return self
-        self._children.extend(segments)  # type: ignore
+        self._add_children(segments)
         return self
 
     def dump(self, *, media_save_dir: Optional[Union[str, Path, bool]] = None) -> dict:
@@ -832,6 +1133,7 @@ class Reference(Segment):
         return cls(data["id"], nodes)
 
 
+@slotted
 @dataclass
 class Hyper(Segment):
     """Hyper对象，表示一类超级消息。如卡片消息、ark消息、小程序等"""
@@ -853,6 +1155,7 @@ class Hyper(Segment):
 # telegram: InlineKeyboardButton & bot_command
 
 
+@slotted
 @dataclass
 class Button(Segment):
     """Button对象，表示一类按钮消息"""
@@ -903,9 +1206,18 @@ class Button(Segment):
             label += f"({self.url})"
         elif self.flag != "action":
             label += f"[{self.text}]"
-        self._children.insert(0, label)
+        if isinstance(self._children, list):
+            self._children.insert(0, label)
+        else:
+            self._children = [label]
 
+    @classmethod
+    def load(cls, data: dict) -> Self:
+        # 第一个子元素由 label 生成，构造时会重新生成
+        return super().load({**data, "children": data.get("children", [])[1:]})
 
+
+@slotted
 @dataclass
 class Keyboard(Segment):
     """Keyboard对象，表示一行按钮元素"""
@@ -915,23 +1227,24 @@ class Keyboard(Segment):
     """此处一般用来表示模板id，特殊情况下可能表示例如 bot_appid 等"""
     row: Union[int, None] = None
     """当消息中只写有一个 Keyboard 时可根据此参数约定按钮组的列数"""
-    _children: list[Button] = field(init=False, default_factory=list)
+    _children: list[Button] = field(init=False, default=NO_CHILDREN)
 
     def __post_init__(self, buttons: Union[list[Button], None]):
         if buttons:
-            self._children.extend(buttons)
+            self._add_children(buttons)
 
     @property
-    def children(self):
-        return self._children
+    def children(self) -> list[Button]:  # type: ignore
+        return super().children  # type: ignore
 
     def __call__(self, *segments: Union[Segment, Button]) -> Self:
         if not segments:
             return self
-        self._children.extend(segments)  # type: ignore
+        self._add_children(segments)
         return self
 
 
+@slotted
 @dataclass
 class Other(Segment):
     """其他 Segment"""
@@ -956,6 +1269,7 @@ class Other(Segment):
         return cls(origin)
 
 
+@slotted(extra=("item", "args", "kwargs"))
 @dataclass
 class I18n(Segment):
     """特殊的 Segment，用于 i18n 消息"""
@@ -974,7 +1288,6 @@ class I18n(Segment):
         mapping: Optional[dict] = None,
         **kwargs,
     ):
-        self._children = []
         if isinstance(item_or_scope, LangItem):
             self.item = item_or_scope
         elif type_:
@@ -1028,24 +1341,44 @@ class _CustomMounter:
             ],
         ]
     ] = {}
+    TYPED: ClassVar[dict[str, Callable[["MessageBuilder", MessageSegment], Union[Segment, None]]]] = {}
+    """以消息段类型为条件的构建器"""
+    PREDICATES: ClassVar[
+        list[
+            tuple[
+                Callable[[MessageSegment], bool],
+                Callable[["MessageBuilder", MessageSegment], Union[Segment, None]],
+            ]
+        ]
+    ] = []
+    """以任意判断函数为条件的构建器，仅在消息段类型没有对应构建器时按注册顺序尝试"""
+    version: ClassVar[int] = 0
+    """构建器注册表的版本，每次注册后递增，供 MessageBuilder 判断分派表是否需要重建"""
 
     @classmethod
     def custom_register(cls, custom_type: type[TS], condition: Union[str, Callable[[MessageSegment], bool]]):
         def _register(func: Callable[["MessageBuilder", MessageSegment], Union[TS, None]]):
             cls.BUILDERS[condition] = func
+            if isinstance(condition, str):
+                cls.TYPED[condition] = func
+            else:
+                cls.PREDICATES = [(cond, fn) for cond, fn in cls.BUILDERS.items() if not isinstance(cond, str)]
+            cls.version += 1
             return func
 
         return _register
 
-    def solve(self, builder: "MessageBuilder[TMS]", seg: TMS):
-        for condition, func in self.BUILDERS.items():
-            if isinstance(condition, str):
-                if seg.type == condition:
-                    return func(builder, seg)
-            elif condition(seg):
+    def solve_predicates(self, builder: "MessageBuilder[TMS]", seg: TMS):
+        for condition, func in self.PREDICATES:
+            if condition(seg):
                 return func(builder, seg)
         return None
 
+    def solve(self, builder: "MessageBuilder[TMS]", seg: TMS):
+        if (func := self.TYPED.get(seg.type)) is not None:
+            return func(builder, seg)
+        return self.solve_predicates(builder, seg)
+
     @classmethod
     def custom_handler(cls, custom_type: type[TS]):
         def _handler(
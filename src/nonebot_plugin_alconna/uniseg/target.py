@@ -1,8 +1,9 @@
+import asyncio
 from functools import partial
 from abc import ABCMeta, abstractmethod
 from datetime import datetime, timezone
-from collections.abc import Awaitable, AsyncIterator
-from typing import TYPE_CHECKING, Any, Union, Callable
+from collections.abc import Iterable, Iterator, Awaitable, AsyncIterator
+from typing import TYPE_CHECKING, Any, Union, Callable, Optional
 
 from nonebot.adapters import Bot, Adapter, Message
 
@@ -259,10 +260,97 @@ class Target:
         return f"Target({self.dump()})"
 
 
+_Record = tuple[str, bool, bool, Optional[str], Optional[str], Optional[dict[str, Any]]]
+"""(parent_id, channel, private, self_id, adapter, extra)"""
+
+
+class TargetIndex:
+    """拉取到的发送对象的索引
+
+    只以元组保存 `Target` 的各字段 (相同的 extra 只保存一份)，
+    并按 (id, parent_id, channel, private) 与 id 建立索引，使 `match` 的开销与缓存的发送对象数量无关。
+    迭代时会重新构造 `Target` 对象。
+    """
+
+    __slots__ = ("_by_id", "_exact", "_extras", "_size")
+
+    def __init__(self, targets: Iterable[Target] = ()):
+        self._by_id: dict[str, list[_Record]] = {}
+        self._exact: dict[tuple[str, str, bool, bool], _Record] = {}
+        self._extras: dict[tuple, dict[str, Any]] = {}
+        self._size = 0
+        for target in targets:
+            self.add(target)
+
+    def add(self, target: Target):
+        extra = None
+        if target.extra:
+            try:
+                frozen = tuple((k, tuple(v) if isinstance(v, list) else v) for k, v in target.extra.items())
+                extra = self._extras.setdefault(frozen, target.extra)
+            except TypeError:
+                extra = target.extra
+        key = (target.id, target.parent_id, target.channel, target.private)
+        record = (target.parent_id, target.channel, target.private, target.self_id, target.extra.get("adapter"), extra)
+        if (exists := self._exact.get(key)) is not None and exists[3:5] == record[3:5]:
+            return
+        self._exact.setdefault(key, record)
+        self._by_id.setdefault(target.id, []).append(record)
+        self._size += 1
+
+    def match(self, target: Target) -> bool:
+        """判断是否存在与 target 相符 (即 `target.verify` 成立) 的发送对象"""
+        adapter = target.extra.get("adapter")
+        record = self._exact.get((target.id, target.parent_id, target.channel, target.private))
+        if record is not None and _compatible(record, target.parent_id, target.self_id, adapter):
+            return True
+        for record in self._by_id.get(target.id, ()):
+            if (
+                record[1] == target.channel
+                and record[2] == target.private
+                and _compatible(record, target.parent_id, target.self_id, adapter)
+            ):
+                return True
+        return False
+
+    def __contains__(self, target: Target):
+        return self.match(target)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self) -> Iterator[Target]:
+        for id_, records in self._by_id.items():
+            for parent_id, channel, private, self_id, _, extra in records:
+                extra = dict(extra) if extra else {}
+                platforms = extra.pop("platforms", None)
+                yield Target(
+                    id_,
+                    parent_id,
+                    channel,
+                    private,
+                    self_id=self_id,
+                    scope=extra.pop("scope", None),
+                    adapter=extra.pop("adapter", None),
+                    platform=set(platforms) if platforms else None,
+                    extra=extra,
+                )
+
+
+def _compatible(record: _Record, parent_id: str, self_id: Optional[str], adapter: Optional[str]) -> bool:
+    if parent_id and record[0] and parent_id != record[0]:
+        return False
+    if self_id and record[3] and self_id != record[3]:
+        return False
+    return not (adapter and record[4] and adapter != record[4])
+
+
 class TargetFetcher(metaclass=ABCMeta):
     def __init__(self) -> None:
-        self.cache: dict[str, set[Target]] = {}
+        self.cache: dict[str, TargetIndex] = {}
         self.last_refresh: dict[str, datetime] = {}
+        self._pending: dict[tuple, asyncio.Future] = {}
+        self._carried: dict[str, list[Target]] = {}
 
     @classmethod
     @abstractmethod
@@ -272,38 +360,81 @@ class TargetFetcher(metaclass=ABCMeta):
     def fetch(self, bot: Bot, target: Union[Target, None] = None) -> AsyncIterator[Target]: ...
 
     async def refresh(self, bot: Bot, target: Union[Target, None] = None):
-        if bot.self_id in self.cache:
-            del self.cache[bot.self_id]
-        self.last_refresh[bot.self_id] = datetime.now(tz=timezone.utc)
-        _cache = self.cache.setdefault(bot.self_id, set())
-        async for tg in self.fetch(bot, target):
-            _cache.add(tg)
+        """拉取 bot 可用的发送对象并更新缓存
+
+        同一 bot 的相同拉取同时只会进行一次，全量拉取进行时其他拉取会直接等待其结果。
+        全量拉取完成前旧的缓存仍然可用，完成后整体替换；期间完成的增量拉取结果会一并并入新的缓存。
+
+        参数:
+            bot: 要拉取的 bot
+            target: 若提供，则只拉取与其相关的发送对象 (如其所在的群组) 并合并到现有缓存中
+        """
+        key = self._refresh_key(bot, target)
+        if (pending := self._get_pending(bot, key)) is not None:
+            return await asyncio.shield(pending)
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            if target is None:
+                self.last_refresh[bot.self_id] = datetime.now(tz=timezone.utc)
+                carried = self._carried[bot.self_id] = []
+                try:
+                    _cache = TargetIndex()
+                    async for tg in self.fetch(bot):
+                        _cache.add(tg)
+                    for tg in carried:
+                        _cache.add(tg)
+                    self.cache[bot.self_id] = _cache
+                finally:
+                    del self._carried[bot.self_id]
+            else:
+                async for tg in self.fetch(bot, target):
+                    # 每次都取当前的缓存，以免写入已被全量拉取替换的旧缓存
+                    self.cache.setdefault(bot.self_id, TargetIndex()).add(tg)
+                    if (carried := self._carried.get(bot.self_id)) is not None:
+                        carried.append(tg)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 避免无人等待时的警告
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(None)
+        finally:
+            del self._pending[key]
+
+    @staticmethod
+    def _refresh_key(bot: Bot, target: Union[Target, None] = None) -> tuple:
+        if target is None:
+            return (bot.self_id,)
+        return (bot.self_id, target.id, target.parent_id, target.channel, target.private)
+
+    def _get_pending(self, bot: Bot, key: tuple) -> Optional[asyncio.Future]:
+        """获取进行中的全量拉取，或与 key 相同的拉取"""
+        return self._pending.get((bot.self_id,)) or self._pending.get(key)
 
     def get_selector(self, bot: Bot):
         async def _check(target: Target):
-            if bot.self_id in self.cache:
-                targets = self.cache[bot.self_id]
-                if target in targets:
+            if (targets := self.cache.get(bot.self_id)) is not None:
+                if targets.match(target):
                     return True
                 target.self_id = bot.self_id
                 target.extra["adapter"] = self.get_adapter()
-                if target in targets:
+                if targets.match(target):
+                    return True
+            # 进行中的拉取可能包含该对象，先等待其完成再判断是否需要限流
+            if (pending := self._get_pending(bot, self._refresh_key(bot, target))) is not None:
+                await asyncio.shield(pending)
+                if (targets := self.cache.get(bot.self_id)) is not None and targets.match(target):
                     return True
-                for tg in targets:
-                    if target.verify(tg):
-                        return True
             now = datetime.now(tz=timezone.utc)
-            if bot.self_id in self.last_refresh and (now - self.last_refresh[bot.self_id]).seconds < 600:
+            if bot.self_id in self.last_refresh and (now - self.last_refresh[bot.self_id]).total_seconds() < 600:
                 return False
-            self.cache.pop(bot.self_id, None)
-            _cache = self.cache.setdefault(bot.self_id, set())
             self.last_refresh[bot.self_id] = now
-            count = 0
-            async for tg in self.fetch(bot, target):
-                _cache.add(tg)
-                if target.verify(tg):
-                    count += 1
-            return count > 0
+            # 只拉取与 target 相关的发送对象，合并到现有缓存中
+            await self.refresh(bot, target)
+            return (targets := self.cache.get(bot.self_id)) is not None and targets.match(target)
 
         return _check
 
@@ -1,64 +1,124 @@
 import re
-import functools
+from copy import deepcopy
 from string import Formatter
 from typing_extensions import TypeAlias
-from collections.abc import Mapping, Sequence
+from collections.abc import Mapping, Iterable, Sequence
 from typing import TYPE_CHECKING, Any, Union, TypeVar, Callable, Optional, cast
 
-from tarina import lang
+from tarina import LRU, lang
 import _string  # type: ignore
-from tarina.tools import gen_subclass
 
-from .segment import Segment
+from .segment import Segment, registry
 
 if TYPE_CHECKING:
-    from .message import UniMessage
+    from .message import UniMessage, UniMessageBuilder
 
 FormatSpecFunc: TypeAlias = Callable[[Any], str]
 FormatSpecFunc_T = TypeVar("FormatSpecFunc_T", bound=FormatSpecFunc)
 
-_MAPPING = {cls.__name__: cls for cls in gen_subclass(Segment)}
-_PATTERN = re.compile("(" + "|".join(_MAPPING.keys()) + r")\((.*)\)$")
+_PATTERN = re.compile(r"(\w+)\((.*)\)$")
 _I18N_PATTERN = re.compile(r"[^@]+\s*@\s*[^@]+")
 
 
-def _eval(route: str, obj: Any):
-    res = obj
-    parts = re.split(r"\.|(\[.+\])|(\(.*\))", route)
-    for part in parts[1:]:
+def _segment_type(name: str) -> Optional[type[Segment]]:
+    """按类名 (区分大小写) 查找已注册的消息段类型"""
+    cls = registry.TYPES.get(name.lower())
+    return cls if cls is not None and cls.__name__ == name else None
+
+
+def _is_content(value: Iterable) -> bool:
+    return all(isinstance(i, (str, Segment)) or (isinstance(i, Iterable) and _is_content(i)) for i in value)
+
+
+_ROUTE_SPLIT = re.compile(r"\.|(\[.+\])|(\(.*\))")
+_KV_PATTERN = re.compile(".+=.+")
+
+# 访问路径的操作
+_ATTR, _ITEM, _RAW_ITEM, _CALL, _PRIVATE = range(5)
+# 模板的操作
+_LITERAL, _SEGMENT, _I18N, _CONSTRUCT, _FIELD = range(5)
+
+Route: TypeAlias = tuple[tuple[int, Any], ...]
+
+
+def _compile_route(route: str) -> Route:
+    """将形如 `event.get_user_id()` 的访问路径预先拆分为操作序列"""
+    steps = []
+    for part in _ROUTE_SPLIT.split(route)[1:]:
         if not part:
             continue
         if part.startswith("_"):
-            raise ValueError(route)
-        if part.startswith("[") and part.endswith("]"):
+            steps.append((_PRIVATE, route))
+        elif part.startswith("[") and part.endswith("]"):
             item = part[1:-1]
             if item[0] in ("'", '"') and item[-1] in ("'", '"'):
-                res = res[item[1:-1]]
-            elif ":" in item:
-                res = res[slice(*(int(x) if x else None for x in item.split(":")))]
+                steps.append((_ITEM, item[1:-1]))
+                continue
+            try:
+                key = slice(*(int(x) if x else None for x in item.split(":"))) if ":" in item else int(item)
+            except ValueError:
+                steps.append((_RAW_ITEM, item))
             else:
-                res = res[int(item)]
+                steps.append((_ITEM, key))
         elif part.startswith("(") and part.endswith(")"):
             item = part[1:-1]
-            if not item:
-                res = res()
-            else:
-                _parts = item.split(",")
-                _args = []
-                _kwargs = {}
-                for part in _parts:
-                    part = part.strip()
-                    if re.match(".+=.+", part):
-                        k, v = part.split("=")
+            _args = []
+            _kwargs = {}
+            if item:
+                for arg in item.split(","):
+                    arg = arg.strip()
+                    if _KV_PATTERN.match(arg):
+                        k, v = arg.split("=")
                         _kwargs[k] = v
                     else:
-                        _args.append(part)
-                res = res(*_args, **_kwargs)
+                        _args.append(arg)
+            steps.append((_CALL, (tuple(_args), _kwargs)))
+        else:
+            steps.append((_ATTR, part))
+    return tuple(steps)
+
+
+def _eval(route: Route, obj: Any):
+    res = obj
+    for kind, arg in route:
+        if kind == _ATTR:
+            res = getattr(res, arg)
+        elif kind == _ITEM:
+            res = res[arg]
+        elif kind == _CALL:
+            res = res(*arg[0], **arg[1])
+        elif kind == _RAW_ITEM:
+            res = res[slice(*(int(x) if x else None for x in arg.split(":"))) if ":" in arg else int(arg)]
         else:
-            res = getattr(res, part)
+            raise ValueError(arg)
     return res
 
 
+def _compile_parts(spec: str, strip: bool) -> tuple:
+    """预先拆分 `k=v` 形式的参数，并记录以 `$` 开头的值所需的参数名与访问路径"""
+    parts = []
+    for part in spec.split(","):
+        if strip:
+            part = part.strip()
+        key = part.split(".")[0] if part.startswith("$") else None
+        kv = part.split("=") if _KV_PATTERN.match(part) else None
+        value = kv[-1] if kv else ""
+        parts.append(
+            (
+                part,
+                key,
+                _compile_route(part[1:]) if key else None,
+                kv,
+                value.split(".")[0] if value.startswith("$") else None,
+                _compile_route(value[1:]) if value.startswith("$") else None,
+            )
+        )
+    return tuple(parts)
+
+
+_compiled: "LRU[tuple[str, int], tuple]" = LRU(512)
+
+
 class UniMessageTemplate(Formatter):
     """通用消息模板格式化实现类。
 
@@ -77,6 +137,7 @@ class UniMessageTemplate(Formatter):
         self.factory = factory
         self.format_specs: dict[str, FormatSpecFunc] = {}
         self.private_getattr = private_getattr
+        self._compiled: Optional[tuple[Any, int, tuple]] = None
 
     def __repr__(self) -> str:
         return f"UniMessageTemplate({self.template!r})"
@@ -97,140 +158,136 @@ class UniMessageTemplate(Formatter):
         return self._format([], mapping)
 
     def _format(self, args: Sequence[Any], kwargs: Mapping[str, Any]):
-        full_message = self.factory()
-        used_args, arg_index = set(), 0
+        from .message import UniMessageBuilder
+
+        builder = UniMessageBuilder(self.factory)
+        self._render(builder, self.compile(), args, kwargs)
+        return builder.build()
+
+    def compile(self) -> tuple:
+        """将模板编译为操作序列
 
+        字符串模板的结果缓存于模板对象上，并按模板内容全局缓存，注册新的消息段类型后失效；
+        UniMessage 模板可变，每次重新编译
+        """
+        version = registry.version
+        if self._compiled is not None and self._compiled[0] is self.template and self._compiled[1] == version:
+            return self._compiled[2]
         if isinstance(self.template, str):
-            msg, arg_index = self._vformat(self.template, args, kwargs, used_args, arg_index)
-            full_message += msg
-        elif isinstance(self.template, self.factory):
+            if (ops := _compiled.get((self.template, version))) is None:
+                ops, _ = self._compile_string(self.template)
+                _compiled[(self.template, version)] = ops
+            self._compiled = (self.template, version, ops)
+            return ops
+        if isinstance(self.template, self.factory):
             template = cast("UniMessage[Segment]", self.template)
+            _ops = []
+            arg_index = 0
             for seg in template:
                 if not seg.is_text():
-                    full_message += seg
+                    _ops.append((_SEGMENT, seg))
                 else:
-                    msg, arg_index = self._vformat(str(seg), args, kwargs, used_args, arg_index)
-                    full_message += msg
-        else:
-            raise TypeError("template must be a string or instance of UniMessage!")
-
-        # self.check_unused_args(used_args, args, kwargs)
-        return full_message
-
-    # def check_unused_args(
-    #     self,
-    #     used_args: Sequence[Union[str, int]],
-    #     args: Sequence[Any],
-    #     kwargs: Mapping[str, Any],
-    # ) -> None:
-    #     indexes = [i for i in used_args if isinstance(i, int)]
-    #     if indexes and len(indexes) != len(args):
-    #         raise ValueError(
-    #             f"not all arguments converted during string formatting: "
-    #             f"{[c for i, c in enumerate(args) if i not in indexes]}"
-    #         )
-    #     keys = [k for k in used_args if isinstance(k, str)]
-    #     if keys and keys != list(kwargs.keys()):
-    #         raise ValueError(
-    #             f"not all arguments converted during string formatting: " f"{set(kwargs) - set(keys)}"
-    #         )
-
-    def _vformat(
-        self,
-        format_string: str,
-        args: Sequence[Any],
-        kwargs: Mapping[str, Any],
-        used_args: set[Union[int, str]],
-        auto_arg_index: int = 0,
-    ) -> tuple["UniMessage", int]:
-        results: list = [self.factory()]
+                    res, arg_index = self._compile_string(str(seg), arg_index)
+                    _ops.extend(res)
+            return tuple(_ops)
+        raise TypeError("template must be a string or instance of UniMessage!")
 
+    def _compile_string(self, format_string: str, auto_arg_index: Union[int, bool] = 0) -> tuple[tuple, Any]:
+        ops = []
         for literal_text, field_name, format_spec, conversion in self.parse(format_string):
-            # output the literal text
             if literal_text:
-                results.append(literal_text)
-
-            # if there's a field, output it
-            if field_name is not None:
-                if mat := _I18N_PATTERN.match(field_name):
-                    scope, key = mat[0].split("@")
-                    ans = lang.require(scope.strip(), key.strip())
-                    if format_spec:
-                        _kwargs = {}
-                        for part in format_spec.split(","):
-                            if re.match(".+=.+", part):
-                                k, v = part.split("=")
-                                if v in kwargs:
-                                    _kwargs[k] = kwargs[v]
-                                    used_args.add(v)
-                                elif v.startswith("$") and (key := v.split(".")[0]) in kwargs:
-                                    _kwargs[k] = _eval(v[1:], kwargs[key])
-                                else:
-                                    _kwargs[k] = v
-                            elif part in kwargs:
-                                _kwargs[part] = kwargs[part]
-                        if _kwargs:
-                            ans = ans.format_map(_kwargs)
-                    results.append(ans)
-                    continue
-                if field_name == "" and format_spec and (mat := _PATTERN.match(format_spec)):
-                    cls, parts = _MAPPING[mat[1]], mat[2].split(",")
-                    _args = []
+                ops.append((_LITERAL, literal_text))
+            if field_name is None:
+                continue
+            if mat := _I18N_PATTERN.match(field_name):
+                scope, key = mat[0].split("@")
+                parts = _compile_parts(format_spec, False) if format_spec else ()
+                ops.append((_I18N, scope.strip(), key.strip(), parts))
+                continue
+            if (
+                field_name == ""
+                and format_spec
+                and (mat := _PATTERN.match(format_spec))
+                and (seg_type := _segment_type(mat[1]))
+            ):
+                ops.append((_CONSTRUCT, seg_type, _compile_parts(mat[2], True)))
+                continue
+            if field_name == "":
+                if auto_arg_index is False:
+                    raise ValueError("cannot switch from manual field specification to " "automatic field numbering")
+                field_name = str(auto_arg_index)
+                auto_arg_index += 1
+            elif field_name.isdigit():
+                if auto_arg_index:
+                    raise ValueError("cannot switch from manual field specification to " "automatic field numbering")
+                # disable auto arg incrementing, if it gets
+                # used later on, then an exception will be raised
+                auto_arg_index = False
+            ops.append((_FIELD, field_name, conversion, format_spec))
+        return tuple(ops), auto_arg_index
+
+    def _render(
+        self,
+        builder: "UniMessageBuilder",
+        ops: tuple,
+        args: Sequence[Any],
+        kwargs: Mapping[str, Any],
+    ) -> None:
+        for op in ops:
+            kind = op[0]
+            if kind == _LITERAL:
+                builder.text(op[1])
+            elif kind == _SEGMENT:
+                builder.append(deepcopy(op[1]))
+            elif kind == _FIELD:
+                _, field_name, conversion, format_spec = op
+                obj, _ = self.get_field(field_name, args, kwargs)
+                obj = self.convert_field(obj, conversion) if conversion else obj
+                self._append(builder, self.format_field(obj, format_spec) if format_spec else obj)
+            elif kind == _I18N:
+                _, scope, key, parts = op
+                ans = lang.require(scope, key)
+                if parts:
                     _kwargs = {}
-                    for part in parts:
-                        part = part.strip()
-                        if part.startswith("$") and (key := part.split(".")[0]) in kwargs:
-                            _args.append(_eval(part[1:], kwargs[key]))
-                        elif re.match(".+=.+", part):
-                            k, v = part.split("=")
+                    for part, _, _, kv, value_key, value_route in parts:
+                        if kv:
+                            k, v = kv
                             if v in kwargs:
                                 _kwargs[k] = kwargs[v]
-                                used_args.add(v)
-                            elif v.startswith("$") and (key := v.split(".")[0]) in kwargs:
-                                _kwargs[k] = _eval(v[1:], kwargs[key])
+                            elif value_key and value_key in kwargs:
+                                _kwargs[k] = _eval(value_route, kwargs[value_key])
                             else:
                                 _kwargs[k] = v
                         elif part in kwargs:
-                            _args.append(kwargs[part])
-                            used_args.add(part)
+                            _kwargs[part] = kwargs[part]
+                    if _kwargs:
+                        ans = ans.format_map(_kwargs)
+                builder.text(ans)
+            else:
+                _, cls, parts = op
+                _args = []
+                _kwargs = {}
+                for part, part_key, part_route, kv, value_key, value_route in parts:
+                    if part_key and part_key in kwargs:
+                        _args.append(_eval(part_route, kwargs[part_key]))
+                    elif kv:
+                        k, v = kv
+                        if v in kwargs:
+                            _kwargs[k] = kwargs[v]
+                        elif value_key and value_key in kwargs:
+                            _kwargs[k] = _eval(value_route, kwargs[value_key])
                         else:
-                            _args.append(part)
-                    results.append(cls(*_args, **_kwargs))  # type: ignore
-                    continue
-                if field_name == "":
-                    if auto_arg_index is False:
-                        raise ValueError(
-                            "cannot switch from manual field specification to " "automatic field numbering"
-                        )
-                    field_name = str(auto_arg_index)
-                    auto_arg_index += 1
-                elif field_name.isdigit():
-                    if auto_arg_index:
-                        raise ValueError(
-                            "cannot switch from manual field specification to " "automatic field numbering"
-                        )
-                    # disable auto arg incrementing, if it gets
-                    # used later on, then an exception will be raised
-                    auto_arg_index = False
-
-                # given the field_name, find the object it references
-                #  and the argument it came from
-                obj, arg_used = self.get_field(field_name, args, kwargs)
-                used_args.add(arg_used)
-
-                # do any conversion on the resulting object
-                obj = self.convert_field(obj, conversion) if conversion else obj
-
-                # format the object and append to the result
-                formatted_text = self.format_field(obj, format_spec) if format_spec else obj
-                results.append(formatted_text)
-
-        return functools.reduce(self._add, results), auto_arg_index
+                            _kwargs[k] = v
+                    elif part in kwargs:
+                        _args.append(kwargs[part])
+                    else:
+                        _args.append(part)
+                self._append(builder, cls(*_args, **_kwargs))
 
     def format_field(self, value: Any, format_spec: str) -> Any:
         formatter: Optional[FormatSpecFunc] = self.format_specs.get(format_spec)
-        if formatter is None and format_spec in _MAPPING:
-            formatter = _MAPPING[format_spec]  # type: ignore
+        if formatter is None:
+            formatter = _segment_type(format_spec)  # type: ignore
         return super().format_field(value, format_spec) if formatter is None else formatter(value)
 
     def get_field(self, field_name, args, kwargs):
@@ -245,8 +302,18 @@ class UniMessageTemplate(Formatter):
 
         return obj, first
 
-    def _add(self, a: Any, b: Any) -> Any:
-        try:
-            return a + b
-        except TypeError:
-            return a + str(b)
+    def _append(self, builder: "UniMessageBuilder", value: Any) -> None:
+        """追加格式化结果；无法作为消息内容的对象会被转为字符串
+
+        传入的消息段会被复制，每次渲染的结果互不共享，也不会引用格式化参数本身
+        """
+        if isinstance(value, str):
+            builder.append(value)
+            return
+        if isinstance(value, Segment):
+            builder.append(deepcopy(value))
+            return
+        if isinstance(value, Iterable) and _is_content(items := list(value)):
+            builder.extend(deepcopy(items))
+            return
+        builder.text(str(value))
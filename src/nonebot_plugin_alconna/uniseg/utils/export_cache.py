@@ -0,0 +1,105 @@
+from copy import copy, deepcopy
+from collections import OrderedDict
+from collections.abc import Iterable, Awaitable
+from typing import TYPE_CHECKING, Union, Callable, Optional
+
+from nonebot.internal.adapter import Message
+
+from ..fallback import FallbackStrategy
+from ..segment import At, Text, AtAll, Emoji, Hyper, Button, Segment, Keyboard, custom
+
+if TYPE_CHECKING:
+    from ..message import UniMessage
+
+ExportKey = tuple[str, int, Union[bool, FallbackStrategy]]
+CACHEABLE: set[type[Segment]] = {Text, At, AtAll, Emoji, Hyper, Button, Keyboard}
+"""转换结果只取决于自身内容的元素类型；回复、媒体、i18n 等元素的转换依赖上下文或涉及上传，不参与缓存"""
+
+
+def cacheable(segments: Iterable[Segment]) -> bool:
+    return all(
+        seg.__class__ in CACHEABLE and seg.__class__ not in custom.EXPORTERS and cacheable(seg._children)
+        for seg in segments
+    )
+
+
+def copy_message(message: Message) -> Message:
+    """复制消息，其中的消息段与其 data 均为副本，从而发送前对消息的修改不会影响缓存
+
+    data 中嵌套的值不会被复制，因此比 `Message.copy` 的深拷贝快得多。
+    """
+    segments = []
+    for seg in message:
+        seg = copy(seg)
+        if isinstance(data := getattr(seg, "data", None), dict):
+            seg.data = data.copy()
+        segments.append(seg)
+    return message.__class__(segments)
+
+
+class ExportCache:
+    """已转换消息的缓存
+
+    以 (适配器, 消息的结构哈希, 回退策略) 为键，记录只由文本、at、表情、按钮等元素组成的消息的转换结果。
+    命中时返回此前结果的副本，适用于帮助信息、菜单等重复发送的固定回复。
+
+    参数:
+        capacity: 最多缓存的条目数，超出时淘汰最久未使用的条目
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[ExportKey, tuple[UniMessage, Message]] = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    async def fetch(
+        self,
+        msg: "UniMessage",
+        adapter: str,
+        fallback: Union[bool, FallbackStrategy],
+        export: Callable[[], Awaitable[Message]],
+    ) -> Message:
+        """获取缓存的转换结果，不存在或消息不可缓存时执行转换"""
+        if not cacheable(msg):
+            return await export()
+        key = (adapter, msg.structural_hash(), fallback)
+        if (item := self._data.get(key)) is not None and item[0] == msg:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return copy_message(item[1])
+        self.misses += 1
+        result = await export()
+        self._data[key] = (deepcopy(msg), copy_message(result))
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+        return result
+
+
+_cache: Optional[ExportCache] = None
+
+
+def get_export_cache() -> Optional[ExportCache]:
+    return _cache
+
+
+def apply(capacity: int = 256):
+    global _cache  # noqa: PLW0603
+
+    _old = _cache
+    _cache = ExportCache(capacity)
+
+    def dispose():
+        global _cache  # noqa: PLW0603
+
+        _cache = _old
+
+    return dispose
@@ -7,9 +7,38 @@ License: MIT
 
 import json
 from pathlib import Path
+from functools import lru_cache
 
-with (Path(__file__).parent / "data.json").open(encoding="utf-8") as data_file:
-    data = json.load(data_file)
+
+@lru_cache(None)
+def _load() -> list:
+    """Loads signature data on first use"""
+    with (Path(__file__).parent / "data.json").open(encoding="utf-8") as data_file:
+        return json.load(data_file)
+
+
+@lru_cache(None)
+def _compile() -> dict:
+    """
+    Groups signatures by offset and first byte
+
+    Returns:
+        (dict) -> {offset: {first byte: [(signature bytes, order, element, length)]}}
+    """
+    table = {}
+    order = 0
+    for element in _load():
+        for signature in element["signature"]:
+            raw = bytes.fromhex(signature)
+            table.setdefault(element["offset"], {}).setdefault(raw[0], []).append((raw, order, element, len(signature)))
+            order += 1
+    return table
+
+
+def __getattr__(name: str):
+    if name == "data":
+        return _load()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Info:
@@ -57,18 +86,21 @@ def get(obj: bytes):
     if not isinstance(obj, bytes):
         raise TypeError("object type must be bytes")
 
-    stream = " ".join([f"{byte:02X}" for byte in obj])
+    matched = []
+    size = len(obj)
+    for offset, candidates in _compile().items():
+        if offset < size and (group := candidates.get(obj[offset])):
+            matched.extend(item for item in group if obj.startswith(item[0], offset))
+    # keep the order of the signature table, later matches overwrite earlier ones
+    matched.sort(key=lambda x: x[1])
 
     types = {}
     extensions = {}
     mimes = {}
-    for element in data:
-        for signature in element["signature"]:
-            offset = element["offset"] * 2 + element["offset"]
-            if signature == stream[offset : len(signature) + offset]:
-                types[element["type"]] = len(signature)
-                extensions[element["extension"]] = len(signature)
-                mimes[element["mime"]] = len(signature)
+    for _, _, element, length in matched:
+        types[element["type"]] = length
+        extensions[element["extension"]] = length
+        mimes[element["mime"]] = length
     return Info(
         sorted(types, key=lambda x: types.get(x, False), reverse=True),
         sorted(extensions.keys(), key=lambda x: extensions.get(x, False), reverse=True),
@@ -78,14 +110,14 @@ def get(obj: bytes):
 
 def supported_types():
     """Returns a list of supported file types"""
-    return sorted({x["type"] for x in data})
+    return sorted({x["type"] for x in _load()})
 
 
 def supported_extensions():
     """Returns a list of supported file extensions"""
-    return sorted({x["extension"] for x in data})
+    return sorted({x["extension"] for x in _load()})
 
 
 def supported_mimes():
     """Returns a list of supported file MIME types"""
-    return sorted({x["mime"] for x in data})
+    return sorted({x["mime"] for x in _load()})
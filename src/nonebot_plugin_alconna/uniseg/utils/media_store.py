@@ -0,0 +1,269 @@
+import json
+import atexit
+import asyncio
+import hashlib
+import threading
+from time import time
+from io import BytesIO
+from pathlib import Path
+from collections import OrderedDict
+from typing import Union, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from . import fleep
+from ..constraint import log
+
+INDEX_NAME = "index.json"
+
+
+def content_name(raw: Union[bytes, BytesIO]) -> str:
+    """计算媒体内容在存储中的相对路径，形如 `ab/abcdef....png`"""
+    if isinstance(raw, BytesIO):
+        with raw.getbuffer() as view:
+            digest = hashlib.sha256(view).hexdigest()
+            header = bytes(view[:128])
+    else:
+        digest = hashlib.sha256(raw).hexdigest()
+        header = raw[:128]
+    info = fleep.get(header)
+    ext = info.extensions[0] if info.extensions else "bin"
+    return f"{digest[:2]}/{digest}.{ext}"
+
+
+class MediaStore:
+    """按内容寻址的媒体文件存储
+
+    文件以内容摘要命名，相同内容只会写入一次。`put` 在调用线程中写入，`put_async` 与 `submit` 在线程池中写入；
+    它们都在文件写入完成后才给出路径。
+    目录下的索引文件记录每个文件的大小与最近访问时间，超出配额时按最近最少访问的顺序淘汰文件。
+    索引在线程池中加载，其修改会在 `index_delay` 秒后合并为一次写入。
+
+    参数:
+        root: 存储目录
+        quota: 占用空间的上限 (字节)，为 None 时不限制
+        max_workers: 写入线程数
+    """
+
+    index_delay: float = 1
+
+    def __init__(self, root: Union[str, Path], quota: Optional[int] = None, max_workers: int = 2):
+        self.root = Path(root).resolve()
+        self.quota = quota
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+        self._writing: dict[str, Future] = {}
+        self._futures: set[Future] = set()
+        self._lock = threading.RLock()
+        self._index_lock = threading.Lock()
+        self._index_timer: Optional[threading.Timer] = None
+        self._version = 0
+        self._saved_version = 0
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="alconna-media")
+        self._loaded = self._executor.submit(self.load)
+        atexit.register(self.flush)
+
+    def __len__(self):
+        self._loaded.result()
+        return len(self._entries)
+
+    def __contains__(self, name: str):
+        self._loaded.result()
+        return name in self._entries
+
+    def put(self, raw: Union[bytes, BytesIO]) -> Path:
+        """在调用线程中存储媒体内容
+
+        参数:
+            raw: 媒体内容
+
+        返回:
+            写入完成的文件路径
+        """
+        return self._store(raw.getvalue() if isinstance(raw, BytesIO) else raw)
+
+    def submit(self, raw: Union[bytes, BytesIO]) -> "Future[Path]":
+        """在线程池中存储媒体内容并立即返回
+
+        参数:
+            raw: 媒体内容
+
+        返回:
+            结果为写入完成的文件路径的 Future
+        """
+        future = self._executor.submit(self._store, raw.getvalue() if isinstance(raw, BytesIO) else raw)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    async def put_async(self, raw: Union[bytes, BytesIO]) -> Path:
+        """在线程池中存储媒体内容，不阻塞事件循环
+
+        参数:
+            raw: 媒体内容
+
+        返回:
+            写入完成的文件路径
+        """
+        return await asyncio.wrap_future(self.submit(raw))
+
+    def flush(self, timeout: Optional[float] = None):
+        """阻塞等待所有已提交的写入完成，并立即写入尚未保存的索引"""
+        wait(list(self._futures), timeout)
+        with self._lock:
+            timer, self._index_timer = self._index_timer, None
+        if timer is not None:
+            timer.cancel()
+        if self._loaded.done():
+            self.save()
+
+    async def wait(self):
+        """等待所有已提交的写入完成，并写入尚未保存的索引"""
+        if futures := list(self._futures):
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in futures), return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _store(self, data: bytes) -> Path:
+        name = content_name(data)
+        path = self.root / name
+        self._loaded.result()
+        with self._lock:
+            if (writing := self._writing.get(name)) is None:
+                if name in self._entries and path.exists():
+                    self._entries[name] = (self._entries[name][0], time())
+                    self._entries.move_to_end(name)
+                    self._changed()
+                    return path
+                writing = self._writing[name] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return writing.result()
+        try:
+            self._write(name, data)
+        except BaseException as e:
+            writing.set_exception(e)
+            raise
+        else:
+            writing.set_result(path)
+            return path
+        finally:
+            with self._lock:
+                self._writing.pop(name, None)
+
+    def _write(self, name: str, data: bytes):
+        path = self.root / name
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        with self._lock:
+            if (entry := self._entries.get(name)) is not None:
+                self.size -= entry[0]
+            self.size += len(data)
+            self._entries[name] = (len(data), time())
+            self._entries.move_to_end(name)
+            removed = self._evict(keep=name)
+            self._changed()
+        for victim in removed:
+            try:
+                (self.root / victim).unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                log("WARNING", f"failed to remove media file {victim}: {e}")
+
+    def _evict(self, keep: str) -> list[str]:
+        if self.quota is None or self.size <= self.quota:
+            return []
+        removed = []
+        for name in list(self._entries):
+            if self.size <= self.quota:
+                break
+            if name == keep or name in self._writing:
+                continue
+            size, _ = self._entries.pop(name)
+            self.size -= size
+            removed.append(name)
+        return removed
+
+    def _changed(self):
+        """记录索引的修改，并在 `index_delay` 秒后写入索引"""
+        self._version += 1
+        if self._index_timer is None:
+            self._index_timer = threading.Timer(self.index_delay, self._save_later)
+            self._index_timer.daemon = True
+            self._index_timer.start()
+
+    def _save_later(self):
+        with self._lock:
+            self._index_timer = None
+        self.save()
+
+    def load(self):
+        """读取存储目录中的索引；索引中的文件不会逐个检查，已被删除的文件会在再次存储时重新写入"""
+        path = self.root / INDEX_NAME
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            log("WARNING", f"failed to load media index from {path}: {e}")
+            return
+        with self._lock:
+            for name, size, atime in sorted(entries, key=lambda x: x[2]):
+                self._entries[name] = (size, atime)
+                self.size += size
+
+    def save(self):
+        """将尚未保存的索引写入存储目录"""
+        with self._lock:
+            version = self._version
+            entries = [[name, size, atime] for name, (size, atime) in self._entries.items()]
+        with self._index_lock:
+            if version <= self._saved_version:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self.root / INDEX_NAME
+            tmp = path.with_suffix(".json.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            tmp.replace(path)
+            self._saved_version = version
+
+
+_quota: Optional[int] = None
+_stores: dict[Path, MediaStore] = {}
+
+
+def get_media_store(root: Union[str, Path]) -> MediaStore:
+    """获取指定目录的媒体存储，同一目录共享一个实例"""
+    root = Path(root).resolve()
+    if (store := _stores.get(root)) is None:
+        store = _stores[root] = MediaStore(root, _quota)
+    return store
+
+
+def apply(quota: Optional[int] = None):
+    global _quota  # noqa: PLW0603
+
+    _old = _quota
+    _quota = quota
+    for store in _stores.values():
+        store.quota = quota
+
+    def dispose():
+        global _quota  # noqa: PLW0603
+
+        _quota = _old
+        for store in _stores.values():
+            store.quota = _old
+
+    return dispose
@@ -0,0 +1,256 @@
+import json
+import asyncio
+import hashlib
+import threading
+from time import time
+from io import BytesIO
+from pathlib import Path
+from collections import OrderedDict
+from collections.abc import Awaitable
+from typing import Any, Union, TypeVar, Callable, Optional
+
+from nonebot.internal.adapter import Bot
+
+from ..constraint import log
+from ..segment import Media
+
+T = TypeVar("T")
+UploadKey = tuple[str, str, str, str]
+INLINE_HASH_SIZE = 64 * 1024
+"""不超过该大小的原始数据直接在事件循环中计算摘要，更大的数据与文件路径在线程中处理"""
+
+
+def media_key(seg: Media) -> Optional[str]:
+    """获取媒体元素内容的标识；url 与路径直接作为标识，原始数据则使用其摘要"""
+    if seg.url:
+        return f"url:{seg.url}"
+    if seg.path:
+        path = Path(seg.path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return f"path:{path.resolve().as_posix()}:{stat.st_mtime_ns}:{stat.st_size}"
+    if seg.raw:
+        if isinstance(seg.raw, BytesIO):
+            with seg.raw.getbuffer() as view:
+                return f"sha256:{hashlib.sha256(view).hexdigest()}"
+        return f"sha256:{hashlib.sha256(seg.raw).hexdigest()}"
+    return None
+
+
+def raw_size(raw: Union[bytes, BytesIO, None]) -> int:
+    if raw is None:
+        return 0
+    if isinstance(raw, BytesIO):
+        with raw.getbuffer() as view:
+            return view.nbytes
+    return len(raw)
+
+
+async def get_media_key(seg: Media) -> Optional[str]:
+    """与 `media_key` 相同，但较大的原始数据与文件路径在线程中计算，不阻塞事件循环"""
+    if seg.url or (not seg.path and raw_size(seg.raw) <= INLINE_HASH_SIZE):
+        return media_key(seg)
+    return await asyncio.get_running_loop().run_in_executor(None, media_key, seg)
+
+
+def entry_size(key: UploadKey, value: Any) -> int:
+    """估算条目序列化后占用的字节数"""
+    return len(json.dumps([key, value], ensure_ascii=False).encode())
+
+
+class UploadCache:
+    """媒体上传结果的缓存
+
+    以 (适配器, bot id, 上传方式, 内容标识) 为键，记录平台返回的文件 key/id/url 等结果。
+    持久化时，修改会在 `save_delay` 秒后合并为一次写入，并在线程中进行。
+
+    参数:
+        capacity: 最多缓存的条目数，超出时淘汰最久未使用的条目
+        ttl: 条目的存活时间 (秒)，为 None 时不过期
+        path: 持久化文件路径，为 None 时仅缓存在内存中
+        max_size: 所有条目序列化后占用的字节数上限，超出时淘汰最久未使用的条目；为 None 时不限制
+    """
+
+    save_delay: float = 5
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        ttl: Optional[float] = 86400,
+        path: Union[str, Path, None] = None,
+        max_size: Optional[int] = None,
+    ):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.max_size = max_size
+        self.size = 0
+        self._data: OrderedDict[UploadKey, tuple[float, Any, int]] = OrderedDict()
+        self._pending: dict[UploadKey, asyncio.Future] = {}
+        self._save_handle: Optional[asyncio.TimerHandle] = None
+        self._save_lock = threading.Lock()
+        self._version = 0
+        self._saved_version = 0
+        if self.path and self.path.exists():
+            self.load()
+
+    def get(self, key: UploadKey) -> Optional[Any]:
+        if (item := self._data.get(key)) is None:
+            return None
+        if self.ttl is not None and time() - item[0] > self.ttl:
+            del self._data[key]
+            self.size -= item[2]
+            return None
+        self._data.move_to_end(key)
+        return item[1]
+
+    def set(self, key: UploadKey, value: Any, timestamp: Optional[float] = None):
+        size = entry_size(key, value)
+        if (old := self._data.get(key)) is not None:
+            self.size -= old[2]
+        self._data[key] = (time() if timestamp is None else timestamp, value, size)
+        self._data.move_to_end(key)
+        self.size += size
+        while len(self._data) > self.capacity or (self.max_size is not None and self.size > self.max_size):
+            self.size -= self._data.popitem(last=False)[1][2]
+        self._version += 1
+
+    def clear(self):
+        self._data.clear()
+        self.size = 0
+        self._version += 1
+        if self.path:
+            self.schedule_save()
+
+    def __len__(self):
+        return len(self._data)
+
+    async def fetch(self, key: UploadKey, upload: Callable[[], Awaitable[T]]) -> T:
+        """获取缓存的上传结果，不存在时执行上传；相同键的并发上传只会执行一次"""
+        if (value := self.get(key)) is not None:
+            return value
+        if (pending := self._pending.get(key)) is not None:
+            return await asyncio.shield(pending)
+        future = self._pending[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await upload()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 避免无人等待时的警告
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(value)
+            self.set(key, value)
+            if self.path:
+                self.schedule_save()
+            return value
+        finally:
+            del self._pending[key]
+
+    def load(self):
+        assert self.path
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            log("WARNING", f"failed to load upload cache from {self.path}: {e}")
+            return
+        for entry in entries:
+            self.set(tuple(entry["key"]), entry["value"], entry["time"])  # type: ignore
+        self._saved_version = self._version
+
+    def schedule_save(self):
+        """在 `save_delay` 秒后于线程中写入持久化文件；期间的修改会合并为一次写入
+
+        不在事件循环中调用时直接写入。
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        if self._save_handle is None:
+            self._save_handle = loop.call_later(self.save_delay, self._save_in_thread, loop)
+
+    def _save_in_thread(self, loop: asyncio.AbstractEventLoop):
+        self._save_handle = None
+        loop.run_in_executor(None, self._dump, *self._snapshot())
+
+    def flush(self):
+        """立即写入尚未保存的修改"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        if self._version != self._saved_version:
+            self.save()
+
+    def _snapshot(self) -> tuple[list[dict[str, Any]], int]:
+        entries = [{"key": list(key), "time": ts, "value": value} for key, (ts, value, _) in self._data.items()]
+        return entries, self._version
+
+    def _dump(self, entries: list[dict[str, Any]], version: int):
+        assert self.path
+        with self._save_lock:
+            if version <= self._saved_version:
+                return
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(f"{self.path.suffix}.tmp")
+                with tmp.open("w", encoding="utf-8") as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                tmp.replace(self.path)
+            except OSError as e:
+                log("WARNING", f"failed to save upload cache to {self.path}: {e}")
+                return
+            self._saved_version = version
+
+    def save(self):
+        """立即写入持久化文件"""
+        self._dump(*self._snapshot())
+
+
+_cache: Optional[UploadCache] = None
+
+
+def get_upload_cache() -> Optional[UploadCache]:
+    return _cache
+
+
+async def cached_upload(bot: Bot, seg: Media, method: str, upload: Callable[[], Awaitable[T]]) -> T:
+    """在启用上传缓存时，复用相同内容此前的上传结果
+
+    参数:
+        bot: 执行上传的 bot
+        seg: 待上传的媒体元素
+        method: 上传方式，用于区分同一内容在不同接口下的结果；上传结果依赖文件名时应一并包含
+        upload: 实际执行上传的函数，其结果需可被 json 序列化以便持久化
+    """
+    if _cache is None or (key := await get_media_key(seg)) is None:
+        return await upload()
+    return await _cache.fetch((bot.adapter.get_name(), bot.self_id, method, key), upload)
+
+
+def apply(
+    capacity: int = 1024,
+    ttl: Optional[float] = 86400,
+    path: Union[str, Path, None] = None,
+    max_size: Optional[int] = None,
+):
+    global _cache  # noqa: PLW0603
+
+    _old = _cache
+    _cache = UploadCache(capacity, ttl, path, max_size)
+
+    def dispose():
+        global _cache  # noqa: PLW0603
+
+        if _cache is not None and _cache.path:
+            _cache.flush()
+        _cache = _old
+
+    return dispose
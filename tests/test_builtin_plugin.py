@@ -90,6 +90,8 @@ async def test_lang_switch(app: App):
         ctx.should_finished()
 
     assert lang.current == "en-US"
+    # 恢复默认语言，以免影响同一进程中之后运行的测试
+    lang.select("zh-CN")
 
 
 @pytest.mark.asyncio()
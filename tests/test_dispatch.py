@@ -0,0 +1,68 @@
+import pytest
+from nonebug import App
+from nonebot import get_adapter
+from arclet.alconna import Args, Alconna, command_manager
+from nonebot.adapters.onebot.v11 import Bot, Adapter, Message
+
+from tests.fake import fake_group_message_event_v11
+
+
+def test_head_index():
+    from nonebot_plugin_alconna import At, Text, UniMessage
+    from nonebot_plugin_alconna.dispatch import HeadIndex, _literal_prefix
+
+    assert _literal_prefix("foo") == "foo"
+    assert _literal_prefix(r"\/foo(\d+)") == "/foo"
+    assert _literal_prefix("foob?ar") == "foo"
+    assert _literal_prefix("foo|bar") == ""
+    assert _literal_prefix(r"\d+foo") == ""
+
+    index = HeadIndex()
+    alc1 = Alconna(["/", "!"], "dispatch1", Args["a", int])
+    alc2 = Alconna("dispatch2")
+    alc3 = Alconna("re:dispatch\\d")
+    for alc in (alc1, alc2, alc3):
+        index.register(alc)
+
+    assert index.check(alc1, UniMessage("/dispatch1 123"))
+    assert index.check(alc1, UniMessage("!dispatch1"))
+    assert not index.check(alc1, UniMessage("dispatch1 123"))
+    assert index.check(alc2, UniMessage("  dispatch2"))
+    assert not index.check(alc2, UniMessage([At("user", "123"), Text("dispatch2")]))
+    assert index.check(alc3, UniMessage("hello"))
+
+    alc2.shortcut("d2", {"prefix": False})
+    assert index.check(alc2, UniMessage("d2"))
+    alc2.shortcut("d2", delete=True)
+    assert not index.check(alc2, UniMessage("d2"))
+
+    with command_manager.update(alc2):
+        alc2.prefixes = ["#"]
+    assert not index.check(alc2, UniMessage("dispatch2"))
+    assert index.check(alc2, UniMessage("#dispatch2"))
+
+
+@pytest.mark.asyncio()
+async def test_head_index_rule(app: App):
+    from nonebot_plugin_alconna import on_alconna
+
+    cmd = on_alconna(Alconna("dispatch_rule", Args["b", str]), use_cmd_start=True)
+
+    @cmd.handle()
+    async def _(b: str):
+        await cmd.send(b)
+
+    cmd.shortcut("快速", {"args": ["ok"], "prefix": True})
+
+    async with app.test_matcher(cmd) as ctx:
+        adapter = get_adapter(Adapter)
+        bot = ctx.create_bot(base=Bot, adapter=adapter)
+        event = fake_group_message_event_v11(message=Message("dispatch_rule abc"), user_id=123)
+        ctx.receive_event(bot, event)
+        ctx.should_not_pass_rule()
+        event = fake_group_message_event_v11(message=Message("/dispatch_rule abc"), user_id=123)
+        ctx.receive_event(bot, event)
+        ctx.should_call_send(event, "abc")
+        event = fake_group_message_event_v11(message=Message("/快速"), user_id=123)
+        ctx.receive_event(bot, event)
+        ctx.should_call_send(event, "ok")
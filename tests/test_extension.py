@@ -66,3 +66,93 @@ async def test_extension(app: App):
         event = fake_group_message_event_v11(message=Message("add 1.3 2.4"), user_id=456)
         ctx.receive_event(bot, event)
         ctx.should_call_send(event, "权限不足！")
+
+
+def test_message_cache(mocker):
+    from nonebot_plugin_alconna import cache
+    from nonebot_plugin_alconna.cache import MemoryMessageCache, cache_stats, get_message_cache
+
+    store = MemoryMessageCache("test", 2, ttl=10)
+    store.set(("OneBot V11", "1", "1"), 1)
+    store.set(("OneBot V11", "2", "1"), 2)
+    assert store.get(("OneBot V11", "1", "1")) == 1
+    store.set(("OneBot V11", "1", "2"), 3)
+    assert store.get(("OneBot V11", "2", "1")) is None
+    assert len(store) == 2
+    assert store.stats.hits == 1
+    assert store.stats.misses == 1
+    assert store.stats.evictions == 1
+
+    mocker.patch.object(cache, "monotonic", return_value=cache.monotonic() + 11)
+    assert ("OneBot V11", "1", "1") not in store
+    assert store.stats.expirations == 1
+
+    assert get_message_cache("message") is get_message_cache("message")
+    assert "message" in cache_stats()
+
+    with pytest.deprecated_call():
+        from nonebot_plugin_alconna.extension import unimsg_cache
+    assert unimsg_cache.get("1") is None
+    assert "1" not in unimsg_cache
+
+
+@pytest.mark.asyncio()
+async def test_extension_chain(app: App):
+    from nonebot.adapters.onebot.v11 import MessageEvent
+
+    from nonebot_plugin_alconna import Extension, on_alconna
+    from nonebot_plugin_alconna.extension import ExtensionExecutor, add_global_extension
+
+    class StaticExtension(Extension):
+        @property
+        def priority(self) -> int:
+            return 20
+
+        @property
+        def id(self) -> str:
+            return "chain_static"
+
+        async def send_wrapper(self, bot, event, send):
+            return send
+
+    class DynamicExtension(Extension):
+        @property
+        def priority(self) -> int:
+            return 10
+
+        @property
+        def id(self) -> str:
+            return "chain_dynamic"
+
+        def validate(self, bot, event) -> bool:
+            return isinstance(event, MessageEvent) and event.get_user_id() == "123"
+
+        async def permission_check(self, bot, event, command):
+            return True
+
+    matcher = on_alconna(Alconna("chain_test"), extensions=[StaticExtension, DynamicExtension])
+    executor = matcher.executor
+    bot = Bot(get_adapter(Adapter), "0")
+    event1 = fake_group_message_event_v11(message=Message("chain_test"), user_id=123)
+    event2 = fake_group_message_event_v11(message=Message("chain_test"), user_id=456)
+
+    selected1 = executor.select(bot, event1)
+    ids = [ext.id for ext in selected1.context]
+    assert ids.index("chain_dynamic") < ids.index("chain_static")
+    assert [ext.id for ext in selected1._hooks["permission_check"]] == ["chain_dynamic"]
+    assert executor.select(bot, event1) is selected1
+    selected2 = executor.select(bot, event2)
+    assert "chain_dynamic" not in [ext.id for ext in selected2.context]
+    assert executor._chains
+
+    class LateExtension(StaticExtension):
+        @property
+        def id(self) -> str:
+            return "chain_late"
+
+    add_global_extension(LateExtension)
+    try:
+        assert not executor._chains
+        assert "chain_late" in [ext.id for ext in executor.select(bot, event1).context]
+    finally:
+        ExtensionExecutor.globals.remove(LateExtension)
@@ -8,3 +8,7 @@ def test_fleep():
     assert get(raw_png).mimes == ["image/png"]
     assert get(raw_jpeg).mimes == ["image/jpeg"]
     assert get(raw_gif).mimes == ["image/gif"]
+    assert get(b"RIFF\x00\x00\x00\x00WAVEfmt ").extensions == ["wav"]
+    assert get(b"\x00\x00\x00\x18ftypmp42").mimes == ["video/mp4"]
+    assert get(raw_png[:3]).mimes == []
+    assert get(b"").mimes == []
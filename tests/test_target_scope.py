@@ -109,3 +109,153 @@ async def test_enable(app: App, mocker: MockerFixture):
     driver = get_driver()
     driver._bot_connection_hook.clear()
     driver._bot_disconnection_hook.clear()
+
+
+def test_target_index():
+    from nonebot_plugin_alconna import Target
+    from nonebot_plugin_alconna.uniseg.target import TargetIndex
+
+    targets = [
+        Target("1", private=True, self_id="b", adapter="Satori", platform="chronocat"),
+        Target("2", "10", self_id="b", adapter="Satori", extra={"channel_type": 0}),
+        Target("2", "20", self_id="b", adapter="Satori"),
+        Target("3", "30", channel=True, self_id="b", adapter="Satori"),
+    ]
+    index = TargetIndex(targets)
+    index.add(Target("1", private=True, self_id="b", adapter="Satori"))
+    assert len(index) == 4
+    for query in (
+        Target("1", private=True),
+        Target("2"),
+        Target("2", "20"),
+        Target("3", channel=True, self_id="b"),
+        Target("3", "30", channel=True, adapter="Satori"),
+        Target("4"),
+        Target("1"),
+        Target("2", "40"),
+        Target("3", channel=True, self_id="c"),
+        Target("3", channel=True, adapter="QQ"),
+    ):
+        assert index.match(query) == any(query.verify(tg) for tg in targets)
+    restored = list(index)
+    assert [tg.dump() for tg in restored] == [tg.dump() for tg in targets]
+
+
+@pytest.mark.asyncio()
+async def test_fetcher_refresh():
+    from types import SimpleNamespace
+
+    from nonebot_plugin_alconna import Target
+    from nonebot_plugin_alconna.uniseg.constraint import SupportAdapter
+    from nonebot_plugin_alconna.uniseg.target import TargetFetcher
+
+    calls = []
+    groups = {"10": ["1", "2"], "20": ["3"]}
+
+    class Fetcher(TargetFetcher):
+        @classmethod
+        def get_adapter(cls):
+            return SupportAdapter.satori
+
+        async def fetch(self, bot, target=None):
+            calls.append(target.parent_id if target else None)
+            snapshot = dict(groups)
+            await asyncio.sleep(0.01)
+            for guild, channels in snapshot.items():
+                if target and target.parent_id and target.parent_id != guild:
+                    continue
+                for channel in channels:
+                    yield Target(channel, guild, self_id=bot.self_id, adapter=self.get_adapter())
+
+    fetcher = Fetcher()
+    bot = SimpleNamespace(self_id="b")
+    await asyncio.gather(fetcher.refresh(bot), fetcher.refresh(bot), fetcher.refresh(bot, Target("1", "10")))  # type: ignore
+    assert calls == [None]
+    assert len(fetcher.cache["b"]) == 3
+
+    old = fetcher.cache["b"]
+    groups["30"] = ["4"]
+    task = asyncio.create_task(fetcher.refresh(bot))  # type: ignore
+    await asyncio.sleep(0)
+    assert fetcher.cache["b"] is old
+    await task
+    assert len(fetcher.cache["b"]) == 4
+
+    groups["40"] = ["5"]
+    await fetcher.refresh(bot, Target("5", "40"))  # type: ignore
+    assert calls == [None, None, "40"]
+    assert len(fetcher.cache["b"]) == 5
+
+    selector = fetcher.get_selector(bot)  # type: ignore
+    fetcher.last_refresh.clear()
+    groups["50"] = ["6"]
+    assert await selector(Target("6", "50"))
+    assert calls[-1] == "50"
+    assert not await selector(Target("7", "50"))
+    assert len(calls) == 4
+
+    fetcher.last_refresh.clear()
+    groups["60"] = ["8"]
+    assert await asyncio.gather(*(selector(Target("8", "60")) for _ in range(3))) == [True] * 3
+    assert len(calls) == 5
+
+    # 全量拉取进行时完成的增量拉取结果会并入新的缓存
+    groups["70"] = ["9"]
+    incremental = asyncio.create_task(fetcher.refresh(bot, Target("9", "70")))  # type: ignore
+    await asyncio.sleep(0)
+    full = asyncio.create_task(fetcher.refresh(bot))  # type: ignore
+    await asyncio.sleep(0)
+    del groups["70"]
+    await asyncio.gather(incremental, full)
+    assert fetcher.cache["b"].match(Target("9", "70"))
+
+
+@pytest.mark.asyncio()
+async def test_broadcast(app: App):
+    from nonebot.adapters.onebot.v11.exception import ActionFailed, NetworkError
+    from nonebot.adapters.telegram.exception import ActionFailed as TelegramActionFailed
+
+    from nonebot_plugin_alconna import Target, UniMessage
+    from nonebot_plugin_alconna.uniseg import set_rate_limit
+    from nonebot_plugin_alconna.uniseg.broadcast import is_rate_limited
+
+    class RateLimited(NetworkError):
+        status_code = 429
+
+    assert is_rate_limited(RateLimited())
+    assert is_rate_limited(TelegramActionFailed("Too Many Requests: retry after 5"))
+    assert not is_rate_limited(ActionFailed(retcode=1200, msg="group 429 not found"))
+    assert not is_rate_limited(TelegramActionFailed("Bad Request: chat 429 not found"))
+
+    set_rate_limit("OneBot V11", 1000, burst=2)
+    try:
+        async with app.test_api() as ctx:
+            onebot11_adapter = get_adapter(Onebot11Adapter)
+            bot = ctx.create_bot(base=Onebot11Bot, adapter=onebot11_adapter, self_id="10")
+            targets = [Target(str(i), self_id="10") for i in (1, 2, 3)]
+            message = [MessageSegment(type="text", data={"text": "notice"})]
+            ctx.should_call_api(
+                "send_msg", {"message_type": "group", "group_id": 1, "message": message}, {"message_id": 1}
+            )
+            ctx.should_call_api(
+                "send_msg",
+                {"message_type": "group", "group_id": 2, "message": message},
+                exception=RateLimited(),
+            )
+            ctx.should_call_api(
+                "send_msg",
+                {"message_type": "group", "group_id": 3, "message": message},
+                exception=ActionFailed(retcode=1200, msg="not found"),
+            )
+            ctx.should_call_api(
+                "send_msg", {"message_type": "group", "group_id": 2, "message": message}, {"message_id": 2}
+            )
+            result = await UniMessage("notice").broadcast(targets, backoff=0.01)
+
+        assert not result.success
+        assert [receipt.msg_ids for receipt in result.receipts] == [[{"message_id": 1}], [{"message_id": 2}]]
+        assert [receipt.bot for receipt in result.receipts] == [bot, bot]
+        assert result.failures[0][0] is targets[2]
+        assert isinstance(result.failures[0][1], ActionFailed)
+    finally:
+        set_rate_limit("OneBot V11", None)
@@ -118,6 +118,387 @@ def test_persistence():
     ]
 
 
+def test_persistence_binary():
+    from io import BytesIO
+    from pathlib import Path
+
+    from nonebot_plugin_alconna import Text, Image, Button, Keyboard, UniMessage
+
+    msg1 = UniMessage.at("123").text("hello").image(raw=b"123", mimetype="image/jpeg")
+    msg2 = UniMessage(Text("world").bold())
+    data = msg1.dump_bytes()
+    assert b"123" in data
+    assert b"MTIz" not in data
+    assert UniMessage.load_bytes(data) == msg1
+
+    fp = BytesIO()
+    assert UniMessage.dump_many([msg1, msg2], fp) == 2
+    UniMessage.dump_many([UniMessage(Image(url="https://example.com/1.jpg"))], fp)
+    fp.seek(0)
+    assert list(UniMessage.load_many(fp)) == [msg1, msg2, UniMessage(Image(url="https://example.com/1.jpg"))]
+    with pytest.raises(EOFError):
+        UniMessage.load_bytes(data[:-1])
+
+    raw = UniMessage.load_bytes(UniMessage(Image(raw=BytesIO(b"456"), mimetype="image/png")).dump_bytes())[0]
+    assert isinstance(raw, Image)
+    assert isinstance(raw.raw, BytesIO)
+    assert raw.raw.getvalue() == b"456"
+    path = UniMessage(Image(path=Path("a/1.png")))
+    assert UniMessage.load_bytes(path.dump_bytes()) == path
+    assert isinstance(UniMessage.load_bytes(path.dump_bytes())[Image, 0].path, Path)
+    keyboard = UniMessage(Keyboard([Button("action", "a", id="1"), Button("link", "b", url="https://x")], row=2))
+    assert UniMessage.load_bytes(keyboard.dump_bytes()) == keyboard
+    assert UniMessage.load(keyboard.dump()) == keyboard
+
+
+def test_adapter_registry():
+    from pathlib import Path
+
+    from nonebot_plugin_alconna.uniseg import adapters
+
+    root = Path(adapters.__file__).parent
+    modules = {path.name for path in root.iterdir() if path.is_dir() and not path.name.startswith("_")}
+    assert modules == set(adapters.LOADER_MODULES.values())
+    assert adapters.alter_get_exporter("OneBot V11") is adapters.alter_get_exporter("OneBot V11")
+    assert "OneBot V11" in adapters.import_costs()
+    with pytest.warns(RuntimeWarning):
+        assert adapters.alter_get_exporter("Unknown") is None
+
+
+def test_builder_dispatch():
+    from nonebot_plugin_alconna import Text, Other
+    from nonebot_plugin_alconna.uniseg.segment import custom
+    from nonebot_plugin_alconna.uniseg.adapters import alter_get_builder
+
+    builder = alter_get_builder("OneBot V11")
+    assert builder
+    assert builder.convert(MessageSegment.text("abc")) == Text("abc")
+    assert isinstance(builder.convert(MessageSegment("dispatch_test", {})), Other)
+
+    checked = []
+
+    def _predicate(seg):
+        checked.append(seg.type)
+        return seg.type.startswith("dispatch")
+
+    backup = (dict(custom.BUILDERS), dict(custom.TYPED), list(custom.PREDICATES))
+    try:
+        custom.custom_register(Text, _predicate)(lambda _, seg: Text(f"pred:{seg.type}"))
+        custom.custom_register(Text, "dispatch_test")(lambda _, seg: Text("typed"))
+        assert "dispatch_test" in builder.dispatch_table()
+        assert builder.convert(MessageSegment("dispatch_test", {})) == Text("typed")
+        assert builder.convert(MessageSegment("dispatch_other", {})) == Text("pred:dispatch_other")
+        assert builder.convert(MessageSegment.text("abc")) == Text("abc")
+        assert checked == ["dispatch_other"]
+    finally:
+        custom.BUILDERS.clear()
+        custom.BUILDERS.update(backup[0])
+        custom.TYPED.clear()
+        custom.TYPED.update(backup[1])
+        custom.PREDICATES[:] = backup[2]
+        type(custom).version += 1
+
+
+def test_lazy_unimsg():
+    from nonebot_plugin_alconna import Text, Image, UniMessage
+    from nonebot_plugin_alconna.uniseg.message import LazyUniMessage
+
+    msg = Message([MessageSegment.text("hello "), MessageSegment.text("world"), MessageSegment.image("1.png")])
+    eager = UniMessage.generate_sync(message=msg, adapter="OneBot V11")
+    lazy = UniMessage.generate_sync(message=msg, adapter="OneBot V11", lazy=True)
+    assert isinstance(lazy, LazyUniMessage)
+    assert lazy
+    assert lazy[0] == Text("hello world")
+    assert list.__len__(lazy) == 1
+    assert not lazy.materialized
+    assert lazy.extract_plain_text() == "hello world"
+    assert lazy == eager
+    assert lazy.materialized
+
+    lazy = UniMessage.generate_sync(message=msg, adapter="OneBot V11", lazy=True)
+    lazy.append(Text("!"))
+    assert len(lazy) == 3
+    assert isinstance(lazy[1], Image)
+    assert lazy.copy() == [*eager, Text("!")]
+
+    lazy = UniMessage.generate_sync(message=msg, adapter="OneBot V11", lazy=True)
+    copied = lazy.copy()
+    assert lazy.materialized
+    assert list.__len__(copied) == 2
+    assert copied == eager
+    assert lazy.__hash__ is None
+
+
+def test_type_index():
+    from copy import deepcopy
+
+    from nonebot_plugin_alconna import At, Text, Image, Reply, UniMessage
+
+    msg = UniMessage([Reply("1"), At("user", "1"), Text("a"), Image(url="1"), Text("b"), Image(url="2")])
+    assert msg.has(Image)
+    assert msg.index(Image) == 3
+    assert msg[Image, -1] == Image(url="2")
+    assert msg.count(Image) == 2
+    msg.append(At("user", "2"))
+    assert msg.get(At) == UniMessage([At("user", "1"), At("user", "2")])
+    assert msg.pop() == At("user", "2")
+    assert msg.pop(0) == Reply("1")
+    assert not msg.has(Reply)
+    assert msg.index(Image) == 2
+    msg.insert(0, Reply("2"))
+    assert msg.index(Reply) == 0
+    assert msg.include(Image, At) == UniMessage([At("user", "1"), Image(url="1"), Image(url="2")])
+    assert deepcopy(msg)._positions(Image) == [3, 5]
+
+
+def test_unimsg_builder():
+    from nonebot_plugin_alconna import At, Text, UniMessage, UniMessageBuilder
+
+    bold = Text("b", {(0, 1): ["bold"]})
+    builder = UniMessageBuilder()
+    builder.append(bold).text("c").extend([At("user", "1"), "d", ["e", Text("f")]])
+    msg = builder.build()
+    assert msg == UniMessage([Text("bc", {(0, 1): ["bold"]}), At("user", "1"), Text("def")])
+    assert bold == Text("b", {(0, 1): ["bold"]})
+    assert UniMessageBuilder().append(bold).build()[0] is bold
+    merged = UniMessageBuilder().extend([bold, Text("b", {(0, 1): ["bold"]})]).build()
+    assert merged == UniMessage(Text("bb", {(0, 2): ["bold"]}))
+    with pytest.raises(TypeError):
+        UniMessageBuilder().extend([1])
+
+
+def test_template_compile():
+    from nonebot_plugin_alconna import At, Text, UniMessage
+
+    template = UniMessage.template("{:At(user, $event.id)} {name!r:>4} {0.text}")
+    ops = template.compile()
+    assert template.compile() is ops
+    assert UniMessage.template("{:At(user, $event.id)} {name!r:>4} {0.text}").compile() is ops
+
+    class Event:
+        id = "123"
+
+    for name in ("a", "b"):
+        assert template.format(Text("t"), name=name, **{"$event": Event()}) == UniMessage(
+            [At("user", "123"), Text(f"  '{name}' t")]
+        )
+    with pytest.raises(ValueError, match="manual field specification"):
+        UniMessage.template("{} {0}").compile()
+    with pytest.raises(ValueError, match="private attribute"):
+        UniMessage.template("{x._y}").format(x=Text("a"))
+
+    class Template(type(template)):
+        def get_field(self, field_name, args, kwargs):
+            return field_name.upper(), field_name
+
+    assert Template("{x.y}", UniMessage).format() == UniMessage("X.Y")
+
+
+def test_structural_hash():
+    from nonebot_plugin_alconna import At, Text, Image, UniMessage
+    from nonebot_plugin_alconna.argv import MessageArgv
+
+    img1 = Image(raw=b"123", mimetype="image/jpeg")
+    img2 = Image(raw=b"123", mimetype="image/jpeg")
+    assert img1.structural_hash() == img2.structural_hash()
+    digest = img1.structural_hash()
+    img1.name = "1.jpg"
+    assert img1.structural_hash() != digest
+
+    text = Text("hello")
+    digest = text.structural_hash()
+    text.bold()
+    assert text.structural_hash() != digest
+    assert Text("hello").structural_hash() == digest
+    text = Text("hello")
+    text.styles[(0, 1)] = ["italic"]
+    assert text.structural_hash() != digest
+
+    assert (
+        UniMessage([Text("a"), At("user", "1")]).structural_hash()
+        == UniMessage([Text("a"), At("user", "1")]).structural_hash()
+    )
+    img3 = Image(raw=b"123", mimetype="image/jpeg")
+    assert MessageArgv.generate_token(["a", img2]) == MessageArgv.generate_token(["a", img3])
+    assert MessageArgv.generate_token(["a", img2]) != MessageArgv.generate_token(["a", img1])
+
+
+def test_segment_data():
+    from nonebot_plugin_alconna import At, Text, Button, Keyboard
+
+    button = Button("action", Text("a").bold(), id="1", permission=[At("user", "1")])
+    data = button.data
+    assert "_children" not in data
+    assert "origin" not in data
+    assert data["permission"] == [{"origin": None, "_children": [], "flag": "user", "target": "1", "display": None}]
+    assert data["label"] == {"origin": None, "_children": [], "text": "a", "styles": {(0, 1): ["bold"]}}
+    text = Text("a").bold()
+    assert text.data["styles"] is text.styles
+    assert f"{button:*}".startswith("[button:flag=action,label={")
+    deep = button.get_data(deep=True)
+    assert deep["permission"] == [{"origin": None, "_children": [], "flag": "user", "target": "1", "display": None}]
+    assert deep["label"]["styles"] == {(0, 1): ["bold"]}
+    assert Keyboard([button], row=1).data == {"id": None, "row": 1}
+    assert Keyboard([button], row=1).dump() == {"type": "keyboard", "row": 1, "children": [button.dump()]}
+
+
+def test_segment_registry():
+    from dataclasses import dataclass
+
+    from nonebot_plugin_alconna import Text, Segment, UniMessage
+    from nonebot_plugin_alconna.uniseg.segment import registry, get_segment_class
+
+    assert get_segment_class("text") is Text
+    assert get_segment_class("late") is Segment
+    template = UniMessage.template("{:Late(name)}")
+    with pytest.raises(IndexError):
+        template.format(name="a")
+
+    try:
+
+        @dataclass
+        class Late(Segment):
+            name: str
+
+        assert get_segment_class("late") is Late
+        assert UniMessage.load([{"type": "late", "name": "a"}]) == UniMessage(Late("a"))
+        assert template.format(name="a") == UniMessage(Late("a"))
+
+        @dataclass
+        class Text(Segment):  # noqa: F811
+            name: str
+
+        assert get_segment_class("text") is not Text
+        assert UniMessage.load([{"type": "text", "text": "a"}]) == UniMessage("a")
+    finally:
+        registry.TYPES.pop("late", None)
+    assert get_segment_class("late") is Segment
+
+
+def test_media_open(tmp_path):
+    from io import BytesIO
+
+    from nonebot_plugin_alconna import File, Image
+
+    path = tmp_path / "a.txt"
+    path.write_bytes(b"hello world")
+    with File(path=path).open() as f:
+        assert f.read() == b"hello world"
+
+    raw = BytesIO(b"hello world")
+    seg = Image(raw=raw)
+    with seg.open() as f1, seg.open() as f2:
+        assert f1.read(5) == b"hello"
+        assert f2.read() == b"hello world"
+        assert f1.read() == b" world"
+        f1.seek(-5, 2)
+        assert f1.read() == b"world"
+    raw.write(b"!")
+    with Image(raw=b"abc").open() as f:
+        assert f.read() == b"abc"
+    with pytest.raises(ValueError):
+        Image(url="https://example.com/a.png").open()
+
+
+def test_media_store(tmp_path):
+    from io import BytesIO
+
+    from nonebot_plugin_alconna import Image, UniMessage
+    from nonebot_plugin_alconna.uniseg.utils.media_store import INDEX_NAME, MediaStore
+
+    msg = UniMessage([Image(raw=b"\x89PNG\r\n\x1a\n0"), Image(raw=BytesIO(b"\x89PNG\r\n\x1a\n0"))])
+    data = msg.dump(media_save_dir=tmp_path)
+    assert data[0]["path"] == data[1]["path"]
+    assert data[0]["path"].endswith(".png")
+    with UniMessage.load(data)[0].open() as f:  # type: ignore
+        assert f.read() == b"\x89PNG\r\n\x1a\n0"
+
+    store = MediaStore(tmp_path / "store", quota=20)
+    store.index_delay = 60
+    first = store.put(b"a" * 10)
+    assert first.read_bytes() == b"a" * 10
+    second = store.submit(b"b" * 10).result()
+    assert second.exists()
+    assert not (tmp_path / "store" / INDEX_NAME).exists()
+    assert store.put(b"a" * 10) == first
+    store.put(b"c" * 10)
+    assert first.exists()
+    assert not second.exists()
+    assert store.size == 20
+    first.unlink()
+    assert store.put(b"a" * 10).exists()
+    store.flush()
+    assert (tmp_path / "store" / INDEX_NAME).exists()
+    assert len(MediaStore(tmp_path / "store")) == 2
+
+
+@pytest.mark.asyncio()
+async def test_media_save_async(tmp_path):
+    import asyncio
+
+    from nonebot_plugin_alconna import Image
+
+    seg = Image(raw=b"\x89PNG\r\n\x1a\n1")
+    paths = await asyncio.gather(*(seg.save_async(tmp_path) for _ in range(3)))
+    assert len(set(paths)) == 1
+    assert paths[0].read_bytes() == b"\x89PNG\r\n\x1a\n1"
+    assert seg.save(tmp_path) == paths[0]
+
+
+def test_segment_slots():
+    from copy import deepcopy
+
+    from nonebot_plugin_alconna import At, Text, Other, Image, Reply, UniMessage
+    from nonebot_plugin_alconna.uniseg.segment import I18n
+
+    at = At("user", "1")
+    assert not hasattr(at, "__dict__")
+    assert at == At("user", "1")
+    assert at.children == []
+    at.children.append(Text("a"))
+    assert at == At("user", "1")("a")
+    assert at("b").children == [Text("a"), Text("b")]
+    assert deepcopy(at) == at
+    image = Image(url="1")
+    image.children.extend([Text("c")])
+    assert image.dump()["children"] == [{"type": "text", "text": "c"}]
+    reply = Reply("1")
+    assert reply.children == []
+    assert reply.dump() == {"type": "reply", "id": "1"}
+    assert I18n("a", "b").origin is None
+    with pytest.raises(AttributeError, match="missing"):
+        at.missing  # noqa: B018
+
+    msg = Message([MessageSegment.text("a"), MessageSegment.at(1), MessageSegment("unknown", {})])
+    kept = UniMessage.generate_sync(message=msg, adapter="OneBot V11")
+    assert kept[At, 0].origin is msg[1]
+    dropped = UniMessage.generate_sync(message=msg, adapter="OneBot V11", keep_origin=False)
+    assert dropped == kept
+    assert dropped[At, 0].origin is None
+    assert dropped[Other, 0].origin is msg[2]
+
+
+def test_style_record():
+    from nonebot_plugin_alconna.argv import StyleRecord
+
+    record = StyleRecord()
+    record.add(10, 15, ["italic"])
+    record.add(0, 4, ["bold"])
+    record.add(6, 8, ["code"])
+    assert record.get((0, 4)) == ["bold"]
+    assert list(record.overlap(3, 11)) == [((0, 4), ["bold"]), ((6, 8), ["code"]), ((10, 15), ["italic"])]
+    assert list(record.overlap(4, 6)) == []
+    assert list(record.overlap(14, 20)) == [((10, 15), ["italic"])]
+
+    record = StyleRecord()
+    record.add(0, 1000, ["bold"])
+    for i in range(0, 1000, 10):
+        record.add(i, i + 2, ["italic"])
+    assert list(record.overlap(503, 508)) == [((0, 1000), ["bold"])]
+    assert list(record.overlap(500, 511)) == [((0, 1000), ["bold"]), ((500, 502), ["italic"]), ((510, 512), ["italic"])]
+    assert list(record.overlap(1000, 1010)) == []
+
+
 @pytest.mark.asyncio()
 async def test_fallback(app: App):
     from nonebot.adapters.console import Message
@@ -150,6 +531,12 @@ async def test_unimsg_template(app: App):
     assert UniMessage.template("{:At(flag=user, target=id)}").format(id="123") == UniMessage(At("user", "123"))
     assert UniMessage.template("{:At(flag=user, target=123)}").format() == UniMessage(At("user", "123"))
     assert UniMessage.template("{foo.target}").format(foo=At("user", "123")) == UniMessage("123")
+    at = At("user", "1")
+    template = UniMessage.template(UniMessage([at, Text("{}")]))
+    first, second = template.format(at), template.format(at)
+    assert first == second == UniMessage([at, at])
+    assert all(seg is not at for seg in (*first, *second))
+    assert first[1] is not second[1]
 
     matcher = on_alconna(Alconna("test_unimsg_template"))
 
@@ -279,3 +666,180 @@ async def test_unimsg_send(app: App):
         )
         target = Target("456", adapter=adapter.get_name())
         await target.send("hello!")
+
+
+@pytest.mark.asyncio()
+async def test_concurrent_export(app: App, mocker):
+    import asyncio
+
+    from nonebot_plugin_alconna import Image, UniMessage
+    from nonebot_plugin_alconna.uniseg import alter_get_exporter
+
+    exporter = alter_get_exporter("OneBot V11")
+    assert exporter
+    running = 0
+    peak = 0
+
+    async def image(seg: Image, bot):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01 * int(seg.url[-1]))  # type: ignore
+        running -= 1
+        return MessageSegment.image(seg.url)  # type: ignore
+
+    mocker.patch.dict(exporter._mapping, {Image: image})
+    mocker.patch.object(exporter, "concurrency", 2)
+    msg = UniMessage.text("a").image(url="https://example.com/3").text("b")
+    msg = msg.image(url="https://example.com/1").image(url="https://example.com/2")
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        res = await msg.export(bot)
+    assert peak == 2
+    assert res == Message(
+        [
+            MessageSegment.text("a"),
+            MessageSegment.image("https://example.com/3"),
+            MessageSegment.text("b"),
+            MessageSegment.image("https://example.com/1"),
+            MessageSegment.image("https://example.com/2"),
+        ]
+    )
+
+
+@pytest.mark.asyncio()
+async def test_upload_cache(app: App, tmp_path):
+    import asyncio
+
+    from nonebot_plugin_alconna import Image
+    from nonebot_plugin_alconna.uniseg import apply_upload_cache
+    from nonebot_plugin_alconna.uniseg.utils.upload import (
+        UploadCache,
+        media_key,
+        entry_size,
+        cached_upload,
+        get_media_key,
+    )
+
+    calls = 0
+
+    async def upload():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return f"key{calls}"
+
+    seg = Image(raw=b"123")
+    assert media_key(seg) == media_key(Image(raw=b"123"))
+    assert media_key(Image(url="https://example.com/1.jpg")) == "url:https://example.com/1.jpg"
+    (tmp_path / "1.png").write_bytes(b"1" * 100_000)
+    assert await get_media_key(Image(path=tmp_path / "1.png")) == media_key(Image(path=tmp_path / "1.png"))
+    assert await get_media_key(Image(raw=b"1" * 100_000)) == media_key(Image(raw=b"1" * 100_000))
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        assert await cached_upload(bot, seg, "upload", upload) == "key1"
+        dispose = apply_upload_cache(path=tmp_path / "upload.json")
+        try:
+            results = await asyncio.gather(*(cached_upload(bot, Image(raw=b"123"), "upload", upload) for _ in range(3)))
+            assert results == ["key2"] * 3
+            assert await cached_upload(bot, seg, "upload", upload) == "key2"
+            assert await cached_upload(bot, seg, "other", upload) == "key3"
+            assert not (tmp_path / "upload.json").exists()
+        finally:
+            dispose()
+
+    cache = UploadCache(path=tmp_path / "upload.json")
+    assert len(cache) == 2
+    assert cache.get(("OneBot V11", bot.self_id, "upload", media_key(seg))) == "key2"  # type: ignore
+    cache.ttl = 0
+    assert cache.get(("OneBot V11", bot.self_id, "upload", media_key(seg))) is None  # type: ignore
+
+    key = ("OneBot V11", "1", "upload", "sha256:0")
+    cache = UploadCache(max_size=entry_size(key, "key1") * 2)
+    for i in range(3):
+        cache.set((*key[:3], f"sha256:{i}"), "key1")  # type: ignore
+    assert len(cache) == 2
+    assert cache.get(key) is None
+
+
+@pytest.mark.asyncio()
+async def test_export_cache(app: App):
+    from nonebot_plugin_alconna.uniseg import apply_export_cache
+    from nonebot_plugin_alconna import At, Text, Image, Reply, UniMessage
+    from nonebot_plugin_alconna.uniseg.utils.export_cache import get_export_cache
+
+    async with app.test_api() as ctx:
+        bot = ctx.create_bot(base=Bot, adapter=get_adapter(Adapter))
+        dispose = apply_export_cache(capacity=2)
+        try:
+            cache = get_export_cache()
+            assert cache is not None
+            msg = UniMessage([Text("help "), At("user", "1")])
+            first = await msg.export(bot)
+            second = await UniMessage([Text("help "), At("user", "1")]).export(bot)
+            assert first == second == Message([MessageSegment.text("help "), MessageSegment.at(1)])
+            assert first is not second
+            assert (cache.hits, cache.misses) == (1, 1)
+            second.append(MessageSegment.text("!"))
+            assert await msg.export(bot) == first
+            assert await UniMessage([Text("help ")]).export(bot) == Message("help ")
+            assert await UniMessage([Text("help "), Reply("1")]).export(bot)
+            assert await UniMessage(Image(url="https://example.com/1.png")).export(bot)
+            assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+            await UniMessage("a").export(bot)
+            assert len(cache) == 2
+        finally:
+            dispose()
+    assert get_export_cache() is None
+
+
+@pytest.mark.asyncio()
+async def test_event_cache(app: App):
+    from nonebot_plugin_alconna.uniseg.rule import origin_message
+    from nonebot_plugin_alconna.extension import SelectedExtensions
+    from nonebot_plugin_alconna.uniseg import At, Text, at_me, get_target
+    from nonebot_plugin_alconna.uniseg.functions import event_cache, event_cached
+
+    async with app.test_api() as ctx:
+        adapter = get_adapter(Adapter)
+        bot = ctx.create_bot(base=Bot, adapter=adapter, self_id="1")
+        event = fake_group_message_event_v11(message=Message([MessageSegment.at(1), MessageSegment.text("hi")]))
+        selected = SelectedExtensions([])
+        msg = await selected.message_provider(event, {}, bot)
+        assert msg is await selected.message_provider(event, {}, bot)
+        assert origin_message(event, bot) is origin_message(event, bot)
+        target = get_target(event, bot)
+        assert target == get_target(event, bot)
+        target.extra["k"] = "v"
+        assert "k" not in get_target(event, bot).extra
+
+        ctx1 = await selected.context_provider(event, bot, {})
+        ctx1["foo"] = "bar"
+        assert "foo" not in await selected.context_provider(event, bot, {})
+
+        called = []
+
+        async def factory():
+            called.append(1)
+            return 1
+
+        assert await event_cached(event, "test", factory) == await event_cached(event, "test", factory) == 1
+        assert len(called) == 1
+        assert "test" in event_cache(event)
+        copied = event.model_copy(update={"message": Message("other"), "original_message": Message("other")})
+        assert "test" not in event_cache(copied)
+        assert origin_message(event, bot).extract_plain_text() == "hi"
+        assert origin_message(copied, bot).extract_plain_text() == "other"
+
+        class Plain:
+            __slots__ = ()
+
+        assert event_cache(Plain()) is not event_cache(Plain())  # type: ignore
+
+        for _ in range(2):
+            assert await at_me()(bot, event, {})
+            assert not await at_me(True)(bot, event, {})
+        assert origin_message(event, bot)[0] == At("user", "1")
+        assert origin_message(event, bot)[1] == Text("hi")